@@ -1,11 +1,24 @@
-from aalpy.base import Automaton
+from aalpy.base import Automaton, DeterministicAutomaton
 from aalpy.base import SUL
 
 
 class AutomatonSUL(SUL):
-    def __init__(self, automaton: Automaton):
+    def __init__(self, automaton: Automaton, compile_automaton=False):
+        """
+        Args:
+
+            automaton: automaton that is simulated
+
+            compile_automaton: if True, the deterministic automaton is compiled into NumPy transition tables that are
+                used to answer batched queries (see DeterministicAutomaton.compile). Requires NumPy, which is not
+                installed with aalpy. The automaton should not be modified afterwards (Default value = False)
+        """
         super().__init__()
         self.automaton: Automaton = automaton
+        self.compiled_automaton = None
+        if compile_automaton:
+            assert isinstance(automaton, DeterministicAutomaton)
+            self.compiled_automaton = automaton.compile()
 
     def pre(self):
         self.automaton.reset_to_initial()
@@ -16,5 +29,39 @@ class AutomatonSUL(SUL):
     def post(self):
         pass
 
+    def query_batch(self, words: list) -> list:
+        if self.compiled_automaton is None:
+            return super().query_batch(words)
+
+        outputs = [None] * len(words)
+        # empty words are answered by the initial state (if the automaton has state outputs)
+        non_empty = []
+        for ind, word in enumerate(words):
+            if len(word) == 0:
+                outputs[ind] = self.query(word)
+            else:
+                non_empty.append(ind)
+
+        compiled_outputs = self.compiled_automaton.run_batch([words[ind] for ind in non_empty])
+        for ind, output in zip(non_empty, compiled_outputs):
+            outputs[ind] = output
+            self.num_steps += len(words[ind])
+        self.num_queries += len(non_empty)
+        return outputs
+
+    def snapshot(self):
+        # pushdown automata additionally keep a stack and an error flag as part of their configuration
+        stack = getattr(self.automaton, 'stack', None)
+        return (self.automaton.current_state, list(stack) if stack is not None else None,
+                getattr(self.automaton, 'error_state_reached', None))
+
+    def restore(self, snapshot):
+        current_state, stack, error_state_reached = snapshot
+        self.automaton.current_state = current_state
+        if stack is not None:
+            self.automaton.stack = list(stack)
+        if error_state_reached is not None:
+            self.automaton.error_state_reached = error_state_reached
+
 
 MealySUL = OnfsmSUL = StochasticMealySUL = DfaSUL = MooreSUL = MdpSUL = McSUL = SevpaSUL = VpaSUL = AutomatonSUL
@@ -27,6 +27,9 @@ from .base import (
     CacheTree,
     DeterministicAutomaton,
     Oracle,
+    ParallelSUL,
+    PrefixSharingSUL,
+    WordTrie,
 )
 from .learning_algs import (
     run_abstracted_ONFSM_Lstar,
@@ -73,6 +76,8 @@ from .utils import (
     DelimiterTokenizer,
     IODelimiterTokenizer,
     bisimilar,
+    check_properties_file,
+    check_property,
     compare_automata,
     convert_i_o_traces_for_RPNI,
     generate_random_deterministic_automata,
@@ -93,6 +98,7 @@ from .utils import (
     model_check_experiment,
     model_check_properties,
     save_automaton_to_file,
+    sequential_probability_ratio_test,
     statistical_model_checking,
     visualize_automaton,
 )
@@ -1,9 +1,11 @@
 import copy
 import warnings
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import Union, TypeVar, Generic, List
 
+from aalpy.base.SplittingTree import SplittingTree
+
 
 class AutomatonState(ABC):
 
@@ -273,9 +275,9 @@ class DeterministicAutomaton(Automaton[AutomatonStateType]):
 
         """
         visited = set()
-        to_explore = [(state1, state2, [])]
+        to_explore = deque([(state1, state2, [])])
         while to_explore:
-            (curr_s1, curr_s2, prefix) = to_explore.pop(0)
+            (curr_s1, curr_s2, prefix) = to_explore.popleft()
             visited.add((curr_s1, curr_s2))
             for i in alphabet:
                 o1 = self.output_step(curr_s1, i)
@@ -310,7 +312,20 @@ class DeterministicAutomaton(Automaton[AutomatonStateType]):
         if not self.is_input_complete():
             warnings.warn('Minimization of non input complete automata is not yet supported. Returning False.')
             return False
-        return self.compute_characterization_set(raise_warning=False) is not None
+        return self.compute_splitting_tree().separates_all_states()
+
+    def compute_splitting_tree(self, char_set_init=None, alphabet=None):
+        """
+        Computes the splitting tree of the automaton by partition refinement. Leaves of the splitting tree are the
+        blocks of equivalent states and inner nodes are labeled with separating sequences.
+        Args:
+            char_set_init: sequences used for the initial partition
+            alphabet: input alphabet, if None the input alphabet of the automaton is used
+
+        Returns: SplittingTree of the automaton
+
+        """
+        return SplittingTree(self, char_set_init, alphabet)
 
     def compute_characterization_set(self, char_set_init=None,
                                      online_suffix_closure=True,
@@ -323,6 +338,8 @@ class DeterministicAutomaton(Automaton[AutomatonStateType]):
         by Arthur Gill in "Introduction to the Theory of Finite State Machines".
         Some optional parameterized adaptations, e.g., for computing suffix-closed sets target the application in
         L*-based learning and conformance testing.
+        With online suffix closure and splitting of all blocks (default), the set is computed by partition refinement
+        (see SplittingTree), otherwise the original block-splitting approach is used.
         The function only works for minimal automata.
         Args:
             char_set_init: a list of sequence that will be included in the characterization set, e.g., the input
@@ -341,6 +358,22 @@ class DeterministicAutomaton(Automaton[AutomatonStateType]):
         Returns: a characterization set or None if a non-minimal automaton is passed to the function
 
         """
+        if online_suffix_closure and split_all_blocks:
+            # sequences of the splitting tree are suffix-closed and distinguish all blocks
+            splitting_tree = self.compute_splitting_tree(char_set_init)
+            for block in splitting_tree.get_blocks():
+                if len(block) > 1:
+                    if return_same_states:
+                        return block[0], block[1]
+                    if raise_warning:
+                        warnings.warn("Automaton is non-canonical: could not compute characterization set."
+                                      "Returning None.")
+                    return None
+
+            if return_same_states:
+                return None, None
+            return splitting_tree.get_characterization_set()
+
         blocks = list()
         blocks.append(copy.copy(self.states))
         char_set = [] if not char_set_init else char_set_init
@@ -422,6 +455,20 @@ class DeterministicAutomaton(Automaton[AutomatonStateType]):
                 new_blocks.append(new_block)
         return new_blocks
 
+    def compile(self):
+        """
+        Compiles the automaton into immutable, integer-indexed transition and output tables stored in NumPy arrays.
+        The compiled automaton simulates batches of input words without stepping through state objects.
+        Requires NumPy and an input complete automaton. NumPy is not an install requirement of aalpy, callers that
+        compile automata implicitly have to fall back to stepping through states if an ImportError is raised.
+
+        Returns: CompiledAutomaton of the automaton
+
+        """
+        from aalpy.base.CompiledAutomaton import CompiledAutomaton
+        assert self.is_input_complete(), 'Only input complete automata can be compiled.'
+        return CompiledAutomaton(self)
+
     def compute_prefixes(self):
         for s in self.states:
             if not s.prefix:
@@ -432,14 +479,17 @@ class DeterministicAutomaton(Automaton[AutomatonStateType]):
             warnings.warn('Minimization of non input complete automata is not yet supported.\n Model not minimized.')
             return
 
-        s1, s2 = self.compute_characterization_set(return_same_states=True)
-        while s1 and s2:
-            for s in self.states:
-                for i, new_state in s.transitions.items():
-                    if new_state == s2:
-                        s.transitions[i] = s1
-            self.states.remove(s2)
-            s1, s2 = self.compute_characterization_set(return_same_states=True)
+        # every block of equivalent states is merged into its first state, or into the initial state
+        representatives = dict()
+        for block in self.compute_splitting_tree().get_blocks():
+            representative = self.initial_state if self.initial_state in block else block[0]
+            for state in block:
+                representatives[state] = representative
+
+        self.states = [s for s in self.states if representatives[s] is s]
+        for s in self.states:
+            for i, new_state in s.transitions.items():
+                s.transitions[i] = representatives[new_state]
 
         self.compute_prefixes()
 
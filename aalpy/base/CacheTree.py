@@ -1,3 +1,9 @@
+import pickle
+import sqlite3
+import sys
+from array import array
+
+
 class Node(object):
     __slots__ = ['value', 'children']
 
@@ -43,8 +49,7 @@ class CacheTree:
             return
 
         if inp not in self.curr_node.children.keys():
-            node = Node(out)
-            self.curr_node.children[inp] = node
+            node = self._add_child(self.curr_node, inp, out)
         else:
             node = self.curr_node.children[inp]
             if node.value != out:
@@ -58,6 +63,11 @@ class CacheTree:
                 raise SystemExit(msg)
         self.curr_node = node
 
+    def _add_child(self, parent, inp, out):
+        node = Node(out)
+        parent.children[inp] = node
+        return node
+
     def in_cache(self, input_seq: tuple):
         """
         Check if the result of the membership query for input_seq is cached is in the tree. If it is, return the
@@ -167,3 +177,253 @@ class CacheDict:
 
     def get_output_sequence(self, input_seq):
         return tuple(self.cache_dict[input_seq[:i]] for i in range(1, len(input_seq) + 1))
+
+
+class PersistentNode(Node):
+    __slots__ = ['node_id']
+
+    def __init__(self, node_id, value=None):
+        super().__init__(value)
+        self.node_id = node_id
+
+
+class PersistentCacheTree(CacheTree):
+    """
+    Cache tree that is persisted in a SQLite database, so that observations can be reused across learning runs,
+    e.g. to resume a crashed experiment or to share observations between different learning algorithms learning the
+    same system. Upon creation, the tree is warm-started with all observations found in the database. Newly observed
+    nodes are appended to the database in batches of size flush_interval and on every call of the flush method.
+    Inputs and outputs have to be picklable. As they are unpickled when the tree is loaded, only databases from
+    trusted sources should be used.
+    """
+
+    def __init__(self, path, flush_interval=1000):
+        """
+        Args:
+
+            path: path to the SQLite database. It will be created if it does not exist.
+
+            flush_interval: number of new nodes after which the nodes are written to the database
+
+        """
+        super().__init__()
+        self.path = path
+        self.flush_interval = flush_interval
+        self.root_node = PersistentNode(0)
+        self.num_nodes = 1
+        self.pending_nodes = []
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS cache_nodes '
+                                '(node_id INTEGER PRIMARY KEY, parent_id INTEGER, input BLOB, output BLOB)')
+        self.connection.commit()
+        self._load()
+
+    def _load(self):
+        """
+        Rebuilds the tree from the database. Parents are always stored before their children.
+        """
+        nodes = {0: self.root_node}
+        rows = self.connection.execute('SELECT node_id, parent_id, input, output FROM cache_nodes ORDER BY node_id')
+        for node_id, parent_id, inp, out in rows:
+            value = pickle.loads(out)
+            if node_id == 0:
+                self.root_node.value = value
+                continue
+            node = PersistentNode(node_id, value)
+            nodes[parent_id].children[pickle.loads(inp)] = node
+            nodes[node_id] = node
+            self.num_nodes = max(self.num_nodes, node_id + 1)
+
+    def step_in_cache(self, inp, out):
+        if inp is None and self.root_node.value != out:
+            self.pending_nodes.append((0, None, None, pickle.dumps(out)))
+        super().step_in_cache(inp, out)
+
+    def _add_child(self, parent, inp, out):
+        node = PersistentNode(self.num_nodes, out)
+        self.num_nodes += 1
+        parent.children[inp] = node
+
+        self.pending_nodes.append((node.node_id, parent.node_id, pickle.dumps(inp), pickle.dumps(out)))
+        if len(self.pending_nodes) >= self.flush_interval:
+            self.flush()
+        return node
+
+    def flush(self):
+        """
+        Writes all nodes observed since the last flush to the database.
+        """
+        if not self.pending_nodes:
+            return
+        self.connection.executemany('INSERT OR REPLACE INTO cache_nodes VALUES (?, ?, ?, ?)', self.pending_nodes)
+        self.connection.commit()
+        self.pending_nodes.clear()
+
+    def close(self):
+        """
+        Flushes all pending nodes and closes the database connection.
+        """
+        self.flush()
+        self.connection.close()
+
+
+class ArrayCacheTree:
+    """
+    Memory-compact alternative to the CacheTree. Inputs and outputs are interned to small integers and the tree is
+    stored in flat arrays: for every input there is an array mapping node indices to the index of the child reached
+    with that input (-1 if there is none), and a single array holds the output index of every node.
+    Each step in the cache takes constant time, independent of the length of the current query.
+    """
+
+    def __init__(self):
+        self.input_ids = dict()
+        self.output_ids = dict()
+        self.output_values = []
+
+        # children[input_id][node] is the child reached from node with input, or -1. Arrays grow lazily.
+        self.children = []
+        self.node_outputs = array('i', [-1])
+        self.num_nodes = 1
+        self.root_value = None
+
+        self.curr_node = 0
+        self.inputs = []
+        self.outputs = []
+
+    def reset(self):
+        self.curr_node = 0
+        self.inputs = []
+        self.outputs = []
+
+    def _get_child(self, input_id, node):
+        child_table = self.children[input_id]
+        return child_table[node] if node < len(child_table) else -1
+
+    def step_in_cache(self, inp, out):
+        """
+        Preform a step in the cache. If output exist for the current state, and is not the same as `out`, throw
+        the non-determinism violation error and abort learning.
+        Args:
+
+            inp: input
+            out: output
+
+        """
+        self.inputs.append(inp)
+        self.outputs.append(out)
+        if inp is None:
+            self.root_value = out
+            return
+
+        input_id = self.input_ids.get(inp)
+        if input_id is None:
+            input_id = len(self.children)
+            self.input_ids[inp] = input_id
+            self.children.append(array('i'))
+
+        output_id = self.output_ids.get(out)
+        if output_id is None:
+            output_id = len(self.output_values)
+            self.output_ids[out] = output_id
+            self.output_values.append(out)
+
+        child = self._get_child(input_id, self.curr_node)
+        if child == -1:
+            child = self.num_nodes
+            self.num_nodes += 1
+            self.node_outputs.append(output_id)
+
+            child_table = self.children[input_id]
+            if len(child_table) <= self.curr_node:
+                child_table.extend(array('i', [-1]) * (self.curr_node + 1 - len(child_table)))
+            child_table[self.curr_node] = child
+        elif self.node_outputs[child] != output_id:
+            cached_output = self.output_values[self.node_outputs[child]]
+            expected_seq = tuple(self.outputs[:-1]) + (cached_output,)
+            msg = f'Non-determinism detected.\n' \
+                  f'Error inserting: {tuple(self.inputs)}\n' \
+                  f'Conflict detected: {cached_output} vs {out}\n' \
+                  f'Expected Output: {expected_seq}\n' \
+                  f'Received output: {tuple(self.outputs)}'
+            raise SystemExit(msg)
+        self.curr_node = child
+
+    def in_cache(self, input_seq: tuple):
+        """
+        Check if the result of the membership query for input_seq is cached is in the tree. If it is, return the
+        corresponding output sequence.
+
+        Args:
+
+            input_seq: corresponds to the membership query
+
+        Returns:
+
+            outputs associated with inputs if it is in the query, None otherwise
+
+        """
+        node = 0
+        output_seq = []
+        for letter in input_seq:
+            input_id = self.input_ids.get(letter)
+            if input_id is None:
+                return None
+            node = self._get_child(input_id, node)
+            if node == -1:
+                return None
+            output_seq.append(self.output_values[self.node_outputs[node]])
+
+        return tuple(output_seq)
+
+    def add_to_cache(self, input_sequence, output_sequence):
+        """
+        Add input-output sequence to cache
+        """
+        self.reset()
+        for i, o in zip(input_sequence, output_sequence):
+            self.step_in_cache(i, o)
+
+    def get_paths_to_leaves(self):
+        """
+        Returns input sequences leading from the root to all leaves of the tree.
+        """
+        inputs = list(self.input_ids.keys())
+        paths = []
+        stack = [(0, ())]
+        while stack:
+            node, path = stack.pop()
+            is_leaf = True
+            for input_id, inp in enumerate(inputs):
+                child = self._get_child(input_id, node)
+                if child != -1:
+                    is_leaf = False
+                    stack.append((child, path + (inp,)))
+            if is_leaf:
+                paths.append(list(path))
+        return paths
+
+    def memory_footprint(self):
+        """
+        Reports the memory used by the cache.
+
+        Returns:
+
+            dictionary containing the number of nodes, the size in bytes of the transition tables, the output array
+            and the symbol tables, as well as the total size and the average size per node. Sizes include the
+            over-allocation of arrays and object headers.
+
+        """
+        transition_table_bytes = sys.getsizeof(self.children) + sum(sys.getsizeof(t) for t in self.children)
+        output_array_bytes = sys.getsizeof(self.node_outputs)
+        symbol_table_bytes = sys.getsizeof(self.input_ids) + sys.getsizeof(self.output_ids) + \
+            sys.getsizeof(self.output_values)
+        total_bytes = transition_table_bytes + output_array_bytes + symbol_table_bytes
+        return {
+            'num_nodes': self.num_nodes,
+            'transition_table_bytes': transition_table_bytes,
+            'output_array_bytes': output_array_bytes,
+            'symbol_table_bytes': symbol_table_bytes,
+            'total_bytes': total_bytes,
+            'bytes_per_node': total_bytes / self.num_nodes,
+        }
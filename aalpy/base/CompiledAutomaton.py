@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class CompiledAutomaton:
+    """
+    Immutable, integer-indexed representation of an input complete deterministic automaton. States and inputs are
+    numbered and the transition and output functions are stored in NumPy arrays of shape (#states, #inputs), where
+    outputs are indices into the list of output values. Many input words can be simulated at once with run_batch.
+
+    The compiled automaton is a snapshot; changes to the automaton after compilation are not reflected.
+    """
+
+    def __init__(self, automaton):
+        """
+        Args:
+
+            automaton: input complete deterministic automaton (Dfa, MooreMachine or MealyMachine)
+        """
+        self.states = list(automaton.states)
+        self.inputs = list(automaton.get_input_alphabet())
+
+        state_index = {state: ind for ind, state in enumerate(self.states)}
+        self.input_index = {inp: ind for ind, inp in enumerate(self.inputs)}
+        self.initial_state = state_index[automaton.initial_state]
+
+        self.output_values = []
+        output_ids = dict()
+
+        self.transitions = np.empty((len(self.states), len(self.inputs)), dtype=np.int32)
+        self.outputs = np.empty((len(self.states), len(self.inputs)), dtype=np.int32)
+        for state_ind, state in enumerate(self.states):
+            for input_ind, inp in enumerate(self.inputs):
+                output = automaton.output_step(state, inp)
+                if output not in output_ids:
+                    output_ids[output] = len(self.output_values)
+                    self.output_values.append(output)
+                self.transitions[state_ind, input_ind] = state_index[state.transitions[inp]]
+                self.outputs[state_ind, input_ind] = output_ids[output]
+
+        self.transitions.setflags(write=False)
+        self.outputs.setflags(write=False)
+
+    def encode(self, words):
+        """
+        Encodes words as a matrix of input indices padded with -1, one row per word.
+
+        Args:
+
+            words: list of input sequences
+
+        Returns:
+
+            tuple of the matrix and an array of word lengths
+
+        """
+        lengths = np.fromiter((len(word) for word in words), dtype=np.int64, count=len(words))
+        encoded = np.full((len(words), int(lengths.max(initial=0))), -1, dtype=np.int32)
+        input_index = self.input_index
+        flat_inputs = [input_index[inp] for word in words for inp in word]
+        # row-major order of the mask corresponds to the order of inputs in the flattened words
+        encoded[np.arange(encoded.shape[1]) < lengths[:, None]] = flat_inputs
+        return encoded, lengths
+
+    def run_batch(self, words, origin_states=None):
+        """
+        Simulates all words at once. In every step, the transition and output tables are indexed with the current
+        states and inputs of all words that are not yet fully executed.
+
+        Args:
+
+            words: list of input sequences
+
+            origin_states: array of state indices from which words are executed, initial state if None
+
+        Returns:
+
+            list of output lists, where the i-th list corresponds to the outputs of the i-th word
+
+        """
+        if not words:
+            return []
+
+        encoded, lengths = self.encode(words)
+
+        # longest words first, so that words that are still executed in a step form a prefix of the batch
+        order = np.argsort(-lengths, kind='stable')
+        encoded, sorted_lengths = encoded[order], lengths[order]
+        if origin_states is None:
+            current_states = np.full(len(words), self.initial_state, dtype=np.int32)
+        else:
+            current_states = np.asarray(origin_states, dtype=np.int32)[order]
+
+        output_ids = np.empty(encoded.shape, dtype=np.int32)
+        # number of words longer than each step
+        num_active = np.searchsorted(-sorted_lengths, -np.arange(encoded.shape[1]), side='left')
+        for step in range(encoded.shape[1]):
+            active = num_active[step]
+            inputs = encoded[:active, step]
+            states = current_states[:active]
+            output_ids[:active, step] = self.outputs[states, inputs]
+            current_states[:active] = self.transitions[states, inputs]
+
+        # filled element-wise, as outputs can be sequences themselves
+        output_values = np.empty(len(self.output_values), dtype=object)
+        for ind, output in enumerate(self.output_values):
+            output_values[ind] = output
+
+        flat_outputs = output_values[output_ids[np.arange(output_ids.shape[1]) < sorted_lengths[:, None]]].tolist()
+        outputs = [None] * len(words)
+        start = 0
+        for word_ind, length in zip(order.tolist(), sorted_lengths.tolist()):
+            outputs[word_ind] = flat_outputs[start:start + length]
+            start += length
+        return outputs
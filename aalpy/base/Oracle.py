@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 
 from aalpy.base import SUL
+from aalpy.base.SUL import CacheSUL
+from aalpy.base.WordTrie import WordTrie
 
 
 class Oracle(ABC):
@@ -20,6 +22,9 @@ class Oracle(ABC):
         self.sul = sul
         self.num_queries = 0
         self.num_steps = 0
+        # test cases answered from the cache of the SUL and the steps they would have performed on the SUL
+        self.num_cached_queries = 0
+        self.num_cached_steps = 0
 
     @abstractmethod
     def find_cex(self, hypothesis):
@@ -49,4 +54,262 @@ class Oracle(ABC):
         hypothesis.reset_to_initial()
         self.sul.post()
         self.sul.pre()
-        self.num_queries += 1
\ No newline at end of file
+        self.num_queries += 1
+
+    def execute_test_case(self, hypothesis, test_case):
+        """
+        Executes a test case step by step on the SUL and the hypothesis.
+
+        Args:
+
+            hypothesis: current hypothesis
+
+            test_case: input sequence
+
+        Returns:
+
+            shortest prefix of the test case on which the SUL and hypothesis disagree, None if they agree
+
+        """
+        self.reset_hyp_and_sul(hypothesis)
+
+        for ind, letter in enumerate(test_case):
+            out_hyp = hypothesis.step(letter)
+            out_sul = self.sul.step(letter)
+            self.num_steps += 1
+
+            if out_hyp != out_sul:
+                self.sul.post()
+                return test_case[:ind + 1]
+
+        return None
+
+    def execute_test_batch(self, hypothesis, test_cases):
+        """
+        Executes a batch of test cases on the SUL with a single batch query and compares the observed outputs with
+        the outputs of the hypothesis. Queries and steps performed on the SUL are accounted to the oracle.
+
+        Args:
+
+            hypothesis: current hypothesis
+
+            test_cases: list of input sequences
+
+        Returns:
+
+            shortest prefix of the first test case on which the SUL and hypothesis disagree, None if they agree on
+            all test cases
+
+        """
+        num_queries, num_steps = self.sul.num_queries, self.sul.num_steps
+        sul_outputs = self.sul.query_batch(test_cases)
+        self.num_queries += self.sul.num_queries - num_queries
+        self.num_steps += self.sul.num_steps - num_steps
+        self.sul.num_queries, self.sul.num_steps = num_queries, num_steps
+
+        for test_case, out_sul in zip(test_cases, sul_outputs):
+            cex = self.compare_outputs(hypothesis, test_case, out_sul)
+            if cex is not None:
+                return cex
+
+        return None
+
+    def compare_outputs(self, hypothesis, test_case, outputs):
+        """
+        Compares outputs observed on the SUL with the outputs of the hypothesis.
+
+        Args:
+
+            hypothesis: current hypothesis
+
+            test_case: input sequence
+
+            outputs: outputs of the SUL for the test case
+
+        Returns:
+
+            shortest prefix of the test case on which the SUL and hypothesis disagree, None if they agree
+
+        """
+        out_hyp = hypothesis.compute_output_seq(hypothesis.initial_state, test_case)
+        for ind, (o_hyp, o_sul) in enumerate(zip(out_hyp, outputs)):
+            if o_hyp != o_sul:
+                return tuple(test_case[:ind + 1])
+        return None
+
+    def get_cached_outputs(self, test_case):
+        """
+        Returns outputs of the test case if the SUL is a CacheSUL and test case is in its cache, None otherwise.
+        Test cases found in the cache are counted in num_cached_queries and num_cached_steps.
+        """
+        if isinstance(self.sul, CacheSUL) and test_case:
+            outputs = self.sul.cache.in_cache(tuple(test_case))
+            if outputs is not None:
+                self.num_cached_queries += 1
+                self.num_cached_steps += len(test_case)
+            return outputs
+        return None
+
+    def check_test_case(self, hypothesis, test_case):
+        """
+        Checks a test case against the cache of the SUL first. If the whole test case is cached, the cached outputs
+        are compared with the hypothesis without interaction with the SUL, otherwise the test case is executed on
+        the SUL.
+
+        Args:
+
+            hypothesis: current hypothesis
+
+            test_case: input sequence
+
+        Returns:
+
+            shortest prefix of the test case on which the SUL and hypothesis disagree, None if they agree
+
+        """
+        cached_outputs = self.get_cached_outputs(test_case)
+        if cached_outputs is not None:
+            return self.compare_outputs(hypothesis, test_case, cached_outputs)
+        return self.execute_test_case(hypothesis, test_case)
+
+    def check_test_cases(self, hypothesis, test_cases, return_shortest=False, on_checked=None):
+        """
+        Checks lazily generated test cases until a counterexample is found, see check_test_case.
+
+        If the SUL is a ParallelSUL, or a CacheSUL wrapping a ParallelSUL, test cases that are not cached are executed
+        concurrently on its replicas. Expected outputs are computed from the hypothesis while test cases are taken
+        from the generator, so the hypothesis is only accessed by the calling thread. Once a counterexample is found,
+        outstanding test cases are cancelled and the traces of executed test cases are added to the cache.
+        As test cases are taken from the generator ahead of their execution, oracles should not update their test
+        budget in the generator, but in on_checked, which is only called for test cases that were checked.
+
+        Args:
+
+            hypothesis: current hypothesis
+
+            test_cases: iterable of input sequences
+
+            return_shortest: if True and test cases are executed in parallel, the shortest counterexample among the
+                test cases in flight is returned instead of the first one (Default value = False)
+
+            on_checked: callable called with the index of a checked test case in test_cases and the number of its
+                inputs that were checked, i.e. the length of the test case or of the counterexample found with it
+                (Default value = None)
+
+        Returns:
+
+            counterexample, None if hypothesis passes all test cases
+
+        """
+        from aalpy.base.ParallelSUL import ParallelSUL
+
+        parallel_sul = self.sul.sul if isinstance(self.sul, CacheSUL) else self.sul
+        if not isinstance(parallel_sul, ParallelSUL):
+            for index, test_case in enumerate(test_cases):
+                cex = self.check_test_case(hypothesis, test_case)
+                if on_checked is not None:
+                    on_checked(index, len(test_case) if cex is None else len(cex))
+                if cex is not None:
+                    return cex
+            return None
+
+        cached_cex = None
+        # indices in test_cases of the test cases passed to the ParallelSUL
+        uncached_indices = []
+
+        def uncached_test_cases():
+            nonlocal cached_cex
+            for index, test_case in enumerate(test_cases):
+                cached_outputs = self.get_cached_outputs(test_case)
+                if cached_outputs is None:
+                    uncached_indices.append(index)
+                    yield test_case, hypothesis.compute_output_seq(hypothesis.initial_state, test_case)
+                    continue
+                cached_cex = self.compare_outputs(hypothesis, test_case, cached_outputs)
+                if on_checked is not None:
+                    on_checked(index, len(test_case) if cached_cex is None else len(cached_cex))
+                if cached_cex is not None:
+                    return
+
+        # as in execute_test_batch, queries and steps are accounted to the oracle instead of the SUL
+        sul_num_queries, sul_num_steps = self.sul.num_queries, self.sul.num_steps
+        num_queries, num_steps = parallel_sul.num_queries, parallel_sul.num_steps
+        cex, traces = parallel_sul.execute_tests(uncached_test_cases(), return_shortest)
+        self.num_queries += parallel_sul.num_queries - num_queries
+        self.num_steps += parallel_sul.num_steps - num_steps
+        self.sul.num_queries, self.sul.num_steps = sul_num_queries, sul_num_steps
+
+        for index, inputs, outputs in traces:
+            if on_checked is not None:
+                on_checked(uncached_indices[index], len(inputs))
+            if isinstance(self.sul, CacheSUL):
+                self.sul.cache.reset()
+                for i, o in zip(inputs, outputs):
+                    self.sul.cache.step_in_cache(i, o)
+
+        if cex is None or (cached_cex is not None and return_shortest and len(cached_cex) < len(cex)):
+            return cached_cex
+        return cex
+
+    def execute_test_suite(self, hypothesis, test_suite, executed_tests: WordTrie, batch_size=None):
+        """
+        Executes test cases of a lazily generated test suite until a counterexample is found.
+        Test cases that are prefixes of already executed test cases are skipped, and test cases whose outputs are in
+        the cache of the SUL are checked against the hypothesis without interaction with the SUL.
+        If batch size is set, test cases are collected in batches and only the test cases that are not prefixes of
+        other test cases in the batch are submitted with a batch query. Otherwise, test cases are executed step by
+        step.
+
+        Args:
+
+            hypothesis: current hypothesis
+
+            test_suite: iterable of test cases
+
+            executed_tests: trie of passed test cases, updated with the test cases passed in this call
+
+            batch_size: number of test cases in a batch (Default value = None)
+
+        Returns:
+
+            counterexample, None if hypothesis passes all test cases
+
+        """
+        batch, batch_trie = [], WordTrie()
+        for test_case in test_suite:
+            if test_case in executed_tests or test_case in batch_trie:
+                continue
+
+            cached_outputs = self.get_cached_outputs(test_case)
+            if cached_outputs is not None:
+                cex = self.compare_outputs(hypothesis, test_case, cached_outputs)
+                if cex is not None:
+                    return cex
+                executed_tests.add(test_case)
+                continue
+
+            if not batch_size:
+                cex = self.execute_test_case(hypothesis, test_case)
+                if cex is not None:
+                    return cex
+                executed_tests.add(test_case)
+                continue
+
+            batch.append(test_case)
+            batch_trie.add(test_case)
+            if len(batch) == batch_size:
+                cex = self._execute_deduplicated_batch(hypothesis, batch, batch_trie, executed_tests)
+                if cex is not None:
+                    return cex
+                batch, batch_trie = [], WordTrie()
+
+        if batch:
+            return self._execute_deduplicated_batch(hypothesis, batch, batch_trie, executed_tests)
+        return None
+
+    def _execute_deduplicated_batch(self, hypothesis, batch, batch_trie, executed_tests):
+        maximal_test_cases = [test_case for test_case in batch if batch_trie.is_maximal(test_case)]
+        cex = self.execute_test_batch(hypothesis, maximal_test_cases)
+        if cex is None:
+            executed_tests.update(maximal_test_cases)
+        return cex
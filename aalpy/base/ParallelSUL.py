@@ -0,0 +1,274 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from math import ceil
+from queue import Queue
+from threading import Event
+
+from aalpy.base.SUL import SUL
+
+executor_types = ['thread', 'process']
+
+# SUL replica owned by a worker process, created by _init_worker_sul
+_worker_sul = None
+
+
+def _init_worker_sul(sul_factory):
+    global _worker_sul
+    _worker_sul = sul_factory()
+
+
+def _query_in_worker(words):
+    return [list(_worker_sul.query(word)) for word in words]
+
+
+def _execute_tests(sul, tests, stop_event=None):
+    """
+    Executes test cases step by step until the first output that differs from the expected output. The remaining
+    test cases of the chunk are skipped after a failing test case or once stop_event is set.
+
+    Returns:
+
+        list of executed traces (index, inputs, outputs, failed)
+    """
+    traces = []
+    for index, inputs, expected_outputs in tests:
+        if stop_event is not None and stop_event.is_set():
+            break
+        outputs, failed = [], False
+        sul.pre()
+        try:
+            for letter, expected_output in zip(inputs, expected_outputs):
+                outputs.append(sul.step(letter))
+                if outputs[-1] != expected_output:
+                    failed = True
+                    break
+        finally:
+            sul.post()
+        traces.append((index, inputs[:len(outputs)], outputs, failed))
+        if failed:
+            break
+    return traces
+
+
+def _execute_tests_in_worker(tests):
+    return _execute_tests(_worker_sul, tests)
+
+
+class ParallelSUL(SUL):
+    """
+    System under learning that owns multiple independent replicas of a SUL and distributes batched membership
+    queries across them. Replicas are created by a factory and are either used by a pool of threads (suitable for
+    SULs that release the GIL, e.g. ones that communicate with real systems over the network) or live in worker
+    processes (suitable for CPU-bound SULs, e.g. simulators implemented in Python).
+
+    Equivalence oracles that generate test cases execute them concurrently on all replicas with execute_tests, see
+    Oracle.check_test_cases. Step-by-step interaction (pre/step/post) is performed on an additional replica owned by
+    the main process. Wrapping ParallelSUL in CacheSUL keeps caching and non-determinism checks intact.
+    """
+
+    def __init__(self, sul_factory, num_workers=4, executor='thread', chunk_size=None):
+        """
+        Args:
+
+            sul_factory: callable without arguments that returns a new, independent SUL instance. If executor is
+                'process', factory has to be picklable, e.g. a module-level function or a class
+
+            num_workers: number of SUL replicas that execute queries in parallel
+
+            executor: either 'thread' or 'process' (Default value = 'thread')
+
+            chunk_size: number of words sent to a replica at once. If None, batches are split so that each
+                worker receives several chunks (Default value = None)
+        """
+        super().__init__()
+        assert executor in executor_types
+        assert num_workers > 0
+
+        self.sul_factory = sul_factory
+        self.num_workers = num_workers
+        self.executor_type = executor
+        self.chunk_size = chunk_size
+
+        self.sul = sul_factory()
+
+        if executor == 'thread':
+            self.replicas = Queue()
+            for _ in range(num_workers):
+                self.replicas.put(sul_factory())
+            self.executor = ThreadPoolExecutor(max_workers=num_workers)
+        else:
+            self.replicas = None
+            self.executor = ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker_sul,
+                                                initargs=(sul_factory,))
+
+    def query(self, word: tuple) -> list:
+        """
+        Performs a membership query on the SUL replica owned by the main process.
+
+        Args:
+
+            word: membership query (word consisting of letters/inputs)
+
+        Returns:
+
+            list of outputs, where the i-th output corresponds to the output of the system after the i-th input
+
+        """
+        out = self.sul.query(word)
+        self.num_queries += 1
+        self.num_steps += len(word)
+        return out
+
+    def query_batch(self, words: list) -> list:
+        """
+        Splits the batch into chunks and executes the chunks concurrently on all SUL replicas.
+
+        Args:
+
+            words: list of membership queries (words consisting of letters/inputs)
+
+        Returns:
+
+            list of output lists, where the i-th list corresponds to the outputs of the i-th word
+
+        """
+        if not words:
+            return []
+
+        chunk_size = self.chunk_size or ceil(len(words) / (self.num_workers * 4))
+        chunks = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+
+        if self.executor_type == 'thread':
+            futures = [self.executor.submit(self._query_on_replica, chunk) for chunk in chunks]
+        else:
+            futures = [self.executor.submit(_query_in_worker, chunk) for chunk in chunks]
+
+        outputs = []
+        for future in futures:
+            outputs.extend(future.result())
+
+        self.num_queries += len(words)
+        self.num_steps += sum(len(word) for word in words)
+        return outputs
+
+    def execute_tests(self, test_suite, return_shortest=False, chunk_size=None):
+        """
+        Executes test cases concurrently on all SUL replicas. Each test case is paired with its expected outputs and
+        executed until the first output that differs from them. Test cases are taken lazily from test_suite, at most
+        two chunks per replica are in flight.
+
+        Once a test case fails, no further test cases are taken from test_suite. Chunks that have not started are
+        cancelled. Replicas in threads also skip the rest of their chunk, while worker processes finish their current
+        chunk. The traces of all executed test cases are returned, so that they can be added to a cache, and so that
+        test cases that were taken from test_suite but not executed can be told apart from executed ones.
+
+        Args:
+
+            test_suite: iterable of pairs (input sequence, expected output sequence)
+
+            return_shortest: if True, all chunks in flight are completed and the shortest failing test case is
+                returned, otherwise the failing test case that was generated first (Default value = False)
+
+            chunk_size: number of test cases sent to a replica at once, if None the chunk_size of the SUL is used
+                and 8 test cases if it is not set either (Default value = None)
+
+        Returns:
+
+            tuple (counterexample, traces), where counterexample is the shortest prefix of a failing test case on
+            which the outputs differ or None, and traces is a list of (index, inputs, outputs) triples of executed test
+            cases, ordered by the index of the test case in test_suite
+
+        """
+        chunk_size = chunk_size or self.chunk_size or 8
+        test_suite = ((index, inputs, expected_outputs) for index, (inputs, expected_outputs) in enumerate(test_suite))
+        stop_event = Event() if self.executor_type == 'thread' else None
+
+        pending = set()
+        results = []
+        exhausted, found_cex, completed = False, False, False
+        try:
+            while True:
+                while not exhausted and not found_cex and len(pending) < 2 * self.num_workers:
+                    chunk = list(islice(test_suite, chunk_size))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    if self.executor_type == 'thread':
+                        future = self.executor.submit(self._execute_tests_on_replica, chunk, stop_event)
+                    else:
+                        future = self.executor.submit(_execute_tests_in_worker, chunk)
+                    pending.add(future)
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk_traces = future.result()
+                    pending.remove(future)
+                    results.extend(chunk_traces)
+                    found_cex = found_cex or any(failed for _, _, _, failed in chunk_traces)
+
+                if found_cex and not return_shortest:
+                    break
+            completed = True
+        finally:
+            if stop_event is not None:
+                stop_event.set()
+            for future in pending:
+                future.cancel()
+            # chunks that already started are completed, their steps were performed on the SUL
+            for future in pending:
+                if future.cancelled():
+                    continue
+                try:
+                    results.extend(future.result())
+                except Exception:
+                    # errors of remaining chunks must not replace the error that is already being raised
+                    if completed:
+                        raise
+
+        results.sort(key=lambda trace: trace[0])
+        self.num_queries += len(results)
+        self.num_steps += sum(len(inputs) for _, inputs, _, _ in results)
+
+        counterexamples = [inputs for _, inputs, _, failed in results if failed]
+        counterexample = None
+        if counterexamples:
+            counterexample = min(counterexamples, key=len) if return_shortest else counterexamples[0]
+        return counterexample, [(index, inputs, outputs) for index, inputs, outputs, _ in results]
+
+    def _execute_tests_on_replica(self, tests, stop_event):
+        sul = self.replicas.get()
+        try:
+            return _execute_tests(sul, tests, stop_event)
+        finally:
+            self.replicas.put(sul)
+
+    def _query_on_replica(self, words):
+        sul = self.replicas.get()
+        try:
+            return [sul.query(word) for word in words]
+        finally:
+            self.replicas.put(sul)
+
+    def pre(self):
+        self.sul.pre()
+
+    def post(self):
+        self.sul.post()
+
+    def step(self, letter):
+        return self.sul.step(letter)
+
+    def shutdown(self):
+        """
+        Shuts down the worker threads/processes. Queries executed after shutdown raise an error.
+        """
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
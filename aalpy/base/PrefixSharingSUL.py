@@ -0,0 +1,157 @@
+from aalpy.base.SUL import SUL
+
+
+class _QueryTrieNode(object):
+    __slots__ = ['children', 'output']
+
+    def __init__(self):
+        self.children = {}
+        self.output = None
+
+
+class PrefixSharingSUL(SUL):
+    """
+    System under learning that plans the execution of batched membership queries. A batch of words is arranged in a
+    trie, so that every shared prefix is executed only once. Words that are prefixes of other words in the batch are
+    answered without additional interaction.
+
+    If the wrapped SUL implements snapshot and restore, the trie is executed depth-first after a single reset, and the
+    SUL is restored to the snapshot of a branching node when backtracking. Otherwise, every maximal word of the trie
+    is executed from the initial state.
+    Number of queries corresponds to the number of resets and number of steps to the number of executed inputs.
+    """
+
+    def __init__(self, sul: SUL, use_snapshots=None):
+        """
+        Args:
+
+            sul: system under learning
+
+            use_snapshots: if True, snapshot and restore methods of the SUL are used for backtracking. If None,
+                snapshots are used if the SUL implements them (Default value = None)
+        """
+        super().__init__()
+        self.sul = sul
+        self.use_snapshots = sul.supports_snapshots() if use_snapshots is None else use_snapshots
+        self.num_restores = 0
+
+    def query(self, word: tuple) -> list:
+        out = self.sul.query(word)
+        self.num_queries += 1
+        self.num_steps += len(word)
+        return out
+
+    def query_batch(self, words: list) -> list:
+        """
+        Executes a batch of membership queries arranged in a trie.
+
+        Args:
+
+            words: list of membership queries (words consisting of letters/inputs)
+
+        Returns:
+
+            list of output lists, where the i-th list corresponds to the outputs of the i-th word
+
+        """
+        root = _QueryTrieNode()
+        for word in words:
+            node = root
+            for letter in word:
+                if letter not in node.children:
+                    node.children[letter] = _QueryTrieNode()
+                node = node.children[letter]
+
+        # empty word is answered by the system in its initial state
+        empty_word_output = self.query(()) if any(len(word) == 0 for word in words) else None
+
+        if root.children:
+            if self.use_snapshots:
+                self._execute_depth_first(root)
+            else:
+                self._execute_maximal_words(root)
+
+        outputs = []
+        for word in words:
+            if not word:
+                outputs.append(list(empty_word_output))
+                continue
+            node, word_outputs = root, []
+            for letter in word:
+                node = node.children[letter]
+                word_outputs.append(node.output)
+            outputs.append(word_outputs)
+
+        return outputs
+
+    def _execute_depth_first(self, root):
+        """
+        Executes all paths of the trie after a single reset, restoring the SUL state in branching nodes.
+        """
+        self.sul.pre()
+        self.num_queries += 1
+
+        # stack of (input, node reached with the input, snapshot to restore before executing the input)
+        stack = []
+        self._push_children(root, stack)
+        while stack:
+            letter, node, snapshot = stack.pop()
+            if snapshot is not None:
+                self.sul.restore(snapshot)
+                self.num_restores += 1
+
+            node.output = self.sul.step(letter)
+            self.num_steps += 1
+            self._push_children(node, stack)
+
+        self.sul.post()
+
+    def _push_children(self, node, stack):
+        children = list(node.children.items())
+        snapshot = self.sul.snapshot() if len(children) > 1 else None
+        # first child is executed right after its parent, others are executed after restoring the snapshot
+        for ind in reversed(range(len(children))):
+            letter, child = children[ind]
+            stack.append((letter, child, snapshot if ind > 0 else None))
+
+    def _execute_maximal_words(self, root):
+        """
+        Executes every word that is not a prefix of another word in the trie from the initial state.
+        """
+        maximal_words = []
+        stack = [((), root)]
+        while stack:
+            prefix, node = stack.pop()
+            if not node.children:
+                maximal_words.append(prefix)
+            for letter, child in node.children.items():
+                stack.append((prefix + (letter,), child))
+
+        num_queries, num_steps = self.sul.num_queries, self.sul.num_steps
+        sul_outputs = self.sul.query_batch(maximal_words)
+        self.num_queries += self.sul.num_queries - num_queries
+        self.num_steps += self.sul.num_steps - num_steps
+
+        for word, word_outputs in zip(maximal_words, sul_outputs):
+            node = root
+            for letter, output in zip(word, word_outputs):
+                node = node.children[letter]
+                node.output = output
+
+    def pre(self):
+        self.sul.pre()
+
+    def post(self):
+        self.sul.post()
+
+    def step(self, letter):
+        return self.sul.step(letter)
+
+    def snapshot(self):
+        return self.sul.snapshot()
+
+    def restore(self, snapshot):
+        self.sul.restore(snapshot)
+
+    def supports_snapshots(self) -> bool:
+        return self.sul.supports_snapshots()
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 
-from aalpy.base.CacheTree import CacheTree, CacheDict
+from aalpy.base.CacheTree import CacheTree, CacheDict, PersistentCacheTree, ArrayCacheTree
+
+cache_types = {'tree': CacheTree, 'dict': CacheDict, 'array': ArrayCacheTree}
 
 
 class SUL(ABC):
@@ -40,6 +42,55 @@ class SUL(ABC):
         self.num_steps += len(word)
         return out
 
+    def query_batch(self, words: list) -> list:
+        """
+        Performs membership queries for a batch of words. By default, every word is executed with the query method.
+        SULs that can answer many words at once, e.g. SULs backed by a fast native simulator or a remote test
+        harness, should override this method to execute the whole batch in one round trip.
+        Overriding implementations should update num_queries and num_steps according to the interaction with the
+        system.
+
+        Args:
+
+            words: list of membership queries (words consisting of letters/inputs)
+
+        Returns:
+
+            list of output lists, where the i-th list corresponds to the outputs of the i-th word
+
+        """
+        return [self.query(word) for word in words]
+
+    def snapshot(self):
+        """
+        Captures the current state of the system, so that the execution can later be resumed from it with the
+        restore method. Optional; SULs whose state can be copied cheaper than it can be reached by reset and replay
+        of inputs should implement it together with restore.
+
+        Returns:
+
+            object describing the current state of the system
+
+        """
+        raise NotImplementedError
+
+    def restore(self, snapshot):
+        """
+        Resumes the system from a state previously captured with the snapshot method.
+
+        Args:
+
+            snapshot: object returned by the snapshot method
+
+        """
+        raise NotImplementedError
+
+    def supports_snapshots(self) -> bool:
+        """
+        Returns True if the SUL implements the snapshot and restore methods.
+        """
+        return type(self).snapshot is not SUL.snapshot and type(self).restore is not SUL.restore
+
     def io_query(self, word : tuple):
         return list(zip(word, self.query(word)))
 
@@ -123,12 +174,32 @@ class CacheSUL(SUL):
     """
     System under learning that keeps a multiset of all queries in memory.
     This multiset/cache is encoded as a tree.
+    If a cache path is given, the cache tree is persisted in a SQLite database, so that it can be reused by
+    subsequent learning runs.
     """
 
-    def __init__(self, sul: SUL, cache_type='tree'):
+    def __init__(self, sul: SUL, cache_type='tree', cache_path=None):
+        """
+        Args:
+
+            sul: system under learning
+
+            cache_type: one of 'tree', 'dict' or 'array'. 'array' uses a memory-compact tree stored in flat arrays
+                of integer-encoded inputs and outputs, suitable for caches with millions of steps
+                (Default value = 'tree')
+
+            cache_path: path to a database in which the cache tree is persisted. If the database exists, the cache is
+                warm-started with its content. Its content is unpickled, so only use databases from trusted
+                sources. If set, cache_type is ignored. (Default value = None)
+
+        """
         super().__init__()
         self.sul = sul
-        self.cache = CacheTree() if cache_type == 'tree' else CacheDict()
+        if cache_path is not None:
+            self.cache = PersistentCacheTree(cache_path)
+        else:
+            assert cache_type in cache_types
+            self.cache = cache_types[cache_type]()
 
     def query(self, word):
         """
@@ -162,6 +233,72 @@ class CacheSUL(SUL):
         self.num_steps += len(word)
         return out
 
+    def query_batch(self, words: list) -> list:
+        """
+        Performs membership queries for a batch of words. Words that are cached, duplicated in the batch, or that are
+        prefixes of other words in the batch are not forwarded to the SUL. All remaining words are submitted to the
+        query_batch method of the SUL at once.
+
+        Args:
+
+            words: list of membership queries (words consisting of letters/inputs)
+
+        Returns:
+
+            list of output lists, where the i-th list corresponds to the outputs of the i-th word
+
+        """
+        outputs = [None] * len(words)
+        deferred = []
+        uncached = dict()
+        for ind, word in enumerate(words):
+            word = tuple(word)
+            cached_query = self.cache.in_cache(word)
+            if cached_query:
+                self.num_cached_queries += 1
+                outputs[ind] = cached_query
+            else:
+                uncached.setdefault(word, []).append(ind)
+
+        # longest words first, so that words that are prefixes of already scheduled words can be answered from cache
+        to_query = []
+        prefix_tree = dict()
+        for word in sorted(uncached.keys(), key=len, reverse=True):
+            node, is_prefix = prefix_tree, True
+            for letter in word:
+                if letter not in node:
+                    is_prefix = False
+                    node[letter] = dict()
+                node = node[letter]
+            if is_prefix and word:
+                deferred.append(word)
+            else:
+                to_query.append(word)
+
+        # interaction is counted by the SUL, as it may execute the batch with fewer resets and steps
+        num_queries, num_steps = self.sul.num_queries, self.sul.num_steps
+        sul_outputs = self.sul.query_batch(to_query)
+        self.num_queries += self.sul.num_queries - num_queries
+        self.num_steps += self.sul.num_steps - num_steps
+
+        for word, out in zip(to_query, sul_outputs):
+            # add input/outputs to tree
+            self.cache.reset()
+            for i, o in zip(word, out):
+                self.cache.step_in_cache(i, o)
+
+            self.num_cached_queries += len(uncached[word]) - 1
+            for ind in uncached[word]:
+                outputs[ind] = out
+
+        for word in deferred:
+            out = self.cache.in_cache(word)
+            self.num_cached_queries += len(uncached[word])
+            for ind in uncached[word]:
+                outputs[ind] = out
+
+        return outputs
+
     def pre(self):
         """
         Reset the system under learning and current node in the cache tree.
@@ -188,3 +325,18 @@ class CacheSUL(SUL):
         out = self.sul.step(letter)
         self.cache.step_in_cache(letter, out)
         return out
+
+    def flush_cache(self):
+        """
+        Writes all observations that are not yet persisted to the database. Only relevant for persistent caches.
+        """
+        if isinstance(self.cache, PersistentCacheTree):
+            self.cache.flush()
+
+    def close_cache(self):
+        """
+        Writes all observations that are not yet persisted to the database and closes it. Only relevant for persistent
+        caches, which must not be used afterwards.
+        """
+        if isinstance(self.cache, PersistentCacheTree):
+            self.cache.close()
@@ -0,0 +1,191 @@
+from collections import deque
+
+
+class SplittingTreeNode(object):
+    __slots__ = ['parent', 'depth', 'sequence', 'children', 'states']
+
+    def __init__(self, parent, states):
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        # sequence on which all children produce pairwise different outputs, set once the node is split
+        self.sequence = None
+        self.children = []
+        self.states = states
+
+    def is_leaf(self):
+        return not self.children
+
+
+class SplittingTree:
+    """
+    Splitting tree of a deterministic automaton computed by partition refinement. Leaves of the tree are the blocks of
+    the coarsest partition of equivalent states and every inner node is labeled with a sequence on which states of
+    its children produce pairwise different outputs.
+
+    After the initial partition by outputs, a block is split on input a if its a-successors are in different blocks,
+    using a followed by the sequence of the lowest common ancestor of the successor blocks. Only blocks that have
+    transitions into the smaller parts of a split block are reconsidered (Hopcroft's "process the smaller half"
+    rule). The tree yields minimization, separating sequences for each pair of states, characterization sets and
+    state identifiers in a single pass.
+    """
+
+    def __init__(self, automaton, char_set_init=None, alphabet=None):
+        """
+        Args:
+
+            automaton: input complete deterministic automaton
+
+            char_set_init: sequences used for the initial partition, besides the empty sequence and single inputs
+
+            alphabet: input alphabet, if None the input alphabet of the automaton is used
+        """
+        self.automaton = automaton
+        self.states = list(automaton.states)
+        self.alphabet = alphabet if alphabet is not None else automaton.get_input_alphabet()
+        self.char_set_init = list(char_set_init) if char_set_init else []
+
+        self.state_index = {state: ind for ind, state in enumerate(self.states)}
+        self.successors = {a: [self.state_index[state.transitions[a]] for state in self.states]
+                           for a in self.alphabet}
+        self.predecessors = {a: [[] for _ in self.states] for a in self.alphabet}
+        for a, successors in self.successors.items():
+            for state_ind, successor_ind in enumerate(successors):
+                self.predecessors[a][successor_ind].append(state_ind)
+
+        self.root = SplittingTreeNode(None, list(range(len(self.states))))
+        self.leaf_of = [self.root] * len(self.states)
+        self.inner_nodes = []
+
+        self._build()
+
+    def _build(self):
+        worklist = deque()
+
+        # initial partition by the outputs of the empty sequence, initial sequences and single inputs
+        leaves = [self.root]
+        for seq in [()] + self.char_set_init + [(a,) for a in self.alphabet]:
+            new_leaves = []
+            for leaf in leaves:
+                if len(leaf.states) > 1:
+                    outputs = [tuple(self.automaton.compute_output_seq(self.states[s], seq)) for s in leaf.states]
+                    children = self._split(leaf, outputs, seq)
+                    new_leaves.extend(children if children else [leaf])
+                else:
+                    new_leaves.append(leaf)
+            leaves = new_leaves
+
+        worklist.extend(leaf for leaf in leaves if len(leaf.states) > 1)
+        while worklist:
+            leaf = worklist.popleft()
+            if not leaf.is_leaf() or len(leaf.states) < 2:
+                continue
+
+            for a in self.alphabet:
+                successors = self.successors[a]
+                successor_leaves = [self.leaf_of[successors[s]] for s in leaf.states]
+                first_leaf = successor_leaves[0]
+                if all(successor_leaf is first_leaf for successor_leaf in successor_leaves):
+                    continue
+
+                lca = self._lowest_common_ancestor(set(successor_leaves))
+                keys = [id(self._ancestor_at_depth(successor_leaf, lca.depth + 1))
+                        for successor_leaf in successor_leaves]
+                children = self._split(leaf, keys, (a,) + lca.sequence)
+
+                # blocks with transitions into the largest child are reconsidered if they also lead into other ones
+                largest_child = max(children, key=lambda child: len(child.states))
+                for child in children:
+                    if len(child.states) > 1:
+                        worklist.append(child)
+                    if child is largest_child:
+                        continue
+                    for state in child.states:
+                        for b in self.alphabet:
+                            for predecessor in self.predecessors[b][state]:
+                                predecessor_leaf = self.leaf_of[predecessor]
+                                if len(predecessor_leaf.states) > 1:
+                                    worklist.append(predecessor_leaf)
+                break
+
+    def _split(self, leaf, keys, sequence):
+        """
+        Splits the leaf according to keys, where the i-th key corresponds to the i-th state of the leaf.
+        Returns the new leaves, or None if all keys are equal.
+        """
+        blocks = dict()
+        for state, key in zip(leaf.states, keys):
+            blocks.setdefault(key, []).append(state)
+        if len(blocks) == 1:
+            return None
+
+        leaf.sequence = sequence
+        for block in blocks.values():
+            child = SplittingTreeNode(leaf, block)
+            leaf.children.append(child)
+            for state in block:
+                self.leaf_of[state] = child
+        leaf.states = None
+        self.inner_nodes.append(leaf)
+        return leaf.children
+
+    @staticmethod
+    def _ancestor_at_depth(node, depth):
+        while node.depth > depth:
+            node = node.parent
+        return node
+
+    def _lowest_common_ancestor(self, nodes):
+        nodes = iter(nodes)
+        lca = next(nodes)
+        for node in nodes:
+            if lca.depth > node.depth:
+                lca = self._ancestor_at_depth(lca, node.depth)
+            else:
+                node = self._ancestor_at_depth(node, lca.depth)
+            while lca is not node:
+                lca, node = lca.parent, node.parent
+        return lca
+
+    def get_blocks(self):
+        """
+        Returns the partition of states into blocks of equivalent states.
+        """
+        blocks = dict()
+        for leaf in self.leaf_of:
+            if id(leaf) not in blocks:
+                blocks[id(leaf)] = [self.states[s] for s in leaf.states]
+        return list(blocks.values())
+
+    def separates_all_states(self):
+        """
+        Returns True if all states are pairwise distinguishable, i.e., if the automaton is minimal.
+        """
+        return all(len(leaf.states) == 1 for leaf in self.leaf_of)
+
+    def get_separating_sequence(self, state1, state2):
+        """
+        Returns a sequence on which the two states produce different outputs, or None if they are equivalent.
+        """
+        leaf1, leaf2 = self.leaf_of[self.state_index[state1]], self.leaf_of[self.state_index[state2]]
+        if leaf1 is leaf2:
+            return None
+        return self._lowest_common_ancestor([leaf1, leaf2]).sequence
+
+    def get_characterization_set(self):
+        """
+        Returns the initial sequences and sequences of all inner nodes. The set is suffix-closed up to the initial
+        sequences, as the sequence of every inner node extends the sequence of another inner node.
+        """
+        return list(dict.fromkeys(self.char_set_init + [node.sequence for node in self.inner_nodes]))
+
+    def get_state_identifier(self, state):
+        """
+        Returns sequences that separate the state from all states that are not equivalent to it. These are the
+        sequences of all ancestors of the leaf containing the state.
+        """
+        identifier = []
+        node = self.leaf_of[self.state_index[state]].parent
+        while node is not None:
+            identifier.append(node.sequence)
+            node = node.parent
+        return list(reversed(identifier))
@@ -0,0 +1,69 @@
+class WordTrie:
+    """
+    Prefix trie of test cases used by equivalence oracles to avoid re-executing test cases. A test case is contained
+    in the trie if it is a prefix of an added test case, as the outputs of its prefixes are observed when a test case
+    is executed.
+
+    Memory of the trie is bounded by the maximum number of nodes. If adding a test case would exceed it, the trie is
+    cleared. Clearing only causes test cases to be executed again, it never causes test cases to be skipped.
+    """
+
+    def __init__(self, max_nodes=None):
+        """
+        Args:
+
+            max_nodes: maximum number of nodes in the trie, unbounded if None (Default value = None)
+        """
+        self.max_nodes = max_nodes
+        self.root = dict()
+        self.num_nodes = 0
+
+    def add(self, test_case):
+        """
+        Adds a test case to the trie.
+
+        Args:
+
+            test_case: sequence of inputs
+
+        """
+        if self.max_nodes is not None and self.num_nodes + len(test_case) > self.max_nodes:
+            self.clear()
+
+        node = self.root
+        for letter in test_case:
+            child = node.get(letter)
+            if child is None:
+                child = dict()
+                node[letter] = child
+                self.num_nodes += 1
+            node = child
+
+    def update(self, test_cases):
+        for test_case in test_cases:
+            self.add(test_case)
+
+    def is_maximal(self, test_case):
+        """
+        Returns True if the test case is in the trie and it is not a proper prefix of another test case in the trie.
+        """
+        node = self._get_node(test_case)
+        return node is not None and not node
+
+    def clear(self):
+        self.root = dict()
+        self.num_nodes = 0
+
+    def _get_node(self, test_case):
+        node = self.root
+        for letter in test_case:
+            node = node.get(letter)
+            if node is None:
+                return None
+        return node
+
+    def __contains__(self, test_case):
+        return self._get_node(test_case) is not None
+
+    def __len__(self):
+        return self.num_nodes
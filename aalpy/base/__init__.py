@@ -1,3 +1,7 @@
 from .Automaton import Automaton, AutomatonState, DeterministicAutomaton
 from .Oracle import Oracle
 from .SUL import SUL
+from .ParallelSUL import ParallelSUL
+from .PrefixSharingSUL import PrefixSharingSUL
+from .WordTrie import WordTrie
+from .SplittingTree import SplittingTree
@@ -10,7 +10,8 @@ def run_adaptive_Lsharp(alphabet: list, sul: SUL, references: list, eq_oracle: O
                         extension_rule=None, separation_rule="SepSeq",
                         rebuilding=True, state_matching="Approximate",
                         samples=None, max_learning_rounds=None,
-                        cache_and_non_det_check=True, return_data=False, print_level=2):
+                        cache_and_non_det_check=True, cache_path=None, compact_observation_tree=False,
+                        return_data=False, print_level=2):
     """
     Based on ''State Matching and Multiple References in Adaptive Active Automata Learning'' from Kruger, Junges and Rot.
     The algorithm learns a Mealy machine using a set of references. These references are used by two procedures 
@@ -50,6 +51,15 @@ def run_adaptive_Lsharp(alphabet: list, sul: SUL, references: list, eq_oracle: O
 
         cache_and_non_det_check: Use caching and non-determinism checks (Default value = True)
 
+        cache_path: path to a SQLite database in which the cache is persisted. Observations stored in the database
+            are reused, which allows resuming interrupted runs and sharing observations between learning runs on
+            the same system. Inputs and outputs are unpickled when the database is loaded, so only use databases
+            from trusted sources (Default value = None)
+
+        compact_observation_tree: if True, the observation tree is stored in integer arrays instead of node objects,
+            which reduces its memory footprint to roughly 24 bytes per node. Useful for large alphabets and long
+            learning runs (Default value = False)
+
         return_data: if True, a map containing all information(runtime/#queries/#steps) will be returned
             (Default value = False)
 
@@ -70,9 +80,9 @@ def run_adaptive_Lsharp(alphabet: list, sul: SUL, references: list, eq_oracle: O
     if not rebuilding and not state_matching:
         raise Exception(f"Use L# instead of Adaptive L# if rebuilding is set to False and state matching to None.")
 
-    if cache_and_non_det_check or samples is not None:
+    if cache_and_non_det_check or samples is not None or cache_path is not None:
         # Wrap the sul in the CacheSUL, so that all steps/queries are cached
-        sul = CacheSUL(sul)
+        sul = CacheSUL(sul, cache_path=cache_path)
         eq_oracle.sul = sul
 
         if samples:
@@ -81,7 +91,7 @@ def run_adaptive_Lsharp(alphabet: list, sul: SUL, references: list, eq_oracle: O
 
     ob_tree = AdaptiveObservationTree(alphabet, sul, references, automaton_type,
                                       extension_rule, separation_rule,
-                                      rebuilding, state_matching)
+                                      rebuilding, state_matching, compact_observation_tree)
     start_time = time.time()
     eq_query_time = 0
     learning_rounds = 0
@@ -117,6 +127,12 @@ def run_adaptive_Lsharp(alphabet: list, sul: SUL, references: list, eq_oracle: O
         cex_outputs = sul.query(cex)
         ob_tree.process_counter_example(hypothesis, cex, cex_outputs)
 
+    if cache_path is not None:
+        # the database was opened for this learning run
+        sul.close_cache()
+    elif isinstance(sul, CacheSUL):
+        sul.flush_cache()
+
     total_time = round(time.time() - start_time, 2)
     eq_query_time = round(eq_query_time, 2)
     learning_time = round(total_time - eq_query_time, 2)
@@ -128,6 +144,7 @@ def run_adaptive_Lsharp(alphabet: list, sul: SUL, references: list, eq_oracle: O
         'steps_learning': sul.num_steps,
         'queries_eq_oracle': eq_oracle.num_queries,
         'steps_eq_oracle': eq_oracle.num_steps,
+        'steps_eq_oracle_cached': eq_oracle.num_cached_steps,
         'learning_time': learning_time,
         'eq_oracle_time': eq_query_time,
         'total_time': total_time,
@@ -8,14 +8,15 @@ from aalpy.automata import Dfa, DfaState, MealyState, MealyMachine, MooreMachine
 
 
 class AdaptiveObservationTree(ObservationTree):
-    def __init__(self, alphabet, sul, references, automaton_type, extension_rule, separation_rule, rebuilding=True, state_matching="Approximate"):
+    def __init__(self, alphabet, sul, references, automaton_type, extension_rule, separation_rule, rebuilding=True,
+                 state_matching="Approximate", compact_tree=False):
         """
         Initialize the tree with a root node and the alphabet
         A temporary new basis is needed for the prioritized promotion rule
         The rebuild states counter counts the number of states found with rebuilding excluding the root
         The matching states counter counts the number of states found with match refinement and match separation (NOT prioritized separation)
         """
-        super().__init__(alphabet, sul, automaton_type, extension_rule, separation_rule)
+        super().__init__(alphabet, sul, automaton_type, extension_rule, separation_rule, compact_tree)
         self.references = references
         self.rebuild_states = 0
         self.matching_states = 0
@@ -290,7 +291,7 @@ class AdaptiveObservationTree(ObservationTree):
                     self.state_matcher.update_matching_basis(new_basis, self)
 
                 for frontier_state, new_basis_list in self.frontier_to_basis_dict.items():
-                    if not Apartness.states_are_apart(new_basis, frontier_state, self):
+                    if not self.apartness.states_are_apart(new_basis, frontier_state):
                         new_basis_list.append(new_basis)
                 break
 
@@ -305,10 +306,7 @@ class AdaptiveObservationTree(ObservationTree):
         if self.state_matching:
             self.extend_node_and_update_matching(inputs, outputs)
         else:
-            current_node = self.root
-            for input_val, output_val in zip(inputs, outputs):
-                current_node = current_node.extend_and_get(
-                    input_val, output_val)
+            self.extend_tree(inputs, outputs)
 
 
     def extend_node_and_update_matching(self, inputs, outputs):
@@ -317,19 +315,11 @@ class AdaptiveObservationTree(ObservationTree):
         Splits the input sequence in "already defined" part and the "new inputs" part
         If the inputs are not already present in the tree, we update the matching
         """
-        to_recalc = []
-        split = None
-        current_node = self.root
-        for i in range(0, len(inputs)):
-            input_val = inputs[i]
-            output_val = outputs[i]
-            if current_node in self.basis:
-                to_recalc.append(current_node)
-            if input_val not in current_node.successors and split is None:
-                split = (inputs[:i], inputs[i:])
-            current_node = current_node.extend_and_get(input_val, output_val)
-
-        if split:
+        path, known_prefix_len = self.extend_tree(inputs, outputs)
+        to_recalc = [node for node in path[:-1] if node in self.basis]
+
+        if known_prefix_len < len(inputs):
+            split = (inputs[:known_prefix_len], inputs[known_prefix_len:])
             self.state_matcher.update_matching(to_recalc, split, self)
 
     # Functions related to rebuilding the observation tree
@@ -419,23 +409,16 @@ class AdaptiveObservationTree(ObservationTree):
         if len(inputs) != len(outputs):
             raise ValueError("Inputs and outputs must have the same length.")
 
-        split = None
-        current_node = self.root
-        for i in range(0, len(inputs)):
-            input_val = inputs[i]
-            output_val = outputs[i]
-            if input_val not in current_node.successors and split is None:
-                split = (inputs[:i], inputs[i:])
-            current_node = current_node.extend_and_get(input_val, output_val)
-        if split:
-            self.initial_OQs.append(split)
+        _, known_prefix_len = self.extend_tree(inputs, outputs)
+        if known_prefix_len < len(inputs):
+            self.initial_OQs.append((inputs[:known_prefix_len], inputs[known_prefix_len:]))
 
     def apart_from_all(self, frontier_state):
         """ 
         Checks if a frontier state is apart from all new basis states
         """
         for basis_state in self.new_basis:
-            if not Apartness.states_are_apart(basis_state, frontier_state, self):
+            if not self.apartness.states_are_apart(basis_state, frontier_state):
                 return False
         return True
 
@@ -121,3 +121,103 @@ class Apartness:
                             input_val), hyp_state.transitions[input_val]))
 
         return None
+
+
+class IncrementalApartness:
+    """
+    Apartness of pairs of observation tree nodes, maintained incrementally while the tree grows.
+    A pair is checked once by traversing both subtrees. As apartness is monotone in the observation tree, pairs that
+    are apart are stored together with their witness, while pairs that are not apart are tracked and re-checked only
+    along the paths that are newly inserted below one of their nodes.
+    """
+
+    def __init__(self, ob_tree):
+        self.ob_tree = ob_tree
+        self.is_mealy = ob_tree.automaton_type == 'mealy'
+        # (node, node) ordered by node id -> witness, for all pairs known to be apart
+        self.witnesses = dict()
+        # node -> nodes it is tracked with and not apart from
+        self.not_apart = dict()
+
+    @staticmethod
+    def _key(state1, state2):
+        return (state1, state2) if state1.id < state2.id else (state2, state1)
+
+    def states_are_apart(self, state1, state2):
+        """
+        Checks if two states are apart. The first check of a pair traverses both subtrees, subsequent checks are
+        answered from the maintained relation.
+        """
+        if state1 == state2:
+            return False
+        key = self._key(state1, state2)
+        if key in self.witnesses:
+            return True
+        if state2 in self.not_apart.get(state1, ()):
+            return False
+
+        if self.is_mealy:
+            destination = Apartness._show_states_are_apart_mealy(key[0], key[1], self.ob_tree.alphabet)
+        else:
+            destination = Apartness._show_states_are_apart_moore(key[0], key[1], self.ob_tree.alphabet)
+
+        if destination is not None:
+            self.witnesses[key] = self.ob_tree.get_transfer_sequence(key[0], destination)
+            return True
+
+        self.not_apart.setdefault(state1, set()).add(state2)
+        self.not_apart.setdefault(state2, set()).add(state1)
+        return False
+
+    def get_witness(self, state1, state2):
+        """
+        Returns a sequence of inputs that leads to different outputs from both states, or None if they are not apart.
+        """
+        if not self.states_are_apart(state1, state2):
+            return None
+        return list(self.witnesses[self._key(state1, state2)])
+
+    def update(self, path, inputs, known_prefix_len):
+        """
+        Updates tracked pairs after an observation was inserted into the tree.
+
+        Args:
+
+            path: nodes reached by the prefixes of inputs, starting with the root
+
+            inputs: inputs of the inserted observation
+
+            known_prefix_len: length of the prefix of inputs that was already defined in the tree
+
+        """
+        # only nodes on the known prefix can be tracked, nodes below them are new
+        for pos in range(known_prefix_len + 1):
+            node = path[pos]
+            partners = self.not_apart.get(node)
+            if not partners:
+                continue
+            for partner in list(partners):
+                witness = self._find_witness_along_path(partner, path, inputs, pos, known_prefix_len)
+                if witness is not None:
+                    self.witnesses[self._key(node, partner)] = witness
+                    partners.discard(partner)
+                    self.not_apart[partner].discard(node)
+
+    def _find_witness_along_path(self, partner, path, inputs, pos, known_prefix_len):
+        # follows the inserted path from path[pos] and partner, comparing outputs of new transitions/nodes only
+        for ind in range(pos, len(inputs)):
+            input_val = inputs[ind]
+            if self.is_mealy:
+                partner_output = partner.get_output(input_val)
+                if partner_output is None:
+                    return None
+                if ind >= known_prefix_len and path[ind].get_output(input_val) != partner_output:
+                    return list(inputs[pos:ind + 1])
+                partner = partner.get_successor(input_val)
+            else:
+                partner = partner.get_successor(input_val)
+                if partner is None:
+                    return None
+                if ind >= known_prefix_len and path[ind + 1].output != partner.output:
+                    return list(inputs[pos:ind + 1])
+        return None
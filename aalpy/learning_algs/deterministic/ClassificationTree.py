@@ -6,7 +6,7 @@ from aalpy.automata import DfaState, Dfa, MealyState, MealyMachine, MooreState,
     SevpaAlphabet, SevpaState, SevpaTransition, Sevpa
 from aalpy.base import SUL
 from aalpy.learning_algs.deterministic.CounterExampleProcessing import rs_cex_processing, linear_cex_processing, \
-    exponential_cex_processing
+    exponential_cex_processing, kary_cex_processing
 
 automaton_class = {'dfa': Dfa, 'mealy': MealyMachine, 'moore': MooreMachine}
 
@@ -124,26 +124,52 @@ class ClassificationTree:
 
             the CTLeafNode that is reached by the sifting operation.
         """
+        return self._sift_batch([word])[0]
 
-        node = self.root
-        while not node.is_leaf():
+    def _sift_batch(self, words):
+        """
+        Sifts all words into the classification tree at once, one tree level at a time. In every step, membership
+        queries of all words that have not yet reached a leaf are submitted together via SUL.query_batch and each
+        word is routed to the child of its current node. Hence, the number of round trips to the SUL is bounded by
+        the depth of the tree instead of the number of membership queries.
+        Words reaching a node at the same level are processed in the given order, so a new leaf is labeled with the
+        same access string as with sequential sifting.
 
-            if self.automaton_type != 'vpa':
-                query = word + node.distinguishing_string
-            else:
-                query = node.distinguishing_string[0] + word + node.distinguishing_string[1]
+        Args:
+
+            words: list of words to sift into the discrimination tree (tuples of all letters)
+
+        Returns:
+
+            list of CTLeafNodes, where the i-th node is reached by sifting the i-th word
+        """
+        nodes = [self.root] * len(words)
+        pending = list(range(len(words)))
+
+        while pending:
+            queries = []
+            for ind in pending:
+                node = nodes[ind]
+                if self.automaton_type != 'vpa':
+                    queries.append(words[ind] + node.distinguishing_string)
+                else:
+                    queries.append(node.distinguishing_string[0] + words[ind] + node.distinguishing_string[1])
 
-            mq_result = self.sul.query(query)[-1]
+            next_pending = []
+            for ind, outputs in zip(pending, self.sul.query_batch(queries)):
+                node, mq_result = nodes[ind], outputs[-1]
 
-            if mq_result not in node.children.keys():
-                new_leaf = CTLeafNode(access_string=word, parent=node, path_to_node=mq_result)
-                self.leaf_nodes[word] = new_leaf
-                node.children[mq_result] = new_leaf
+                if mq_result not in node.children.keys():
+                    new_leaf = CTLeafNode(access_string=words[ind], parent=node, path_to_node=mq_result)
+                    self.leaf_nodes[words[ind]] = new_leaf
+                    node.children[mq_result] = new_leaf
 
-            node = node.children[mq_result]
+                nodes[ind] = node.children[mq_result]
+                if not nodes[ind].is_leaf():
+                    next_pending.append(ind)
+            pending = next_pending
 
-        assert node.is_leaf()
-        return node
+        return nodes
 
     def update_hypothesis(self):
         # for each CTLeafNode of this CT,
@@ -179,63 +205,93 @@ class ClassificationTree:
         assert self.initial_state is not None
 
         # For each access state s of the hypothesis and each letter b in the
-        # alphabet, compute the b-transition out of state s by sifting s.state_id*b
+        # alphabet, compute the b-transition out of state s by sifting s.state_id*b.
+        # All transitions known at the start of a round are sifted together, transitions
+        # of states discovered in a round are updated in the next one
         while self.transitions_to_update:
-            state, input_element = self.transitions_to_update.pop(0)
+            transitions, self.transitions_to_update = self.transitions_to_update, []
 
             if self.automaton_type != 'vpa':
+                words = [state.prefix + (input_element,) for state, input_element in transitions]
+                target_nodes = self._sift_batch(words)
 
-                transition_target_node = self._sift(state.prefix + (input_element,))
-                transition_target_access_string = transition_target_node.access_string
+                new_states = []
+                for (state, input_element), target_node in zip(transitions, target_nodes):
+                    transition_target_access_string = target_node.access_string
 
-                if self.automaton_type != "dfa" and transition_target_access_string not in self.hypothesis_states:
-                    if self.automaton_type == 'mealy':
-                        new_state = MealyState(state_id=f's{state_counter}')
-                    else:
-                        output = self.sul.query(transition_target_access_string)[-1]
-                        new_state = MooreState(state_id=f's{state_counter}', output=output)
+                    if self.automaton_type != "dfa" and transition_target_access_string not in self.hypothesis_states:
+                        if self.automaton_type == 'mealy':
+                            new_state = MealyState(state_id=f's{state_counter}')
+                        else:
+                            new_state = MooreState(state_id=f's{state_counter}', output=None)
+                            new_states.append(new_state)
 
-                    new_state.prefix = transition_target_access_string
-                    self.hypothesis_states[new_state.prefix] = new_state
-                    self.transitions_to_update.extend(product([new_state], self.alphabet))
-                    state_counter += 1
+                        new_state.prefix = transition_target_access_string
+                        self.hypothesis_states[new_state.prefix] = new_state
+                        self.transitions_to_update.extend(product([new_state], self.alphabet))
+                        state_counter += 1
 
-                state.transitions[input_element] = self.hypothesis_states[transition_target_access_string]
+                    state.transitions[input_element] = self.hypothesis_states[transition_target_access_string]
 
+                # outputs of new Moore states and of Mealy transitions are queried in one batch
+                output_words = [state.prefix for state in new_states]
                 if self.automaton_type == "mealy":
-                    state.output_fun[input_element] = self.sul.query(state.prefix + (input_element,))[-1]
+                    output_words.extend(words)
+                outputs = self.sul.query_batch(output_words)
+
+                for state, state_outputs in zip(new_states, outputs):
+                    state.output = state_outputs[-1]
+                if self.automaton_type == "mealy":
+                    for (state, input_element), transition_outputs in zip(transitions, outputs):
+                        state.output_fun[input_element] = transition_outputs[-1]
             else:
-                # internal transitions
-                if input_element in self.alphabet.internal_alphabet:
-                    transition_target_node = self._sift(state.prefix + (input_element,))
-                    transition_target_access_string = transition_target_node.access_string
-
-                    assert transition_target_access_string in self.hypothesis_states
-                    trans = SevpaTransition(target=self.hypothesis_states[transition_target_access_string],
-                                            letter=input_element, action=None)
-                    state.transitions[input_element].append(trans)
-
-                #  call transitions
-                elif input_element in self.alphabet.call_alphabet:
-                    # Add return transitions
-                    for return_letter in self.alphabet.return_alphabet:
-                        # check if exclusive pairs of call and return letters are defined in an alphabets
-                        if self.alphabet.exclusive_call_return_pairs and \
-                                self.alphabet.exclusive_call_return_pairs[input_element] != return_letter:
-                            continue
-
-                        for other_state in self.hypothesis_states.values():
-                            # ignore other state if other state is error state
-                            if other_state.prefix == self.error_state_prefix:
+                # words to sift for each transition, internal transitions have one target and call transitions
+                # have a return transition target for each pair of return letter and other state
+                words, return_transitions = [], []
+                for state, input_element in transitions:
+                    if input_element in self.alphabet.internal_alphabet:
+                        words.append(state.prefix + (input_element,))
+                        return_transitions.append(None)
+
+                    #  call transitions
+                    elif input_element in self.alphabet.call_alphabet:
+                        # Add return transitions
+                        returns = []
+                        for return_letter in self.alphabet.return_alphabet:
+                            # check if exclusive pairs of call and return letters are defined in an alphabets
+                            if self.alphabet.exclusive_call_return_pairs and \
+                                    self.alphabet.exclusive_call_return_pairs[input_element] != return_letter:
                                 continue
-                            transition_target_node = self._sift(
-                                other_state.prefix + (input_element,) + state.prefix + (return_letter,))
-                            transition_target_access_string = transition_target_node.access_string
 
-                            trans = SevpaTransition(target=self.hypothesis_states[transition_target_access_string],
-                                                    letter=return_letter,
-                                                    action='pop', stack_guard=(other_state.state_id, input_element))
-                            state.transitions[return_letter].append(trans)
+                            for other_state in self.hypothesis_states.values():
+                                # ignore other state if other state is error state
+                                if other_state.prefix == self.error_state_prefix:
+                                    continue
+                                words.append(other_state.prefix + (input_element,) + state.prefix + (return_letter,))
+                                returns.append((return_letter, other_state))
+                        return_transitions.append(returns)
+                    else:
+                        return_transitions.append([])
+
+                target_nodes = iter(self._sift_batch(words))
+                for (state, input_element), returns in zip(transitions, return_transitions):
+                    # internal transitions
+                    if returns is None:
+                        transition_target_access_string = next(target_nodes).access_string
+
+                        assert transition_target_access_string in self.hypothesis_states
+                        trans = SevpaTransition(target=self.hypothesis_states[transition_target_access_string],
+                                                letter=input_element, action=None)
+                        state.transitions[input_element].append(trans)
+                        continue
+
+                    for return_letter, other_state in returns:
+                        transition_target_access_string = next(target_nodes).access_string
+
+                        trans = SevpaTransition(target=self.hypothesis_states[transition_target_access_string],
+                                                letter=return_letter,
+                                                action='pop', stack_guard=(other_state.state_id, input_element))
+                        state.transitions[return_letter].append(trans)
 
         if self.automaton_type == 'vpa':
             hypothesis = Sevpa(initial_state=self.initial_state, states=list(self.hypothesis_states.values()))
@@ -361,6 +417,9 @@ class ClassificationTree:
         elif cex_processing_fun == 'rs':
             v = rs_cex_processing(self.sul, cex, hypothesis, is_vpa=self.automaton_type == 'vpa',
                                   suffix_closedness=False)[0]
+        elif cex_processing_fun == 'kary':
+            v = kary_cex_processing(self.sul, cex, hypothesis, is_vpa=self.automaton_type == 'vpa',
+                                    suffix_closedness=False)[0]
 
         assert v
         a = cex[len(cex) - len(v) - 1]
@@ -0,0 +1,93 @@
+from array import array
+
+
+class ColumnStore:
+    """
+    Column-oriented storage of the cells of an observation table. Every row (element of S or S.A) is addressed by an
+    integer index and every column (element of E) is an array holding the interned output of each row. Adding a
+    cell therefore never re-allocates a row, and adding a column to E costs O(|S|) instead of O(|S|*|E|).
+
+    Rows are compared by signatures. Signatures are computed by hash-consing: the signature of a row with k+1 cells is
+    the interned pair of the signature of its first k cells and the output id of its last cell. Two rows have the
+    same signature if and only if they contain the same outputs.
+    """
+
+    def __init__(self):
+        self.row_ids = dict()
+        self.row_lengths = array('i')
+        self.row_signatures = array('i')
+        self.columns = []
+
+        self.output_ids = dict()
+        self.output_values = []
+        # (signature of the row without its last cell, output id of the last cell) -> signature, 0 is the empty row
+        self.signature_ids = dict()
+
+    def _get_row_id(self, row):
+        row_id = self.row_ids.get(row)
+        if row_id is None:
+            row_id = len(self.row_ids)
+            self.row_ids[row] = row_id
+            self.row_lengths.append(0)
+            self.row_signatures.append(0)
+        return row_id
+
+    def append(self, row, output):
+        """
+        Adds the output of the next column to the row.
+
+        Args:
+
+            row: prefix of the row
+            output: value of the cell
+
+        """
+        row_id = self._get_row_id(row)
+        column_index = self.row_lengths[row_id]
+
+        output_id = self.output_ids.get(output)
+        if output_id is None:
+            output_id = len(self.output_values)
+            self.output_ids[output] = output_id
+            self.output_values.append(output)
+
+        if column_index == len(self.columns):
+            self.columns.append(array('i'))
+        column = self.columns[column_index]
+        if len(column) <= row_id:
+            column.extend(array('i', [-1]) * (row_id + 1 - len(column)))
+        column[row_id] = output_id
+        self.row_lengths[row_id] = column_index + 1
+
+        signature_key = (self.row_signatures[row_id], output_id)
+        signature = self.signature_ids.get(signature_key)
+        if signature is None:
+            signature = len(self.signature_ids) + 1
+            self.signature_ids[signature_key] = signature
+        self.row_signatures[row_id] = signature
+
+    def row_length(self, row):
+        row_id = self.row_ids.get(row)
+        return self.row_lengths[row_id] if row_id is not None else 0
+
+    def signature(self, row):
+        """
+        Returns the signature of the row, an integer that is equal for rows containing the same outputs.
+        """
+        row_id = self.row_ids.get(row)
+        return self.row_signatures[row_id] if row_id is not None else 0
+
+    def cell(self, row, column_index):
+        return self.output_values[self.columns[column_index][self.row_ids[row]]]
+
+    def __contains__(self, row):
+        return row in self.row_ids
+
+    def __getitem__(self, row):
+        """
+        Returns the row as a tuple, as stored in the dictionary-based observation table.
+        """
+        row_id = self.row_ids.get(row)
+        if row_id is None:
+            return tuple()
+        return tuple(self.output_values[self.columns[c][row_id]] for c in range(self.row_lengths[row_id]))
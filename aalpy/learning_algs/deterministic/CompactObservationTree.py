@@ -0,0 +1,242 @@
+from array import array
+from sys import getsizeof
+
+
+class NodeStore:
+    """
+    Array-backed storage of observation tree nodes. Nodes are integer ids and every node is described by six int32
+    entries: parent, input leading from the parent, output, depth, first child and next sibling. Inputs and outputs
+    are interned, so the tree itself stores only integers. For Moore machines and DFAs the output is the output of
+    the node, for Mealy machines it is the output of the transition leading to the node.
+
+    Successors of a node form a sparse list linked through the next sibling entries. Nodes with many successors,
+    which are rare in observation trees, additionally get a dictionary index for constant time lookup.
+
+    The target memory footprint is 24 bytes per node (plus amortized growth of arrays, dictionaries of wide nodes and
+    tables of interned symbols), compared to several hundred bytes of a MealyNode/MooreNode object with its successor
+    dictionary.
+    """
+
+    # number of successors after which a node is indexed with a dictionary
+    wide_node_threshold = 8
+
+    def __init__(self):
+        self.inputs = []
+        self.input_ids = dict()
+        self.output_values = []
+        self.output_ids = dict()
+
+        self.parents = array('i')
+        self.parent_inputs = array('i')
+        self.outputs = array('i')
+        self.depths = array('i')
+        self.first_children = array('i')
+        self.next_siblings = array('i')
+        self.wide_nodes = dict()
+
+        self._append_node(-1, -1, -1, 0)
+
+    def __len__(self):
+        return len(self.parents)
+
+    def _append_node(self, parent, input_id, output_id, depth):
+        self.parents.append(parent)
+        self.parent_inputs.append(input_id)
+        self.outputs.append(output_id)
+        self.depths.append(depth)
+        self.first_children.append(-1)
+        self.next_siblings.append(-1)
+        return len(self.parents) - 1
+
+    def intern_input(self, input_val):
+        input_id = self.input_ids.get(input_val)
+        if input_id is None:
+            input_id = len(self.inputs)
+            self.input_ids[input_val] = input_id
+            self.inputs.append(input_val)
+        return input_id
+
+    def intern_output(self, output_val):
+        if output_val is None:
+            return -1
+        output_id = self.output_ids.get(output_val)
+        if output_id is None:
+            output_id = len(self.output_values)
+            self.output_ids[output_val] = output_id
+            self.output_values.append(output_val)
+        return output_id
+
+    def get_output(self, node):
+        output_id = self.outputs[node]
+        return self.output_values[output_id] if output_id >= 0 else None
+
+    def get_child(self, node, input_id):
+        """
+        Returns the successor of the node for the input, or -1 if it is not defined.
+        """
+        index = self.wide_nodes.get(node)
+        if index is not None:
+            return index.get(input_id, -1)
+
+        child = self.first_children[node]
+        while child != -1:
+            if self.parent_inputs[child] == input_id:
+                return child
+            child = self.next_siblings[child]
+        return -1
+
+    def add_child(self, node, input_id, output_id):
+        child = self._append_node(node, input_id, output_id, self.depths[node] + 1)
+        self.next_siblings[child] = self.first_children[node]
+        self.first_children[node] = child
+
+        index = self.wide_nodes.get(node)
+        if index is not None:
+            index[input_id] = child
+        else:
+            children = self.get_children(node)
+            if len(children) > self.wide_node_threshold:
+                self.wide_nodes[node] = {self.parent_inputs[c]: c for c in children}
+        return child
+
+    def get_children(self, node):
+        children = []
+        child = self.first_children[node]
+        while child != -1:
+            children.append(child)
+            child = self.next_siblings[child]
+        return children
+
+    def transfer_sequence(self, from_node, to_node):
+        """
+        Returns the inputs leading from from_node to to_node, or None if to_node is not in the subtree of from_node.
+        """
+        length = self.depths[to_node] - self.depths[from_node]
+        if length < 0:
+            return None
+        sequence = [None] * length
+        node = to_node
+        for ind in range(length - 1, -1, -1):
+            sequence[ind] = self.inputs[self.parent_inputs[node]]
+            node = self.parents[node]
+        return sequence if node == from_node else None
+
+    def memory_footprint(self):
+        """
+        Returns the number of bytes used by the store: node arrays including their over-allocation, dictionaries of
+        wide nodes and tables of interned inputs and outputs. Input and output values themselves are not counted, as
+        they are shared with the alphabet and the SUL.
+        """
+        node_arrays = [self.parents, self.parent_inputs, self.outputs, self.depths, self.first_children,
+                       self.next_siblings]
+        size = sum(getsizeof(a) for a in node_arrays)
+        size += getsizeof(self.wide_nodes)
+        for node, index in self.wide_nodes.items():
+            size += getsizeof(node) + getsizeof(index) + sum(getsizeof(child) for child in index.values())
+        for table in [self.inputs, self.input_ids, self.output_values, self.output_ids]:
+            size += getsizeof(table)
+        return size
+
+
+class CompactSuccessors:
+    """
+    Read-only view of the successors of a compact node, supporting membership tests of inputs.
+    """
+    __slots__ = ['store', 'node']
+
+    def __init__(self, store, node):
+        self.store = store
+        self.node = node
+
+    def __contains__(self, input_val):
+        input_id = self.store.input_ids.get(input_val)
+        return input_id is not None and self.store.get_child(self.node, input_id) != -1
+
+    def __len__(self):
+        return len(self.store.get_children(self.node))
+
+    def keys(self):
+        return [self.store.inputs[self.store.parent_inputs[c]] for c in reversed(self.store.get_children(self.node))]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+
+class CompactNode:
+    """
+    Observation tree node stored in a NodeStore. Node objects are lightweight handles that are created on access;
+    two handles are equal if they refer to the same node. Provides the interface of MealyNode and MooreNode.
+    """
+    __slots__ = ['store', 'id', 'is_mealy']
+
+    def __init__(self, store, node_id, is_mealy):
+        self.store = store
+        self.id = node_id
+        self.is_mealy = is_mealy
+
+    def __eq__(self, other):
+        return other.__class__ is CompactNode and self.id == other.id and self.store is other.store
+
+    def __hash__(self):
+        return self.id
+
+    @property
+    def parent(self):
+        parent = self.store.parents[self.id]
+        return CompactNode(self.store, parent, self.is_mealy) if parent != -1 else None
+
+    @property
+    def input_to_parent(self):
+        input_id = self.store.parent_inputs[self.id]
+        return self.store.inputs[input_id] if input_id != -1 else None
+
+    @property
+    def output(self):
+        return self.store.get_output(self.id)
+
+    @output.setter
+    def output(self, output_val):
+        self.store.outputs[self.id] = self.store.intern_output(output_val)
+
+    @property
+    def successors(self):
+        return CompactSuccessors(self.store, self.id)
+
+    @property
+    def id_counter(self):
+        return len(self.store)
+
+    def get_successor(self, input_val):
+        """ Returns the successor node for the given input """
+        input_id = self.store.input_ids.get(input_val)
+        if input_id is None:
+            return None
+        child = self.store.get_child(self.id, input_id)
+        return CompactNode(self.store, child, self.is_mealy) if child != -1 else None
+
+    def get_output(self, input_val):
+        """ Returns the output for the given input """
+        store = self.store
+        input_id = store.input_ids.get(input_val)
+        if input_id is None:
+            return None
+        child = store.get_child(self.id, input_id)
+        if child == -1:
+            return None
+        output_id = store.outputs[child]
+        return store.output_values[output_id] if output_id >= 0 else None
+
+    def extend_and_get(self, inp, output):
+        """ Extend the node with a new successor and return the successor node """
+        store = self.store
+        input_id = store.intern_input(inp)
+        child = store.get_child(self.id, input_id)
+        if child != -1:
+            if self.is_mealy:
+                out = store.get_output(child)
+                if out != output:
+                    raise Exception(
+                        f"observation not consistent with tree with output from tree: {out} and output from call: {output}")
+            return CompactNode(store, child, self.is_mealy)
+        child = store.add_child(self.id, input_id, store.intern_output(output))
+        return CompactNode(store, child, self.is_mealy)
@@ -110,6 +110,130 @@ def rs_cex_processing(sul: SUL, cex: tuple, hypothesis, suffix_closedness=True,
     return suffix_to_query
 
 
+def kary_cex_processing(sul: SUL, cex: tuple, hypothesis, suffix_closedness=True, closedness='suffix',
+                        is_vpa=False, num_split_points=4):
+    """
+    Speculative k-ary variant of the Riverst-Schapire counter example processing. Instead of querying a single split
+    point at a time, num_split_points evenly spaced split points of the remaining search interval are submitted
+    together with SUL.query_batch, so that a parallel or batched SUL can execute them concurrently. The interval
+    shrinks by a factor of num_split_points + 1 in every round, at the cost of more membership queries in total.
+
+    Args:
+
+        sul: system under learning
+        cex: found counterexample
+        hypothesis: hypothesis on which counterexample was found
+        suffix_closedness: If true all suffixes will be added, else just one (Default value = True)
+        closedness: either 'suffix' or 'prefix'. (Default value = 'suffix')
+        is_vpa: system under learning behaves as a context free language
+        num_split_points: number of split points evaluated in one round (Default value = 4)
+
+    Returns:
+
+        suffixes to be added to the E set
+
+    """
+    assert num_split_points > 0
+
+    cex_out = sul.query(cex)
+    cex_input = list(cex)
+
+    # the query of split point lower - 1 agrees with the counterexample, the query of split point upper + 1 does not
+    lower, upper = 1, len(cex_input) - 2
+
+    while lower <= upper:
+        width = upper - lower + 1
+        num_points = min(num_split_points, width)
+        split_points = [lower + (width * (i + 1)) // (num_points + 1) for i in range(num_points)]
+
+        queries = []
+        for split_point in split_points:
+            hypothesis.reset_to_initial()
+            for s_p in cex_input[:split_point]:
+                hypothesis.step(s_p)
+
+            if not is_vpa:
+                s_bracket = hypothesis.current_state.prefix
+            else:
+                s_bracket = tuple(hypothesis.transform_access_string(hypothesis.current_state))
+            queries.append(s_bracket + tuple(cex_input[split_point:]))
+
+        for split_point, mq in zip(split_points, sul.query_batch(queries)):
+            if mq[-1] != cex_out[-1]:
+                upper = split_point - 1
+                break
+            lower = split_point + 1
+
+    suffix = tuple(cex_input[lower:])
+
+    if suffix_closedness:
+        suffixes = all_suffixes(suffix) if closedness == 'suffix' else all_prefixes(suffix)
+        suffixes.reverse()
+        suffix_to_query = suffixes
+    else:
+        suffix_to_query = [suffix]
+    return suffix_to_query
+
+
+def shorten_counterexample(sul: SUL, cex: tuple, hypothesis, num_candidates=4):
+    """
+    Shortens a counterexample with the help of the hypothesis before it is processed. The counterexample is cut
+    after the first output on which the system under learning and the hypothesis disagree. Then, loops of the
+    hypothesis along the counterexample, i.e. infixes leading from a hypothesis state back to the same state, are
+    removed. In every round, words obtained by removing one of the num_candidates longest loops are submitted with one
+    batch query and the shortest one that is still a counterexample is kept. This is repeated until no loop can be
+    removed.
+
+    Args:
+
+        sul: system under learning
+        cex: found counterexample
+        hypothesis: deterministic hypothesis on which counterexample was found
+        num_candidates: number of loops whose removal is tried in one round (Default value = 4)
+
+    Returns:
+
+        shortened counterexample
+
+    """
+
+    def cut_after_first_difference(word, sul_outputs):
+        hyp_outputs = hypothesis.execute_sequence(hypothesis.initial_state, word)
+        for ind, (sul_output, hyp_output) in enumerate(zip(sul_outputs, hyp_outputs)):
+            if sul_output != hyp_output:
+                return word[:ind + 1]
+        return None
+
+    cex = tuple(cex)
+    cex = cut_after_first_difference(cex, sul.query(cex)) or cex
+
+    while True:
+        # longest loop ending in each position of the counterexample
+        hypothesis.reset_to_initial()
+        first_visit = {hypothesis.current_state: 0}
+        loops = []
+        for ind, inp in enumerate(cex):
+            hypothesis.step(inp)
+            if hypothesis.current_state in first_visit:
+                loops.append((first_visit[hypothesis.current_state], ind + 1))
+            else:
+                first_visit[hypothesis.current_state] = ind + 1
+
+        loops.sort(key=lambda loop: loop[0] - loop[1])
+        candidates = [cex[:start] + cex[end:] for start, end in loops[:num_candidates]]
+        candidates = [candidate for candidate in candidates if candidate]
+
+        shortened = None
+        for candidate, sul_outputs in zip(candidates, sul.query_batch(candidates)):
+            shortened = cut_after_first_difference(candidate, sul_outputs)
+            if shortened is not None:
+                break
+
+        if shortened is None:
+            return cex
+        cex = shortened
+
+
 def linear_cex_processing(sul: SUL, cex: tuple, hypothesis, suffix_closedness=True, closedness='suffix',
                           direction='fwd', is_vpa=False):
     assert direction in {'fwd', 'bwd'}
@@ -6,16 +6,17 @@ from aalpy.automata import Dfa, DfaState, MealyState, MealyMachine, MooreState,
 from aalpy.base import Oracle, SUL
 from aalpy.utils.HelperFunctions import print_learning_info, visualize_classification_tree
 from .ClassificationTree import ClassificationTree
-from .CounterExampleProcessing import counterexample_successfully_processed
+from .CounterExampleProcessing import counterexample_successfully_processed, shorten_counterexample
 from ...base.SUL import CacheSUL
 
 print_options = [0, 1, 2, 3]
-counterexample_processing_strategy = ['rs', 'linear_fwd', 'linear_bwd', 'exponential_fwd', 'exponential_bwd']
+counterexample_processing_strategy = ['rs', 'kary', 'linear_fwd', 'linear_bwd', 'exponential_fwd', 'exponential_bwd']
 automaton_class = {'dfa': Dfa, 'mealy': MealyMachine, 'moore': MooreMachine, 'vpa': Sevpa}
 
 
 def run_KV(alphabet: Union[list, SevpaAlphabet], sul: SUL, eq_oracle: Oracle, automaton_type, cex_processing='rs',
-           max_learning_rounds=None, cache_and_non_det_check=True, return_data=False, print_level=2):
+           shorten_cex=False, max_learning_rounds=None, cache_and_non_det_check=True, cache_path=None, return_data=False,
+           print_level=2):
     """
     Executes the KV algorithm.
 
@@ -31,11 +32,20 @@ def run_KV(alphabet: Union[list, SevpaAlphabet], sul: SUL, eq_oracle: Oracle, au
 
         cex_processing: Counterexample processing strategy. Either 'rs' (Riverst-Schapire), 'longest_prefix'.
             (Default value = 'rs'), 'longest_prefix', 'linear_fwd', 'linear_bwd', 'exponential_fwd', 'exponential_bwd'
+            or 'kary', a variant of 'rs' that evaluates several split points with one batch query per round
+
+        shorten_cex: if True, counterexamples are shortened with the help of the hypothesis before they are processed.
+            Not supported for 'vpa' (Default value = False)
 
         max_learning_rounds: number of learning rounds after which learning will terminate (Default value = None)
 
         cache_and_non_det_check: Use caching and non-determinism checks (Default value = True)
 
+        cache_path: path to a SQLite database in which the cache is persisted. Observations stored in the database
+            are reused, which allows resuming interrupted runs and sharing observations between learning runs on
+            the same system. Inputs and outputs are unpickled when the database is loaded, so only use databases
+            from trusted sources (Default value = None)
+
         return_data: if True, a map containing all information(runtime/#queries/#steps) will be returned
             (Default value = False)
 
@@ -53,14 +63,15 @@ def run_KV(alphabet: Union[list, SevpaAlphabet], sul: SUL, eq_oracle: Oracle, au
     assert cex_processing in counterexample_processing_strategy
     assert automaton_type in [*automaton_class]
     assert automaton_type != 'vpa' and isinstance(alphabet, list) or isinstance(alphabet, SevpaAlphabet)
+    assert not (shorten_cex and automaton_type == 'vpa')
 
     start_time = time.time()
     eq_query_time = 0
     learning_rounds = 0
 
-    if cache_and_non_det_check:
+    if cache_and_non_det_check or cache_path is not None:
         # Wrap the sul in the CacheSUL, so that all steps/queries are cached
-        sul = CacheSUL(sul)
+        sul = CacheSUL(sul, cache_path=cache_path)
         eq_oracle.sul = sul
 
     if automaton_type != 'mealy':
@@ -102,6 +113,8 @@ def run_KV(alphabet: Union[list, SevpaAlphabet], sul: SUL, eq_oracle: Oracle, au
     classification_tree = None
     if cex is not None:
         cex = tuple(cex)
+        if shorten_cex:
+            cex = shorten_counterexample(sul, cex, hypothesis)
 
         # initialise the classification tree to have a root
         # labeled with the empty word as the distinguishing string
@@ -133,6 +146,8 @@ def run_KV(alphabet: Union[list, SevpaAlphabet], sul: SUL, eq_oracle: Oracle, au
                     break
                 else:
                     cex = tuple(cex)
+                    if shorten_cex:
+                        cex = shorten_counterexample(sul, cex, hypothesis)
 
                 if print_level == 3:
                     print('Counterexample', cex)
@@ -142,6 +157,12 @@ def run_KV(alphabet: Union[list, SevpaAlphabet], sul: SUL, eq_oracle: Oracle, au
     if automaton_type == 'vpa':
         hypothesis.delete_state(hypothesis.get_error_state())
 
+    if cache_path is not None:
+        # the database was opened for this learning run
+        sul.close_cache()
+    elif isinstance(sul, CacheSUL):
+        sul.flush_cache()
+
     total_time = round(time.time() - start_time, 2)
     eq_query_time = round(eq_query_time, 2)
     learning_time = round(total_time - eq_query_time, 2)
@@ -153,6 +174,7 @@ def run_KV(alphabet: Union[list, SevpaAlphabet], sul: SUL, eq_oracle: Oracle, au
         'steps_learning': sul.num_steps,
         'queries_eq_oracle': eq_oracle.num_queries,
         'steps_eq_oracle': eq_oracle.num_steps,
+        'steps_eq_oracle_cached': eq_oracle.num_cached_steps,
         'learning_time': learning_time,
         'eq_oracle_time': eq_query_time,
         'total_time': total_time,
@@ -8,7 +8,8 @@ from ...base.SUL import CacheSUL
 
 def run_Lsharp(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type,
                extension_rule='SepSeq', separation_rule="ADS", samples=None,
-               max_learning_rounds=None, cache_and_non_det_check=True, return_data=False, print_level=2):
+               max_learning_rounds=None, cache_and_non_det_check=True, cache_path=None, compact_observation_tree=False,
+               return_data=False, print_level=2):
     """
     Based on ''A New Approach for Active Automata Learning Based on Apartness'' from Vaandrager, Garhewal, Rot and Wissmann. 
     and ''L# for DFAs'' from Vaandrager, Sanders.
@@ -36,6 +37,15 @@ def run_Lsharp(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type,
 
         cache_and_non_det_check: Use caching and non-determinism checks (Default value = True)
 
+        cache_path: path to a SQLite database in which the cache is persisted. Observations stored in the database
+            are reused, which allows resuming interrupted runs and sharing observations between learning runs on
+            the same system. Inputs and outputs are unpickled when the database is loaded, so only use databases
+            from trusted sources (Default value = None)
+
+        compact_observation_tree: if True, the observation tree is stored in integer arrays instead of node objects,
+            which reduces its memory footprint to roughly 24 bytes per node. Useful for large alphabets and long
+            learning runs (Default value = False)
+
         return_data: if True, a map containing all information(runtime/#queries/#steps) will be returned
             (Default value = False)
 
@@ -50,16 +60,17 @@ def run_Lsharp(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type,
     assert extension_rule in {None, "SepSeq", "ADS"}
     assert separation_rule in {"SepSeq", "ADS"}
 
-    if cache_and_non_det_check or samples is not None:
+    if cache_and_non_det_check or samples is not None or cache_path is not None:
         # Wrap the sul in the CacheSUL, so that all steps/queries are cached
-        sul = CacheSUL(sul)
+        sul = CacheSUL(sul, cache_path=cache_path)
         eq_oracle.sul = sul
 
         if samples:
             for input_seq, output_seq in samples:
                 sul.cache.add_to_cache(input_seq, output_seq)
 
-    ob_tree = ObservationTree(alphabet, sul, automaton_type, extension_rule, separation_rule)
+    ob_tree = ObservationTree(alphabet, sul, automaton_type, extension_rule, separation_rule,
+                              compact_tree=compact_observation_tree)
     start_time = time.time()
 
     eq_query_time = 0
@@ -94,6 +105,12 @@ def run_Lsharp(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type,
         cex_outputs = sul.query(cex)
         ob_tree.process_counter_example(hypothesis, cex, cex_outputs)
 
+    if cache_path is not None:
+        # the database was opened for this learning run
+        sul.close_cache()
+    elif isinstance(sul, CacheSUL):
+        sul.flush_cache()
+
     total_time = round(time.time() - start_time, 2)
     eq_query_time = round(eq_query_time, 2)
     learning_time = round(total_time - eq_query_time, 2)
@@ -105,6 +122,7 @@ def run_Lsharp(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type,
         'steps_learning': sul.num_steps,
         'queries_eq_oracle': eq_oracle.num_queries,
         'steps_eq_oracle': eq_oracle.num_steps,
+        'steps_eq_oracle_cached': eq_oracle.num_cached_steps,
         'learning_time': learning_time,
         'eq_oracle_time': eq_query_time,
         'total_time': total_time,
@@ -3,20 +3,22 @@ import time
 from aalpy.base import Oracle, SUL
 from aalpy.utils.HelperFunctions import extend_set, print_learning_info, print_observation_table, all_prefixes
 from .CounterExampleProcessing import longest_prefix_cex_processing, rs_cex_processing, \
-    counterexample_successfully_processed, linear_cex_processing, exponential_cex_processing
+    counterexample_successfully_processed, linear_cex_processing, exponential_cex_processing, kary_cex_processing, \
+    shorten_counterexample
 from .ObservationTable import ObservationTable
 from ...base.SUL import CacheSUL
 
-counterexample_processing_strategy = [None, 'rs', 'longest_prefix', 'linear_fwd', 'linear_bwd', 'exponential_fwd',
-                                      'exponential_bwd']
+counterexample_processing_strategy = [None, 'rs', 'kary', 'longest_prefix', 'linear_fwd', 'linear_bwd',
+                                      'exponential_fwd', 'exponential_bwd']
 closedness_options = ['suffix_all', 'suffix_single']
 print_options = [0, 1, 2, 3]
 
 
 def run_Lstar(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type, samples=None,
-              closing_strategy='shortest_first', cex_processing='rs',
-              e_set_suffix_closed=False, all_prefixes_in_obs_table=True,
-              max_learning_rounds=None, cache_and_non_det_check=True, return_data=False, print_level=2):
+              closing_strategy='shortest_first', cex_processing='rs', shorten_cex=False,
+              e_set_suffix_closed=False, all_prefixes_in_obs_table=True, incremental_obs_table=False,
+              column_store_obs_table=False, incremental_hypothesis=False, max_learning_rounds=None,
+              cache_and_non_det_check=True, cache_path=None, return_data=False, print_level=2):
     """
     Executes L* algorithm.
 
@@ -38,6 +40,10 @@ def run_Lstar(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type, sampl
 
         cex_processing: Counterexample processing strategy. Either None, 'rs' (Riverst-Schapire), 'longest_prefix'.
             (Default value = 'rs'), 'longest_prefix', 'linear_fwd', 'linear_bwd', 'exponential_fwd', 'exponential_bwd'
+            or 'kary', a variant of 'rs' that evaluates several split points with one batch query per round
+
+        shorten_cex: if True, counterexamples are shortened with the help of the hypothesis before they are processed
+            (Default value = False)
 
         e_set_suffix_closed: True option ensures that E set is suffix closed,
             False adds just a single suffix per counterexample.
@@ -46,10 +52,26 @@ def run_Lstar(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type, sampl
             suffix, otherwise just the last output meaning that all prefixes of the suffix will be added.
             If False, just a single suffix will be added.
 
+        incremental_obs_table: if True, the observation table maintains an index of row signatures that is updated
+            only for changed rows, which speeds up closedness and consistency checks on large tables.
+            (Default value = False)
+
+        column_store_obs_table: if True, the observation table stores its cells column-wise and compares rows by
+            signatures, so that adding suffixes to E does not re-allocate rows. (Default value = False)
+
+        incremental_hypothesis: if True, a single hypothesis object is updated in every round instead of being
+            rebuilt. States are kept between rounds and only transitions affected by changed rows are recomputed.
+            Hypotheses of previous rounds are therefore not preserved. (Default value = False)
+
         max_learning_rounds: number of learning rounds after which learning will terminate (Default value = None)
 
         cache_and_non_det_check: Use caching and non-determinism checks (Default value = True)
 
+        cache_path: path to a SQLite database in which the cache is persisted. Observations stored in the database
+            are reused, which allows resuming interrupted runs and sharing observations between learning runs on
+            the same system. Inputs and outputs are unpickled when the database is loaded, so only use databases
+            from trusted sources (Default value = None)
+
         return_data: if True, a map containing all information(runtime/#queries/#steps) will be returned
             (Default value = False)
 
@@ -65,9 +87,9 @@ def run_Lstar(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type, sampl
     assert cex_processing in counterexample_processing_strategy
     assert print_level in print_options
 
-    if cache_and_non_det_check or samples is not None:
+    if cache_and_non_det_check or samples is not None or cache_path is not None:
         # Wrap the sul in the CacheSUL, so that all steps/queries are cached
-        sul = CacheSUL(sul)
+        sul = CacheSUL(sul, cache_path=cache_path)
         eq_oracle.sul = sul
 
         if samples:
@@ -79,7 +101,9 @@ def run_Lstar(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type, sampl
     learning_rounds = 0
     hypothesis = None
 
-    observation_table = ObservationTable(alphabet, sul, automaton_type, all_prefixes_in_obs_table)
+    observation_table = ObservationTable(alphabet, sul, automaton_type, all_prefixes_in_obs_table,
+                                         incremental=incremental_obs_table, column_store=column_store_obs_table,
+                                         incremental_hypothesis=incremental_hypothesis)
 
     # Initial update of observation table, for empty row
     observation_table.update_obs_table()
@@ -124,6 +148,9 @@ def run_Lstar(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type, sampl
             cex = eq_oracle.find_cex(hypothesis)
             eq_query_time += time.time() - eq_query_start
 
+            if cex is not None and shorten_cex:
+                cex = shorten_counterexample(sul, cex, hypothesis)
+
         # If no counterexample is found, return the hypothesis
         if cex is None:
             break
@@ -150,6 +177,8 @@ def run_Lstar(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type, sampl
                                                          cex, closedness='suffix')
         elif cex_processing == 'rs':
             cex_suffixes = rs_cex_processing(sul, cex, hypothesis, e_set_suffix_closed, closedness='suffix')
+        elif cex_processing == 'kary':
+            cex_suffixes = kary_cex_processing(sul, cex, hypothesis, e_set_suffix_closed, closedness='suffix')
         else:
             direction = cex_processing[-3:]
             if 'linear' in cex_processing:
@@ -162,6 +191,12 @@ def run_Lstar(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type, sampl
         added_suffixes = extend_set(observation_table.E, cex_suffixes)
         observation_table.update_obs_table(e_set=added_suffixes)
 
+    if cache_path is not None:
+        # the database was opened for this learning run
+        sul.close_cache()
+    elif isinstance(sul, CacheSUL):
+        sul.flush_cache()
+
     total_time = round(time.time() - start_time, 2)
     eq_query_time = round(eq_query_time, 2)
     learning_time = round(total_time - eq_query_time, 2)
@@ -173,6 +208,7 @@ def run_Lstar(alphabet: list, sul: SUL, eq_oracle: Oracle, automaton_type, sampl
         'steps_learning': sul.num_steps,
         'queries_eq_oracle': eq_oracle.num_queries,
         'steps_eq_oracle': eq_oracle.num_steps,
+        'steps_eq_oracle_cached': eq_oracle.num_cached_steps,
         'learning_time': learning_time,
         'eq_oracle_time': eq_query_time,
         'total_time': total_time,
@@ -2,13 +2,16 @@ from collections import defaultdict
 
 from aalpy.base import Automaton, SUL
 from aalpy.automata import Dfa, DfaState, MealyState, MealyMachine, MooreMachine, MooreState
+from .ColumnStore import ColumnStore
 
 aut_type = ['dfa', 'mealy', 'moore']
 closing_options = ['shortest_first', 'longest_first', 'single', 'single_longest']
+automaton_class = {'dfa': Dfa, 'mealy': MealyMachine, 'moore': MooreMachine}
 
 
 class ObservationTable:
-    def __init__(self, alphabet: list, sul: SUL, automaton_type, prefixes_in_cell=False):
+    def __init__(self, alphabet: list, sul: SUL, automaton_type, prefixes_in_cell=False, incremental=False,
+                 column_store=False, incremental_hypothesis=False):
         """
         Constructor of the observation table. Initial queries are asked in the constructor.
 
@@ -17,6 +20,14 @@ class ObservationTable:
             alphabet: input alphabet
             sul: system under learning
             automaton_type: automaton type, one of ['dfa', 'mealy', 'moore']
+            prefixes_in_cell: if True, cells contain outputs of all prefixes of the suffix
+            incremental: if True, an index from row signatures to rows is maintained and updated only for rows
+                changed by update_obs_table. Closedness and consistency checks are answered from the index.
+            column_store: if True, cells are stored column-wise in a ColumnStore and rows are compared by their
+                signatures, so that adding an element to E does not re-allocate rows.
+            incremental_hypothesis: if True, gen_hypothesis returns the same hypothesis object in every round. Its
+                states are kept between rounds and only transitions affected by rows changed since the previous
+                hypothesis are recomputed.
 
         Returns:
 
@@ -36,7 +47,9 @@ class ObservationTable:
         # set of index i. Therefore it is important to keep E set ordered and ask membership queries only when needed
         # and in correct order. It would make more sense to implement it as a defaultdict(dict) where you can access
         # elements via self.T[s][e], but it causes significant performance hit.
-        self.T = defaultdict(tuple)
+        # With the column store, T is a ColumnStore that materializes rows as tuples only when they are accessed.
+        self.column_store = column_store
+        self.T = ColumnStore() if column_store else defaultdict(tuple)
 
         self.sul = sul
         empty_word = tuple()
@@ -46,6 +59,23 @@ class ObservationTable:
         if self.automaton_type == 'dfa' or self.automaton_type == 'moore':
             self.E.insert(0, empty_word)
 
+        # Index of row signatures, used if incremental is True. Rows of S and rows of S.A are indexed separately.
+        # Rows in T that are not in S are rows of S.A, as S is prefix-closed and only S and S.A rows are queried.
+        self.incremental = incremental
+        self.a_position = {a: i for i, a in enumerate(self.A)}
+        self.s_index = defaultdict(set)
+        self.sa_index = defaultdict(set)
+        self.row_signature = dict()
+        self.indexed_s = set()
+        self.s_position = dict()
+
+        # Persistent hypothesis, used if incremental_hypothesis is True. Rows queried since the last call of
+        # gen_hypothesis are collected in changed_rows.
+        self.incremental_hypothesis = incremental_hypothesis
+        self.hypothesis = None
+        self.hypothesis_states = dict()
+        self.changed_rows = set()
+
     def get_rows_to_close(self, closing_strategy='longest_first'):
         """
         Get rows for that need to be closed. Row selection is done according to closing_strategy.
@@ -68,16 +98,21 @@ class ObservationTable:
         rows_to_close = []
         row_values = set()
 
-        s_rows = {self.T[s] for s in self.S}
+        if self.incremental:
+            rows_to_close = self._get_rows_to_close_from_index()
+            if closing_strategy == 'single':
+                rows_to_close = rows_to_close[:1]
+        else:
+            s_rows = {self._signature(s) for s in self.S}
 
-        for t in self.s_dot_a():
-            row_t = self.T[t]
-            if row_t not in s_rows and row_t not in row_values:
-                rows_to_close.append(t)
-                row_values.add(row_t)
+            for t in self.s_dot_a():
+                row_t = self._signature(t)
+                if row_t not in s_rows and row_t not in row_values:
+                    rows_to_close.append(t)
+                    row_values.add(row_t)
 
-                if closing_strategy == 'single':
-                    return rows_to_close
+                    if closing_strategy == 'single':
+                        return rows_to_close
 
         if not rows_to_close:
             return None
@@ -102,17 +137,32 @@ class ObservationTable:
             a+e values that are the causes of inconsistency
 
         """
+        if self.incremental:
+            return self._get_causes_of_inconsistency_from_index()
+
         for i, s1 in enumerate(self.S):
             for s2 in self.S[i + 1:]:
-                if self.T[s1] == self.T[s2]:
+                if self._signature(s1) == self._signature(s2):
                     for a in self.A:
-                        if self.T[s1 + a] != self.T[s2 + a]:
+                        if self._signature(s1 + a) != self._signature(s2 + a):
                             for index, e in enumerate(self.E):
-                                if self.T[s1 + a][index] != self.T[s2 + a][index]:
+                                if self._cell(s1 + a, index) != self._cell(s2 + a, index):
                                     return [(a + e)]
 
         return None
 
+    def _signature(self, s):
+        """
+        Returns a hashable value that is equal for rows with equal cells.
+        """
+        return self.T.signature(s) if self.column_store else self.T[s]
+
+    def _row_length(self, s):
+        return self.T.row_length(s) if self.column_store else len(self.T[s])
+
+    def _cell(self, s, index):
+        return self.T.cell(s, index) if self.column_store else self.T[s][index]
+
     def s_dot_a(self):
         """
         Helper generator function that returns extended S, or S.A set.
@@ -143,15 +193,115 @@ class ObservationTable:
         # This could save few queries
         update_S.reverse()
 
-        for s in update_S:
-            for e in update_E:
-                if len(self.T[s]) != len(self.E):
-                    output = tuple(self.sul.query(s + e))
-                    if self.prefixes_in_cell and len(e) > 1:
-                        obs_table_entry = tuple([output[-len(e):]],)
-                    else:
-                        obs_table_entry = (output[-1],)
-                    self.T[s] += obs_table_entry
+        # collect all missing cells, so that they can be queried as a single batch
+        missing_cells = []
+        for s in dict.fromkeys(update_S):
+            num_missing = len(self.E) - self._row_length(s)
+            missing_cells.extend((s, e) for e in update_E[:max(num_missing, 0)])
+
+        outputs = self.sul.query_batch([s + e for s, e in missing_cells])
+
+        for (s, e), output in zip(missing_cells, outputs):
+            output = tuple(output)
+            if self.prefixes_in_cell and len(e) > 1:
+                obs_table_entry = tuple([output[-len(e):]],)
+            else:
+                obs_table_entry = (output[-1],)
+            if self.column_store:
+                self.T.append(s, obs_table_entry[0])
+            else:
+                self.T[s] += obs_table_entry
+
+        if self.incremental:
+            for s in dict.fromkeys(s for s, _ in missing_cells):
+                self._index_row(s)
+
+        if self.incremental_hypothesis:
+            self.changed_rows.update(s for s, _ in missing_cells)
+
+    def _index_row(self, row):
+        """
+        Moves the row to the bucket of its current signature in the S or S.A index.
+        """
+        index = self.s_index if row in self.indexed_s else self.sa_index
+        old_signature = self.row_signature.get(row)
+        if old_signature is not None:
+            index[old_signature].discard(row)
+            if not index[old_signature]:
+                del index[old_signature]
+        signature = self._signature(row)
+        self.row_signature[row] = signature
+        index[signature].add(row)
+
+    def _sync_index_with_s(self):
+        """
+        Moves rows that were added to S since the last call from the S.A index to the S index.
+        """
+        num_new_rows = len(self.S) - len(self.indexed_s)
+        # rows are appended to S, therefore search for new rows starts from the end
+        for position in reversed(range(len(self.S))):
+            if num_new_rows == 0:
+                break
+            s = self.S[position]
+            if s in self.indexed_s:
+                continue
+            signature = self.row_signature.pop(s, None)
+            if signature is not None:
+                self.sa_index[signature].discard(s)
+                if not self.sa_index[signature]:
+                    del self.sa_index[signature]
+            self.indexed_s.add(s)
+            self.s_position[s] = position
+            self._index_row(s)
+            num_new_rows -= 1
+
+    def _get_rows_to_close_from_index(self):
+        """
+        Returns, for every signature of S.A rows that does not occur in S, the row that comes first in S.A order.
+        """
+        self._sync_index_with_s()
+        unclosed_signatures = [sig for sig in self.sa_index.keys() if sig not in self.s_index]
+        if not unclosed_signatures:
+            return []
+
+        s_position = self.s_position
+
+        def s_dot_a_order(row):
+            return s_position[row[:-1]], self.a_position[row[-1:]]
+
+        rows_to_close = [min(self.sa_index[sig], key=s_dot_a_order) for sig in unclosed_signatures]
+        rows_to_close.sort(key=s_dot_a_order)
+        return rows_to_close
+
+    def _get_causes_of_inconsistency_from_index(self):
+        """
+        Compares only rows of S that share a signature. Within a bucket of equal rows, the table is inconsistent iff
+        the first row (in S order) differs from another row in a one-letter extension.
+        """
+        self._sync_index_with_s()
+        s_position = self.s_position
+        cause = None
+        for rows in self.s_index.values():
+            if len(rows) < 2:
+                continue
+
+            rows = sorted(rows, key=s_position.get)
+            s1 = rows[0]
+            if cause is not None and s_position[s1] > s_position[cause[0]]:
+                continue
+            for s2 in rows[1:]:
+                a = next((a for a in self.A if self._signature(s1 + a) != self._signature(s2 + a)), None)
+                if a is not None:
+                    cause = (s1, s2, a)
+                    break
+
+        if cause is None:
+            return None
+
+        s1, s2, a = cause
+        for index, e in enumerate(self.E):
+            if self._cell(s1 + a, index) != self._cell(s2 + a, index):
+                return [(a + e)]
 
     def gen_hypothesis(self, no_cex_processing_used=False) -> Automaton:
         """
@@ -170,13 +320,15 @@ class ObservationTable:
         state_distinguish = dict()
         states_dict = dict()
         initial_state = None
-        automaton_class = {'dfa': Dfa, 'mealy': MealyMachine, 'moore': MooreMachine}
 
         s_set = self.S
         # Added check for the algorithm without counterexample processing
         if no_cex_processing_used:
             s_set = self._get_row_representatives()
 
+        if self.incremental_hypothesis:
+            return self._update_hypothesis(s_set)
+
         # create states based on S set
         stateCounter = 0
         for prefix in s_set:
@@ -184,14 +336,14 @@ class ObservationTable:
 
             if self.automaton_type == 'dfa':
                 states_dict[prefix] = DfaState(state_id)
-                states_dict[prefix].is_accepting = self.T[prefix][0]
+                states_dict[prefix].is_accepting = self._cell(prefix, 0)
             elif self.automaton_type == 'moore':
-                states_dict[prefix] = MooreState(state_id, output=self.T[prefix][0])
+                states_dict[prefix] = MooreState(state_id, output=self._cell(prefix, 0))
             else:
                 states_dict[prefix] = MealyState(state_id)
 
             states_dict[prefix].prefix = prefix
-            state_distinguish[tuple(self.T[prefix])] = states_dict[prefix]
+            state_distinguish[self._signature(prefix)] = states_dict[prefix]
 
             if not prefix:
                 initial_state = states_dict[prefix]
@@ -200,20 +352,85 @@ class ObservationTable:
         # add transitions based on extended S set
         for prefix in s_set:
             for a in self.A:
-                state_in_S = state_distinguish[self.T[prefix + a]]
+                state_in_S = state_distinguish[self._signature(prefix + a)]
                 states_dict[prefix].transitions[a[0]] = state_in_S
                 if self.automaton_type == 'mealy':
-                    states_dict[prefix].output_fun[a[0]] = self.T[prefix][self.E.index(a)]
+                    states_dict[prefix].output_fun[a[0]] = self._cell(prefix, self.E.index(a))
 
         automaton = automaton_class[self.automaton_type](initial_state, list(states_dict.values()))
         automaton.characterization_set = self.E
 
         return automaton
 
+    def _create_state(self, prefix):
+        if self.automaton_type == 'dfa':
+            state = DfaState(None, is_accepting=self._cell(prefix, 0))
+        elif self.automaton_type == 'moore':
+            state = MooreState(None, output=self._cell(prefix, 0))
+        else:
+            state = MealyState(None)
+            for a in self.A:
+                state.output_fun[a[0]] = self._cell(prefix, self.E.index(a))
+        state.prefix = prefix
+        return state
+
+    def _update_hypothesis(self, s_set):
+        """
+        Updates the persistent hypothesis to the current observation table. States of rows in s_set are reused and
+        states are only created for new rows. Outputs of a state depend only on its row prefix and do not change.
+        The transition of state s for input a is recomputed only if it is new, if row s.a or the row of its target
+        changed since the previous hypothesis, or if its target is no longer a state. Otherwise, rows of s.a and the
+        target were equal in the previous hypothesis and have not changed since.
+
+        Args:
+
+            s_set: prefixes of rows that form states of the hypothesis
+
+        Returns:
+
+            the updated hypothesis
+        """
+        states_dict = self.hypothesis_states
+        if len(states_dict) != len(s_set):
+            current_prefixes = set(s_set)
+            for prefix in [prefix for prefix in states_dict.keys() if prefix not in current_prefixes]:
+                del states_dict[prefix]
+
+        state_distinguish = dict()
+        for state_counter, prefix in enumerate(s_set):
+            state = states_dict.get(prefix)
+            if state is None:
+                state = self._create_state(prefix)
+                states_dict[prefix] = state
+            state.state_id = f's{state_counter}'
+            state_distinguish[self._signature(prefix)] = state
+
+        changed_rows = self.changed_rows
+        for prefix in s_set:
+            transitions = states_dict[prefix].transitions
+            for a in self.A:
+                target = transitions.get(a[0])
+                if target is None or prefix + a in changed_rows or target.prefix in changed_rows or \
+                        states_dict.get(target.prefix) is not target:
+                    transitions[a[0]] = state_distinguish[self._signature(prefix + a)]
+        changed_rows.clear()
+
+        states = [states_dict[prefix] for prefix in s_set]
+        if self.hypothesis is None:
+            self.hypothesis = automaton_class[self.automaton_type](states_dict[()], states)
+        else:
+            self.hypothesis.states = states
+            self.hypothesis.initial_state = states_dict[()]
+            self.hypothesis.reset_to_initial()
+        self.hypothesis.characterization_set = self.E
+
+        return self.hypothesis
+
     def _get_row_representatives(self):
         self.S.sort(key=len)
+        self.s_position = {s: i for i, s in enumerate(self.S)}
         representatives = defaultdict(list)
         for prefix in self.S:
-            representatives[self.T[prefix]].append(prefix)
+            representatives[self._signature(prefix)].append(prefix)
 
         return [r[0] for r in representatives.values()]
@@ -1,5 +1,6 @@
 from .ADS import Ads
-from .Apartness import Apartness
+from .Apartness import Apartness, IncrementalApartness
+from .CompactObservationTree import CompactNode, NodeStore
 from ... import Dfa, DfaState, MealyState, MealyMachine, MooreMachine, MooreState
 
 aut_type = ['dfa', 'mealy', 'moore']
@@ -93,9 +94,10 @@ class MealyNode:
 
 
 class ObservationTree:
-    def __init__(self, alphabet, sul, automaton_type, extension_rule, separation_rule):
+    def __init__(self, alphabet, sul, automaton_type, extension_rule, separation_rule, compact_tree=False):
         """
-        Initialize the tree with a root node and the alphabet
+        Initialize the tree with a root node and the alphabet. If compact_tree is True, nodes are stored in integer
+        arrays of a NodeStore instead of MealyNode/MooreNode objects, which reduces memory usage for large trees.
         """
         assert automaton_type in aut_type
         assert alphabet is not None and sul is not None
@@ -106,19 +108,23 @@ class ObservationTree:
         self.extension_rule = extension_rule
         self.separation_rule = separation_rule
 
-        if self.automaton_type == 'mealy':
+        self.node_store = NodeStore() if compact_tree else None
+        if compact_tree:
+            self.root = CompactNode(self.node_store, 0, self.automaton_type == 'mealy')
+        elif self.automaton_type == 'mealy':
             self.root = MealyNode()
         else:
             self.root = MooreNode()
-            # initialize MooreNode with empty word output
+        if self.automaton_type != 'mealy':
+            # initialize root node with empty word output
             self.root.output = self.sul.query([])[0]
 
         self.basis = []
         self.basis.append(self.root)
         self.frontier_to_basis_dict = {}
 
-        # Caches the separating sequences between basis states
-        self.witness_cache = {}
+        # Apartness of states and separating sequences of apart states, updated with every inserted observation
+        self.apartness = IncrementalApartness(self)
         # Maps the basis states to hypothesis states
         self.states_dict = dict()
 
@@ -127,9 +133,26 @@ class ObservationTree:
         if len(inputs) != len(outputs):
             raise ValueError("Inputs and outputs must have the same length.")
 
+        self.extend_tree(inputs, outputs)
+
+    def extend_tree(self, inputs, outputs):
+        """
+        Adds the inputs and outputs to the tree and updates the apartness of tracked pairs of states along the newly
+        added path. Returns the nodes on the path, starting with the root, and the length of the prefix of inputs that
+        was already defined in the tree.
+        """
         current_node = self.root
-        for input_val, output_val in zip(inputs, outputs):
+        path = [current_node]
+        known_prefix_len = len(inputs)
+        for ind, (input_val, output_val) in enumerate(zip(inputs, outputs)):
+            if known_prefix_len == len(inputs) and input_val not in current_node.successors:
+                known_prefix_len = ind
             current_node = current_node.extend_and_get(input_val, output_val)
+            path.append(current_node)
+
+        if known_prefix_len < len(inputs):
+            self.apartness.update(path, inputs, known_prefix_len)
+        return path, known_prefix_len
 
     def get_observation(self, inputs):
         # Retrieve the list of outputs based on a given input sequence
@@ -177,6 +200,8 @@ class ObservationTree:
 
     def get_transfer_sequence(self, from_node, to_node):
         # Get the transfer sequence (inputs) that moves from one node to another
+        if self.node_store is not None:
+            return self.node_store.transfer_sequence(from_node.id, to_node.id)
         transfer_sequence = []
         current_node = to_node
 
@@ -191,6 +216,8 @@ class ObservationTree:
 
     def get_access_sequence(self, to_node):
         # Get the transfer sequence (inputs) that moves from one node to another
+        if self.node_store is not None:
+            return tuple(self.node_store.transfer_sequence(0, to_node.id))
         transfer_sequence = []
         current_node = to_node
 
@@ -226,7 +253,7 @@ class ObservationTree:
 
         basis_list = self.frontier_to_basis_dict[frontier_state]
         self.frontier_to_basis_dict[frontier_state] = [basis_state for basis_state in basis_list
-                                                       if not Apartness.states_are_apart(frontier_state, basis_state, self)]
+                                                       if not self.apartness.states_are_apart(frontier_state, basis_state)]
 
     def update_frontier_to_basis_dict(self):
         """
@@ -237,7 +264,7 @@ class ObservationTree:
         for frontier_state, basis_list in self.frontier_to_basis_dict.items():
             self.frontier_to_basis_dict[frontier_state] = [
                 basis_state for basis_state in basis_list
-                if not Apartness.states_are_apart(frontier_state, basis_state, self)]
+                if not self.apartness.states_are_apart(frontier_state, basis_state)]
 
     def promote_frontier_state(self):
         """
@@ -250,7 +277,7 @@ class ObservationTree:
                 self.frontier_to_basis_dict.pop(new_basis)
 
                 for frontier_state, new_basis_list in self.frontier_to_basis_dict.items():
-                    if not Apartness.states_are_apart(new_basis, frontier_state, self):
+                    if not self.apartness.states_are_apart(new_basis, frontier_state):
                         new_basis_list.append(new_basis)
                 break
 
@@ -266,7 +293,7 @@ class ObservationTree:
 
                 self.frontier_to_basis_dict[maybe_frontier] = [
                     new_basis_state for new_basis_state in self.basis
-                    if not Apartness.states_are_apart(new_basis_state, maybe_frontier, self)
+                    if not self.apartness.states_are_apart(new_basis_state, maybe_frontier)
                 ]
 
     def is_observation_tree_adequate(self):
@@ -301,7 +328,7 @@ class ObservationTree:
     def find_basis_candidates(self, new_frontier):
         return {
             new_basis_state for new_basis_state in self.basis
-            if not Apartness.states_are_apart(new_basis_state, new_frontier, self)
+            if not self.apartness.states_are_apart(new_basis_state, new_frontier)
         }
 
     def explore_frontier(self, basis_state, inp):
@@ -389,20 +416,9 @@ class ObservationTree:
 
     def get_or_compute_witness(self, state_one, state_two):
         """
-        Get witness by checking cache and computing it otherwise.
-        Only add pairs (a,b) with a < b.
+        Get witness stored with the apartness of the states and computing it otherwise.
         """
-        if state_one.id < state_two.id:
-            pair = (state_one.id, state_two.id)
-        else:
-            pair = (state_two.id, state_one.id)
-
-        if pair in self.witness_cache:
-            return self.witness_cache.get(pair)
-
-        witness = Apartness.compute_witness(state_one, state_two, self)
-        self.witness_cache[pair] = witness
-        return witness
+        return self.apartness.get_witness(state_one, state_two)
 
     def make_frontiers_identified(self):
         # Loop over all frontier states to identify them
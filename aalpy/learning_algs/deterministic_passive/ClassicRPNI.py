@@ -1,17 +1,20 @@
 import time
 from bisect import insort
 from aalpy.learning_algs.deterministic_passive.rpni_helper_functions import to_automaton, createPTA, \
-    check_sequence, extract_unique_sequences
+    create_pta_in_parallel, check_sequence, extract_unique_sequences
 
 
 class ClassicRPNI:
-    def __init__(self, data, automaton_type, print_info=True):
+    def __init__(self, data, automaton_type, print_info=True, num_pta_workers=1):
         self.data = data
         self.automaton_type = automaton_type
         self.print_info = print_info
 
         pta_construction_start = time.time()
-        self.root_node = createPTA(data, automaton_type)
+        if num_pta_workers > 1:
+            self.root_node = create_pta_in_parallel(data, automaton_type, num_pta_workers)
+        else:
+            self.root_node = createPTA(data, automaton_type)
         self.test_data = extract_unique_sequences(self.root_node)
 
         if self.print_info:
@@ -1,18 +1,22 @@
 import time
 from collections import deque
 
-from aalpy.learning_algs.deterministic_passive.rpni_helper_functions import to_automaton, RpniNode, createPTA
+from aalpy.learning_algs.deterministic_passive.rpni_helper_functions import to_automaton, RpniNode, createPTA, \
+    create_pta_in_parallel
 
 
 class GsmRPNI:
-    def __init__(self, data, automaton_type, print_info=True):
+    def __init__(self, data, automaton_type, print_info=True, num_pta_workers=1):
         self.data = data
         self.final_automaton_type = automaton_type
         self.automaton_type = automaton_type if automaton_type != 'dfa' else 'moore'
         self.print_info = print_info
 
         pta_construction_start = time.time()
-        self.root_node = createPTA(data, self.automaton_type)
+        if num_pta_workers > 1:
+            self.root_node = create_pta_in_parallel(data, self.automaton_type, num_pta_workers)
+        else:
+            self.root_node = createPTA(data, self.automaton_type)
         self.log = []
 
         if self.print_info:
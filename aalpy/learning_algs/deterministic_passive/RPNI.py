@@ -6,7 +6,7 @@ from aalpy.learning_algs.deterministic_passive.GsmRPNI import GsmRPNI
 
 
 def run_RPNI(data, automaton_type, algorithm='gsm',
-             input_completeness=None, print_info=True) -> Union[DeterministicAutomaton, None]:
+             input_completeness=None, print_info=True, num_pta_workers=1) -> Union[DeterministicAutomaton, None]:
     """
     Run RPNI, a deterministic passive model learning algorithm.
     Resulting model conforms to the provided data.
@@ -22,6 +22,8 @@ def run_RPNI(data, automaton_type, algorithm='gsm',
         sink_state will lead all undefined inputs form some state to the sink state, whereas self_loop will simply create
         a self loop. In case of Mealy learning output of the added transition will be 'epsilon'.
         print_info: print learning progress and runtime information
+        num_pta_workers: if greater than 1, shards of the data are processed by the given number of worker processes
+        to construct the PTA in parallel
 
     Returns:
 
@@ -32,9 +34,9 @@ def run_RPNI(data, automaton_type, algorithm='gsm',
     assert input_completeness in {None, 'self_loop', 'sink_state'}
 
     if algorithm == 'classic':
-        rpni = ClassicRPNI(data, automaton_type, print_info)
+        rpni = ClassicRPNI(data, automaton_type, print_info, num_pta_workers)
     else:
-        rpni = GsmRPNI(data, automaton_type, print_info)
+        rpni = GsmRPNI(data, automaton_type, print_info, num_pta_workers)
 
     if rpni.root_node is None:
         print('Data provided to RPNI is not deterministic. Ensure that the data is deterministic, '
@@ -1,6 +1,8 @@
 import pickle
 from functools import total_ordering
 
+from aalpy.utils.ShardedPTA import build_shards_in_parallel
+
 
 @total_ordering
 class RpniNode:
@@ -98,6 +100,82 @@ def createPTA(data, automaton_type):
     return root_node
 
 
+def _merge_output(node, output):
+    """
+    Adds output observed in another partial PTA to the node. Returns False if outputs are inconsistent.
+    """
+    if node.type == 'mealy':
+        for symbol, label in output.items():
+            if symbol not in node.output:
+                node.output[symbol] = label
+            elif node.output[symbol] != label:
+                return False
+    elif output is not None:
+        if node.output is None:
+            node.output = output
+        elif node.output != output:
+            return False
+    return True
+
+
+def _build_pta_shard(shard, automaton_type):
+    root_node = createPTA(shard, automaton_type)
+    if root_node is None:
+        return None
+    # transitions in breadth-first order, the i-th transition leads to the node with index i + 1
+    edges = []
+    nodes = [root_node]
+    for node_index, node in enumerate(nodes):
+        for symbol, child in node.children.items():
+            edges.append((node_index, symbol, child.output))
+            nodes.append(child)
+    return root_node.output, edges
+
+
+def create_pta_in_parallel(data, automaton_type, num_workers=4, shard_size=10000):
+    """
+    Creates the same PTA as createPTA, but partial PTAs of shards of the data are built by worker processes and merged.
+
+    Args:
+
+        data: list of input sequences and corresponding labels
+
+        automaton_type: either 'moore', 'dfa' or 'mealy'
+
+        num_workers: number of worker processes (Default value = 4)
+
+        shard_size: number of sequences per shard (Default value = 10000)
+
+    Returns:
+
+        root node of the PTA, or None if data is not deterministic
+
+    """
+    data.sort(key=lambda x: len(x[0]))
+
+    root_node = RpniNode(automaton_type=automaton_type)
+    for shard_pta in build_shards_in_parallel(data, _build_pta_shard, (automaton_type,), num_workers, shard_size):
+        if shard_pta is None:
+            return None
+        root_output, edges = shard_pta
+        if not _merge_output(root_node, root_output):
+            return None
+
+        nodes = [root_node]
+        for node_index, symbol, output in edges:
+            node = nodes[node_index]
+            child = node.children.get(symbol)
+            if child is None:
+                child = RpniNode(automaton_type=automaton_type)
+                child.prefix = node.prefix + (symbol,)
+                node.children[symbol] = child
+            if not _merge_output(child, output):
+                return None
+            nodes.append(child)
+
+    return root_node
+
+
 def extract_unique_sequences(root_node):
     def get_leaf_nodes(root):
         leaves = []
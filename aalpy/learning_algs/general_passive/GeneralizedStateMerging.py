@@ -93,14 +93,18 @@ class GeneralizedStateMerging:
 
     # TODO: make more generic by adding the option to use a different algorithm than red blue
     #  for selecting potential merge candidates. Maybe using inheritance with abstract `run`.
-    def run(self, data, convert=True, instrumentation: Instrumentation=None, data_format="io_traces"):
+    def run(self, data, convert=True, instrumentation: Instrumentation=None, data_format="io_traces",
+            num_pta_workers=1):
         if instrumentation is None:
             instrumentation = Instrumentation()
         instrumentation.reset(self)
 
         if data_format == "labeled_sequences" and self.transition_behavior != "deterministic":
             raise ValueError("learning from labeled_sequences is not possible for nondeterministic systems")
-        root = GsmNode.createPTA(data, self.output_behavior, data_format)
+        if num_pta_workers > 1:
+            root = GsmNode.createPTA_in_parallel(data, self.output_behavior, data_format, num_pta_workers)
+        else:
+            root = GsmNode.createPTA(data, self.output_behavior, data_format)
 
         root = self.pta_preprocessing(root)
         instrumentation.pta_construction_done(root)
@@ -311,6 +315,7 @@ def run_GSM(data: list, *,
             instrumentation=None,
             convert=True,
             data_format='io_traces',
+            num_pta_workers=1,
             ):
     """
     Performs a state merging algorithm in the red-blue framework on provided data.
@@ -344,6 +349,9 @@ def run_GSM(data: list, *,
 
         data_format: Whether the input is given in the form of input-output traces or labeled input traces.
 
+        num_pta_workers: If greater than 1, shards of the data are processed by the given number of worker processes
+        to construct the PTA in parallel.
+
     Returns: The learned automaton.
     """
     # instantiate gsm
@@ -361,4 +369,5 @@ def run_GSM(data: list, *,
     )
 
     # run the algorithm
-    return gsm.run(data=data, instrumentation=instrumentation, convert=convert, data_format=data_format)
+    return gsm.run(data=data, instrumentation=instrumentation, convert=convert, data_format=data_format,
+                   num_pta_workers=num_pta_workers)
@@ -9,6 +9,7 @@ from copy import copy
 from aalpy.automata import StochasticMealyMachine, StochasticMealyState, MooreState, MooreMachine, NDMooreState, \
     NDMooreMachine, Mdp, MdpState, MealyMachine, MealyState, Onfsm, OnfsmState
 from aalpy.base import Automaton
+from aalpy.utils.ShardedPTA import build_shards_in_parallel
 
 Key = TypeVar("Key")
 Val = TypeVar("Val")
@@ -397,6 +398,51 @@ class GsmNode:
                 root_node.add_trace(trace)
         return root_node
 
+    @staticmethod
+    def createPTA_in_parallel(data, output_behavior, data_format=None, num_workers=4,
+                              shard_size=10000) -> 'GsmNode':
+        """
+        Creates the same PTA as createPTA, but partial PTAs of shards of the data are built by worker processes.
+        Partial PTAs are merged by summing transition counts.
+        """
+        if data_format not in DataFormatRange:
+            raise ValueError(f"invalid data format {data_format}. should be in {DataFormatRange}")
+
+        if data_format == "tree":
+            return data
+
+        root_node = None
+        for root_access_pair, edges in build_shards_in_parallel(data, _build_pta_shard,
+                                                                (output_behavior, data_format),
+                                                                num_workers, shard_size):
+            if root_node is None:
+                root_node = GsmNode(root_access_pair, None)
+            root_node.resolve_unknown_prefix_output(root_access_pair[1])
+
+            nodes = [root_node]
+            for node_index, in_sym, out_sym, count in edges:
+                transitions = nodes[node_index].get_or_create_transitions(in_sym)
+                info = transitions.get(out_sym)
+                if info is None and data_format == "labeled_sequences" and transitions:
+                    # deterministic, but the output may only be known in one of the partial PTAs
+                    (known_out_sym, info), = transitions.items()
+                    if known_out_sym is unknown_output:
+                        transitions[out_sym] = transitions.pop(unknown_output)
+                        info.target.resolve_unknown_prefix_output(out_sym)
+                    elif out_sym is not unknown_output:
+                        raise ValueError("nondeterminism encountered for GSM with labeled_sequences. not supported")
+                if info is None:
+                    node = GsmNode((in_sym, out_sym), nodes[node_index])
+                    info = TransitionInfo(node, 0, node, 0)
+                    transitions[out_sym] = info
+                info.count += count
+                info.original_count += count
+                nodes.append(info.target)
+
+        if root_node is None:
+            root_node = GsmNode((None, unknown_output), None)
+        return root_node
+
     def is_locally_deterministic(self):
         return all(len(item) == 1 for item in self.transitions.values())
 
@@ -439,6 +485,18 @@ class GsmNode:
         return sum(trans.count for _, trans in self.transition_iterator())
 
 
+def _build_pta_shard(shard, output_behavior, data_format):
+    root_node = GsmNode.createPTA(shard, output_behavior, data_format)
+    # transitions in breadth-first order, the i-th transition leads to the node with index i + 1
+    edges = []
+    nodes = [root_node]
+    for node_index, node in enumerate(nodes):
+        for (in_sym, out_sym), info in node.transition_iterator():
+            edges.append((node_index, in_sym, out_sym, info.count))
+            nodes.append(info.target)
+    return root_node.prefix_access_pair, edges
+
+
 class NodeOrders:
     NoCompare = lambda n: 0
     Default = functools.cmp_to_key(lambda a, b: -1 if a < b else 1)
@@ -24,12 +24,68 @@ chi2_table[0.999] = \
           (17, 40.79021670690253), (18, 42.31239633167996), (19, 43.82019596451753), (20, 45.31474661812586)])
 
 
+def frequency_matrices(cell_pairs):
+    """
+    Encodes pairs of cells as dense matrices. Row k of the first (second) frequency matrix contains the output
+    frequencies of the first (second) cell of the k-th pair, the masks indicate which outputs are observed in the cells.
+
+    Args:
+
+        cell_pairs: list of pairs of cells, i.e., dictionaries from outputs to frequencies
+
+    Returns:
+
+        frequency matrices of first and second cells, masks of first and second cells
+    """
+    import numpy as np
+
+    output_columns = dict()
+    rows, columns, frequencies = ([], []), ([], []), ([], [])
+    for row, cells in enumerate(cell_pairs):
+        for side, cell in enumerate(cells):
+            if not cell:
+                continue
+            for output, frequency in cell.items():
+                rows[side].append(row)
+                columns[side].append(output_columns.setdefault(output, len(output_columns)))
+                frequencies[side].append(frequency)
+
+    shape = (len(cell_pairs), len(output_columns))
+    matrices, masks = [], []
+    for side in range(2):
+        matrix, mask = np.zeros(shape), np.zeros(shape, dtype=bool)
+        matrix[rows[side], columns[side]] = frequencies[side]
+        mask[rows[side], columns[side]] = True
+        matrices.append(matrix)
+        masks.append(mask)
+    return matrices[0], matrices[1], masks[0], masks[1]
+
+
 class DifferenceChecker(ABC):
 
+    # batches of cell pairs of at least this size are evaluated with NumPy by checkers supporting it, if NumPy is
+    # installed
+    min_vectorized_batch_size = 32
+
     @abstractmethod
     def are_cells_different(self, c1: dict, c2: dict, **kwargs) -> bool:
         pass
 
+    def are_cells_different_batch(self, cell_pairs: list) -> list:
+        """
+        Checks many pairs of cells at once. Implementations can override this method to evaluate statistical tests
+        of all pairs together, by default cells are checked pair by pair.
+
+        Args:
+
+            cell_pairs: list of pairs of cells
+
+        Returns:
+
+            list containing for each pair True if cells are different, False otherwise
+        """
+        return [self.are_cells_different(c1, c2) for c1, c2 in cell_pairs]
+
     def difference_value(self, c1: dict, c2: dict):
         return None
 
@@ -56,6 +112,22 @@ class HoeffdingChecker(DifferenceChecker):
                     return True
         return False
 
+    def are_cells_different_batch(self, cell_pairs: list):
+        if len(cell_pairs) < self.min_vectorized_batch_size:
+            return super().are_cells_different_batch(cell_pairs)
+        try:
+            import numpy as np
+        except ImportError:
+            return super().are_cells_different_batch(cell_pairs)
+
+        f1, f2, m1, m2 = frequency_matrices(cell_pairs)
+        n1, n2 = f1.sum(axis=1, keepdims=True), f2.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bound = (np.sqrt(1 / n1) + np.sqrt(1 / n2)) * sqrt(0.5 * log(2 / self.alpha))
+            exceeded = (np.abs(f1 / n1 - f2 / n2) > bound) & m1
+        different = (m1 != m2).any(axis=1) | ((n1[:, 0] > 0) & (n2[:, 0] > 0) & exceeded.any(axis=1))
+        return different.tolist()
+
 
 def compute_epsilon(alpha1, n1):
     epsilon1 = sqrt((1. / (2 * n1)) * log(2. / alpha1))
@@ -84,6 +156,23 @@ class AdvancedHoeffdingChecker(DifferenceChecker):
                     return True
         return False
 
+    def are_cells_different_batch(self, cell_pairs: list):
+        if len(cell_pairs) < self.min_vectorized_batch_size:
+            return super().are_cells_different_batch(cell_pairs)
+        try:
+            import numpy as np
+        except ImportError:
+            return super().are_cells_different_batch(cell_pairs)
+
+        f1, f2, _, _ = frequency_matrices(cell_pairs)
+        n1, n2 = f1.sum(axis=1, keepdims=True), f2.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            epsilon1 = np.sqrt((1. / (2 * n1)) * log(2. / self.alpha))
+            epsilon2 = np.sqrt((1. / (2 * n2)) * log(2. / self.alpha))
+            exceeded = np.abs(f1 / n1 - f2 / n2) > epsilon1 + epsilon2
+        different = (n1[:, 0] > 0) & (n2[:, 0] > 0) & exceeded.any(axis=1)
+        return different.tolist()
+
     def use_diff_value(self):
         return self.use_diff
 
@@ -141,6 +230,46 @@ class ChiSquareChecker(DifferenceChecker):
 
         return Q >= chi2_val
 
+    def are_cells_different_batch(self, cell_pairs: list):
+        if len(cell_pairs) < self.min_vectorized_batch_size:
+            return super().are_cells_different_batch(cell_pairs)
+        try:
+            import numpy as np
+        except ImportError:
+            return super().are_cells_different_batch(cell_pairs)
+
+        f1, f2, m1, m2 = frequency_matrices(cell_pairs)
+        keys = m1 | m2
+        num_keys = keys.sum(axis=1)
+        dof = num_keys - 1
+
+        # cells without information or with a single output are not different
+        tested = m1.any(axis=1) & m2.any(axis=1) & (dof > 0)
+        # if the supports of the tested frequencies are disjoint chi2 makes no sense, use the Hoeffding test
+        disjoint = tested & ~(m1 & m2).any(axis=1)
+        chi2_tested = tested & ~disjoint
+
+        if chi2_tested.any() and dof[chi2_tested].max() not in self.chi2_values.keys():
+            raise ValueError("Too many possible outputs, chi2 table needs to be extended.")
+
+        n1, n2 = f1.sum(axis=1, keepdims=True), f2.sum(axis=1, keepdims=True)
+        yates_correction = np.where((num_keys == 2) & (keys & ((f1 < 5) | (f2 < 5))).any(axis=1), -0.5, 0)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p_hat = (f1 + f2) / (n1 + n2)
+            q_1 = (np.abs(f1 - n1 * p_hat) + yates_correction) ** 2 / (n1 * p_hat)
+            q_2 = (np.abs(f2 - n2 * p_hat) + yates_correction) ** 2 / (n2 * p_hat)
+            Q = np.where(keys, q_1 + q_2, 0).sum(axis=1)
+
+        chi2_values = np.array([self.chi2_values.get(d, np.inf) for d in dof.tolist()])
+        different = chi2_tested & (Q >= chi2_values)
+
+        if disjoint.any():
+            disjoint_indices = np.flatnonzero(disjoint).tolist()
+            hoeffding_checker = AdvancedHoeffdingChecker()
+            hoeffding_results = hoeffding_checker.are_cells_different_batch([cell_pairs[i] for i in disjoint_indices])
+            different[disjoint_indices] = hoeffding_results
+        return different.tolist()
+
     def use_diff_value(self):
         return self.use_diff
 
@@ -2,6 +2,7 @@ from collections import defaultdict
 
 from aalpy.automata import Mdp, MdpState, StochasticMealyState, StochasticMealyMachine
 from .DifferenceChecker import DifferenceChecker
+from .SamplingScheduler import SamplingScheduler
 from .StochasticTeacher import StochasticTeacher, Node
 from ...utils.HelperFunctions import is_suffix_of
 
@@ -10,7 +11,7 @@ class SamplingBasedObservationTable:
     def __init__(self, input_alphabet: list, automaton_type, teacher: StochasticTeacher,
                  compatibility_checker: DifferenceChecker,
                  alpha=0.05, strategy='normal',
-                 cex_processing=None):
+                 cex_processing=None, adaptive_sampling=False):
         """Constructor of the observation table. Initial queries are asked in the constructor.
 
         Args:
@@ -18,6 +19,7 @@ class SamplingBasedObservationTable:
           input_alphabet: input alphabet
           teacher: stochastic teacher
           alpha: constant used in Hoeffding bound
+          adaptive_sampling: if True, samples are allocated to cells by the SamplingScheduler (Default value = False)
 
         """
         self.compatibility_checker = compatibility_checker
@@ -50,6 +52,8 @@ class SamplingBasedObservationTable:
 
         self.unambiguity_values = []
 
+        self.sampling_scheduler = SamplingScheduler(self, alpha) if adaptive_sampling else None
+
     def refine_not_completed_cells(self, n_resample, uniform=False):
         """
         Firstly a prefix-tree acceptor is constructed for all non-completed cells and then that tree is used
@@ -85,6 +89,11 @@ class SamplingBasedObservationTable:
             for trace in to_refine:
                 self.add_to_PTA(pta_root, trace)
 
+        elif not uniform and self.sampling_scheduler:
+            frequencies, num_samples = self.sampling_scheduler.allocate()
+            for trace, frequency in frequencies.items():
+                self.add_to_PTA(pta_root, trace, frequency)
+
         else:
             for s in self.S + list(self.get_extended_s()):
                 if uniform:
@@ -105,7 +114,12 @@ class SamplingBasedObservationTable:
                         dynamic += uncertainty_value
                         self.add_to_PTA(pta_root, s + e, uncertainty_value)
 
-        resample_value = n_resample if self.strategy == 'classic' else max(dynamic // 2, 500)
+        if self.strategy == 'classic':
+            resample_value = n_resample
+        elif not uniform and self.sampling_scheduler:
+            resample_value = num_samples
+        else:
+            resample_value = max(dynamic // 2, 500)
 
         for i in range(resample_value):
             self.teacher.tree_query(pta_root)
@@ -482,6 +496,36 @@ class SamplingBasedObservationTable:
                 return False
         return True
 
+    def get_compatible_rows(self, s1, rows):
+        """
+        Returns the rows compatible with s1. Equivalent to checking are_rows_compatible for each row, but for each
+        element of E, cells of all rows are compared with a single batch call to the compatibility checker.
+
+        Args:
+          s1: prefix of row s1
+          rows: prefixes of rows to check
+
+        Returns:
+          list of rows compatible with s1, in the order of rows
+
+        """
+        if self.strategy not in {'classic', 'normal', 'chi2'}:
+            return [s2 for s2 in rows if self.are_rows_compatible(s1, s2)]
+
+        if self.automaton_type == 'mdp':
+            rows = [s2 for s2 in rows if s1[-1] == s2[-1]]
+
+        for e in self.E:
+            if self.strategy == 'classic':
+                tested = [s2 for s2 in rows if self.teacher.complete_query(s1, e) and self.teacher.complete_query(s2, e)]
+            else:
+                tested = [s2 for s2 in rows if e in self.T[s1] and e in self.T[s2]]
+            cell_pairs = [(self.T[s1][e], self.T[s2][e]) for s2 in tested]
+            different = {s2 for s2, diff in zip(tested, self.compatibility_checker.are_cells_different_batch(cell_pairs))
+                         if diff}
+            rows = [s2 for s2 in rows if s2 not in different]
+        return rows
+
     def update_compatibility_classes(self):
         """Updates the compatibility classes and stores their representatives."""
         self.compatibility_class.clear()
@@ -509,7 +553,7 @@ class SamplingBasedObservationTable:
             r = tmp_classes.pop(0)
             not_partitioned.remove(r)
 
-            cg_r = [s for s in not_partitioned if self.are_rows_compatible(r, s)]
+            cg_r = self.get_compatible_rows(r, not_partitioned)
 
             self.compatibility_class[r] = cg_r
 
@@ -0,0 +1,108 @@
+from math import sqrt, log
+
+
+class SamplingScheduler:
+    """
+    Allocates tree query samples to cells of a SamplingBasedObservationTable.
+
+    The confidence in a cell is described by the Hoeffding bound on the estimation error of its output distribution,
+    which shrinks with the number of observations of the cell. Samples are only informative for cells of ambiguous
+    rows, i.e. rows compatible with more than one compatibility class representative, and for cells whose bound is
+    still wide. Cells of unambiguous rows with a narrow bound are settled and receive no samples, all other cells are
+    sampled proportional to the ambiguity of their row. The number of tree queries is derived from the ambiguity of
+    the cells that are not settled, so the batch shrinks as the table becomes unambiguous.
+
+    Compatibility of a row with a representative only changes if one of them received new observations, hence
+    results of compatibility checks are cached together with the observation counts of both rows.
+    """
+
+    def __init__(self, observation_table, alpha=0.05, epsilon=0.1, min_batch_size=250):
+        """
+        Args:
+
+            observation_table: SamplingBasedObservationTable whose cells are refined
+
+            alpha: confidence level of the Hoeffding bound (Default value = 0.05)
+
+            epsilon: confidence bound below which cells of unambiguous rows are settled (Default value = 0.1)
+
+            min_batch_size: minimum number of tree queries per refinement (Default value = 250)
+        """
+        self.table = observation_table
+        self.bound_constant = log(2 / alpha) / 2
+        self.epsilon = epsilon
+        self.min_batch_size = min_batch_size
+
+        # (row, representative) -> (observation counts of row, observation counts of representative, compatible)
+        self.compatibility_cache = dict()
+
+    def confidence_bound(self, n):
+        """
+        Hoeffding bound on the estimation error of a cell with n observations.
+        """
+        return sqrt(self.bound_constant / n) if n > 0 else 1.
+
+    def _observation_counts(self, row):
+        cells = self.table.T[row]
+        return tuple(sum(cells[e].values()) if e in cells else -1 for e in self.table.E)
+
+    def num_compatible_representatives(self, row, representative_counts):
+        """
+        Returns the number of compatibility class representatives that the row is compatible with.
+
+        Args:
+
+            row: row of the observation table
+
+            representative_counts: list of pairs of representatives and their observation counts
+
+        Returns:
+
+            number of compatible representatives
+        """
+        row_counts = self._observation_counts(row)
+        num_compatible = 0
+        for representative, counts in representative_counts:
+            cached = self.compatibility_cache.get((row, representative))
+            if cached is not None and cached[0] == row_counts and cached[1] == counts:
+                compatible = cached[2]
+            else:
+                compatible = self.table.are_rows_compatible(row, representative)
+                self.compatibility_cache[(row, representative)] = (row_counts, counts, compatible)
+            num_compatible += compatible
+        return num_compatible
+
+    def allocate(self):
+        """
+        Computes sampling frequencies of the cells of S and S.A rows that are not settled and the number of tree
+        queries to perform.
+
+        Returns:
+
+            dictionary from traces (s + e) to sampling frequencies, number of tree queries
+        """
+        table = self.table
+        representative_counts = [(r, self._observation_counts(r)) for r in table.compatibility_classes_representatives]
+
+        frequencies = dict()
+        ambiguity = dict()
+        for s in table.S + list(table.get_extended_s()):
+            for e in table.E:
+                trace = s + e
+                row = trace[:-1]
+                while row not in table.T.keys():
+                    row = row[:-1]
+                if row not in ambiguity:
+                    num_compatible = self.num_compatible_representatives(row, representative_counts)
+                    # rows can be compatible with no representative if the table is not closed
+                    ambiguity[row] = max((num_compatible - 1) * 2, 1)
+                weight = ambiguity[row]
+
+                # T is a defaultdict, rows of S.A might not be populated yet
+                cell = table.T[s].get(e) if s in table.T else None
+                n = sum(cell.values()) if cell else 0
+                if weight == 1 and self.confidence_bound(n) <= self.epsilon:
+                    continue
+                frequencies[trace] = weight
+
+        return frequencies, max(sum(frequencies.values()) // 2, self.min_batch_size)
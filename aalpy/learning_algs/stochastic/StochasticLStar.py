@@ -24,7 +24,8 @@ available_oracles, available_oracles_error_msg = get_available_oracles_and_err_m
 def run_stochastic_Lstar(input_alphabet, sul: SUL, eq_oracle: Oracle, target_unambiguity=0.99,
                          min_rounds=10, max_rounds=200, automaton_type='mdp', strategy='normal',
                          cex_processing=None, samples_cex_strategy=None, stopping_range_dict='strict', custom_oracle=False,
-                         return_data=False, property_based_stopping=None, n_c=20, n_resample=100, print_level=2):
+                         return_data=False, property_based_stopping=None, n_c=20, n_resample=100, adaptive_sampling=False,
+                         print_level=2):
     """
     Learning of Markov Decision Processes and Stochastic Mealy machines based on 'L*-Based Learning of Markov Decision
     Processes' and 'Active Model Learning of Stochastic Reactive Systems' by Tappler et al.
@@ -71,6 +72,10 @@ def run_stochastic_Lstar(input_alphabet, sul: SUL, eq_oracle: Oracle, target_una
 
         n_resample: resampling size (Default value = 100), only used with 'classic' strategy
 
+        adaptive_sampling: if True, the number of samples of each cell is chosen based on the width of its Hoeffding
+            confidence interval and on the ambiguity of its row, so that samples are focused on cells that decide
+            compatibility of rows. Not used with 'classic' strategy (Default value = False)
+
         print_level: 0 - None, 1 - just results, 2 - current round and hypothesis size, 3 - educational/debug
             (Default value = 2)
 
@@ -111,7 +116,8 @@ def run_stochastic_Lstar(input_alphabet, sul: SUL, eq_oracle: Oracle, target_una
     observation_table = SamplingBasedObservationTable(input_alphabet, automaton_type,
                                                       stochastic_teacher, compatibility_checker=compatibility_checker,
                                                       strategy=strategy,
-                                                      cex_processing=cex_processing)
+                                                      cex_processing=cex_processing,
+                                                      adaptive_sampling=adaptive_sampling)
 
     start_time = time.time()
     eq_query_time = 0
@@ -1,35 +1,41 @@
 import time
 from bisect import insort
+from collections import deque
 
 from aalpy.automata import MarkovChain, MdpState, Mdp, McState, StochasticMealyState, \
     StochasticMealyMachine
 from aalpy.learning_algs.stochastic_passive.CompatibilityChecker import HoeffdingCompatibility
-from aalpy.learning_algs.stochastic_passive.FPTA import create_fpta
+from aalpy.learning_algs.stochastic_passive.FPTA import create_fpta, create_fpta_in_parallel, count_steps
 
 state_automaton_map = {'mc': (McState, MarkovChain), 'mdp': (MdpState, Mdp),
                        'smm': (StochasticMealyState, StochasticMealyMachine)}
 
 
 class Alergia:
-    def __init__(self, data, automaton_type, eps=0.05, compatibility_checker=None, print_info=False):
+    def __init__(self, data, automaton_type, eps=0.05, compatibility_checker=None, print_info=False,
+                 num_pta_workers=1):
         assert eps == 'auto' or 0 < eps <= 2
 
         self.automaton_type = automaton_type
         self.print_info = print_info
 
-        if eps == 'auto':
-            eps = 10 / sum(len(d) - 1 for d in data)  # len - 1 to ignore initial output
-
-        self.diff_checker = HoeffdingCompatibility(eps) if not compatibility_checker else compatibility_checker
-
         pta_start = time.time()
 
-        self.fpta = create_fpta(data, automaton_type)
+        if num_pta_workers > 1:
+            self.fpta = create_fpta_in_parallel(data, automaton_type, num_pta_workers)
+        else:
+            self.fpta = create_fpta(data, automaton_type)
 
         pta_time = round(time.time() - pta_start, 2)
         if self.print_info:
             print(f'PTA Construction Time:  {pta_time}')
 
+        # computed from the PTA, as data can only be iterated once
+        if eps == 'auto':
+            eps = 10 / count_steps(self.fpta, automaton_type)
+
+        self.diff_checker = HoeffdingCompatibility(eps) if not compatibility_checker else compatibility_checker
+
     def compatibility_test(self, a, b):
 
         # for MDPs and MC output of the state needs to be the same
@@ -51,17 +57,51 @@ class Alergia:
 
         return True
 
+    def batched_compatibility_test(self, a, b):
+        """
+        Equivalent to compatibility_test, but pairs of states reached with the same sequence from a and b are compared
+        in breadth-first order and statistical tests are evaluated with batch calls to the compatibility checker. The
+        batch size doubles after every batch, so that incompatible states are found after few tests, while compatible
+        states, for which all pairs have to be tested, are checked with large batches.
+        """
+        pairs = deque([(a, b)])
+        batch_size = 1
+        while pairs:
+            batch = []
+            while pairs and len(batch) < batch_size:
+                a, b = pairs.popleft()
+                # for MDPs and MC output of the state needs to be the same
+                if self.automaton_type != 'smm' and a.output != b.output:
+                    return False
+                # leaf nodes are merged
+                if a.original_children.keys() and b.original_children.keys():
+                    batch.append((a, b))
+
+            # if states are statistically different, do not merge
+            if any(self.diff_checker.are_states_different_batch(batch)):
+                return False
+
+            # check future for compatibility
+            for a, b in batch:
+                for el in set(a.original_children.keys()).intersection(b.original_children.keys()):
+                    pairs.append((a.original_children[el], b.original_children[el]))
+            batch_size *= 2
+
+        return True
+
     def merge(self, red_state, blue_state):
         b_prefix = blue_state.prefix
         to_update = self.fpta
         for p in b_prefix[:-1]:
             to_update = to_update.children[p]
 
+        to_update.make_mutable()
         to_update.children[b_prefix[-1]] = red_state
 
         self.fold(red_state, blue_state)
 
     def fold(self, red, blue):
+        red.make_mutable()
         for i, blue_child in blue.children.items():
             if i in red.children:
                 red.input_frequency[i] += blue.input_frequency[i]
@@ -81,10 +121,11 @@ class Alergia:
         while blue:
             # get lexicographically minimal blue node (one with the shortest prefix)
             lex_min_blue = min(list(blue))
+
             merged = False
 
             for red_state in red:
-                if self.compatibility_test(red_state, lex_min_blue):
+                if self.batched_compatibility_test(red_state, lex_min_blue):
                     self.merge(red_state, lex_min_blue)
                     merged = True
                     break
@@ -99,7 +140,7 @@ class Alergia:
                     if s not in red:
                         blue.append(s)
 
-        assert sorted(red, key=lambda x: len(x.prefix)) == red
+        assert sorted(red, key=lambda x: x.depth) == red
 
         self.normalize(red)
 
@@ -113,7 +154,7 @@ class Alergia:
         return self.to_automaton(red)
 
     def normalize(self, red):
-        red_sorted = sorted(list(red), key=lambda x: len(x.prefix))
+        red_sorted = sorted(list(red), key=lambda x: x.depth)
         for r in red_sorted:
             # Initializing in here saves many unnecessary initializations
             r.children_prob = dict()
@@ -162,7 +203,7 @@ class Alergia:
         return a_c(initial_state, states)
 
 
-def run_Alergia(data, automaton_type, eps=0.05, compatibility_checker=None, print_info=False):
+def run_Alergia(data, automaton_type, eps=0.05, compatibility_checker=None, print_info=False, num_pta_workers=1):
     """
     Run Alergia or IOAlergia on provided data.
 
@@ -172,6 +213,8 @@ def run_Alergia(data, automaton_type, eps=0.05, compatibility_checker=None, prin
         [O,(I,O), (I, O)_,...],..,] if learning MDPs, or [[I,O,I,O...], [I,O_,...],..,] if learning SMMs
          (I represents input, O output).
         Note that in whole data first symbol of each entry should be the same (Initial output of the MDP/MC).
+        Data is iterated only once, so sequences can be streamed from a file with the iterate_data method of a
+        DataHandler, e.g. run_Alergia(IODelimiterTokenizer().iterate_data(path), 'mdp').
 
         eps: epsilon value if you are using default HoeffdingCompatibility. If it is set to 'auto' it will be computed
         as 10/(all steps in the data)
@@ -184,13 +227,17 @@ def run_Alergia(data, automaton_type, eps=0.05, compatibility_checker=None, prin
         (note: not interchangeable, depends on data)
         print_info:
 
+        num_pta_workers: if greater than 1, shards of the data are processed by the given number of worker processes
+        to construct the frequency prefix tree in parallel (Default value = 1)
+
     Returns:
 
         mdp, smm, or markov chain
     """
     assert automaton_type in {'mdp', 'mc', 'smm'}
     alergia = Alergia(data, eps=eps, automaton_type=automaton_type,
-                      compatibility_checker=compatibility_checker, print_info=print_info)
+                      compatibility_checker=compatibility_checker, print_info=print_info,
+                      num_pta_workers=num_pta_workers)
     model = alergia.run()
     del alergia.fpta, alergia
     return model
@@ -207,6 +254,7 @@ def run_JAlergia(path_to_data_file, automaton_type, path_to_jAlergia_jar, eps=0.
         [[O,I,O,I,O...], [O,I,O_,...],..,] if learning MDPs (I represents input, O output), or
         [[I,O,I,O...], [I,O_,...],..,] if learning SMMs.
         Note that in whole data first symbol of each entry should be the same (Initial output of the MDP/MC).
+        Data stored in a file should be passed as the path to the file.
 
         eps: epsilon value
 
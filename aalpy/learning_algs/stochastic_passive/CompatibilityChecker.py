@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from array import array
 from math import sqrt, log
 
 from aalpy.learning_algs.stochastic_passive.FPTA import AlergiaPtaNode
@@ -10,15 +11,48 @@ class CompatibilityChecker(ABC):
     def are_states_different(self, a: AlergiaPtaNode, b: AlergiaPtaNode, **kwargs) -> bool:
         pass
 
+    def are_states_different_batch(self, state_pairs: list, **kwargs) -> list:
+        """
+        Checks many pairs of states at once. Implementations can override this method to evaluate the statistical
+        tests of all pairs together, by default states are checked pair by pair.
+
+        Args:
+
+            state_pairs: list of pairs of states
+
+        Returns:
+
+            list containing for each pair True if states are different, False otherwise
+        """
+        return [self.are_states_different(a, b, **kwargs) for a, b in state_pairs]
+
 
 class HoeffdingCompatibility(CompatibilityChecker):
-    def __init__(self, eps):
+    def __init__(self, eps, min_vectorized_batch_size=32):
+        """
+        Args:
+
+            eps: epsilon value of the Hoeffding bound
+
+            min_vectorized_batch_size: batches of state pairs of at least this size are evaluated with NumPy, if
+                it is installed (Default value = 32)
+        """
         self.eps = eps
         self.log_term = sqrt(0.5 * log(2 / self.eps))
+        self.min_vectorized_batch_size = min_vectorized_batch_size
+
+        # symbols of PTA edges are encoded as columns of frequency matrices, symbols with the same input form a group
+        self.symbol_columns = dict()
+        self.symbol_groups = array('q')
+        self.group_ids = dict()
+        # frequencies of encoded states in compressed sparse row format
+        self.state_offsets = array('q', [0])
+        self.state_columns = array('q')
+        self.state_counts = array('d')
 
-    def hoeffding_bound(self, a: dict, b: dict):
-        n1 = sum(a.values())
-        n2 = sum(b.values())
+    def hoeffding_bound(self, a: dict, b: dict, n1=None, n2=None):
+        n1 = sum(a.values()) if n1 is None else n1
+        n2 = sum(b.values()) if n2 is None else n2
 
         if n1 * n2 == 0:
             return False
@@ -40,11 +74,107 @@ class HoeffdingCompatibility(CompatibilityChecker):
             return False
 
         # assuming tuples are used for IOAlergia and not as Alergia outputs
-        if not isinstance(list(a.original_input_frequency.keys())[0], tuple):
+        if not isinstance(next(iter(a.original_input_frequency)), tuple):
             return self.hoeffding_bound(a.original_input_frequency, b.original_input_frequency)
 
         # IOAlergia: check hoeffding bound conditioned on inputs
-        for i in a.get_immutable_inputs().intersection(b.get_immutable_inputs()):
-            if self.hoeffding_bound(a.get_original_output_frequencies(i), b.get_original_output_frequencies(i)):
+        a_frequencies = a.get_original_frequencies_per_input()
+        b_frequencies = b.get_original_frequencies_per_input()
+        for i in a_frequencies.keys() & b_frequencies.keys():
+            a_total, a_output_frequencies = a_frequencies[i]
+            b_total, b_output_frequencies = b_frequencies[i]
+            if self.hoeffding_bound(a_output_frequencies, b_output_frequencies, a_total, b_total):
                 return True
         return False
+
+    def are_states_different_batch(self, state_pairs: list, **kwargs):
+        """
+        Checks many pairs of states at once. Frequencies of states are encoded as sparse rows of a frequency matrix and
+        Hoeffding bounds of all pairs are evaluated with NumPy. The encoding of a state is computed once, as states of
+        the PTA are compared many times. Small batches, and all batches if NumPy is not installed, are checked pair by
+        pair.
+
+        Args:
+
+            state_pairs: list of pairs of states
+
+        Returns:
+
+            list containing for each pair True if states are different, False otherwise
+        """
+        if len(state_pairs) < self.min_vectorized_batch_size:
+            return [self.are_states_different(a, b) for a, b in state_pairs]
+        try:
+            import numpy as np
+        except ImportError:
+            return [self.are_states_different(a, b) for a, b in state_pairs]
+
+        a_rows, a_columns, a_counts = self._get_frequencies(np, [a for a, _ in state_pairs])
+        b_rows, b_columns, b_counts = self._get_frequencies(np, [b for _, b in state_pairs])
+
+        num_pairs, num_groups = len(state_pairs), len(self.group_ids)
+        column_groups = np.frombuffer(self.symbol_groups, dtype=np.int64)
+        a_groups, b_groups = column_groups[a_columns], column_groups[b_columns]
+
+        # total frequencies of each input
+        a_totals = np.bincount(a_rows * num_groups + a_groups, a_counts, num_pairs * num_groups)
+        b_totals = np.bincount(b_rows * num_groups + b_groups, b_counts, num_pairs * num_groups)
+        with np.errstate(divide='ignore'):
+            bounds = (np.sqrt(1 / a_totals) + np.sqrt(1 / b_totals)) * self.log_term
+
+        # frequencies of the other state of a pair are looked up in dense matrices
+        a_frequencies = np.zeros((num_pairs, len(self.symbol_groups)))
+        b_frequencies = np.zeros((num_pairs, len(self.symbol_groups)))
+        a_frequencies[a_rows, a_columns] = a_counts
+        b_frequencies[b_rows, b_columns] = b_counts
+
+        different = np.zeros(num_pairs, dtype=bool)
+        # every symbol that needs to be compared has a non-zero frequency in at least one of the states
+        for rows, columns, groups in ((a_rows, a_columns, a_groups), (b_rows, b_columns, b_groups)):
+            group_index = rows * num_groups + groups
+            a_total, b_total = a_totals[group_index], b_totals[group_index]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                exceeded = np.abs(a_frequencies[rows, columns] / a_total - b_frequencies[rows, columns] / b_total) \
+                           > bounds[group_index]
+            # only inputs observed in both states are compared, no data is available for states without children
+            exceeded &= (a_total > 0) & (b_total > 0)
+            different[rows[exceeded]] = True
+
+        return different.tolist()
+
+    def _get_frequencies(self, np, states):
+        """
+        Returns row indices, columns and values of the frequency matrix whose rows are frequencies of given states.
+        """
+        indices = []
+        for state in states:
+            cache = state.compatibility_cache
+            if cache is None or cache[0] is not self:
+                cache = self._encode_state(state)
+            indices.append(cache[1])
+        indices = np.array(indices, dtype=np.int64)
+
+        offsets = np.frombuffer(self.state_offsets, dtype=np.int64)
+        starts = offsets[indices]
+        lengths = offsets[indices + 1] - starts
+        rows = np.repeat(np.arange(len(states)), lengths)
+        # positions of entries of each state in the arrays of all encoded states
+        positions = np.arange(len(rows)) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return rows, np.frombuffer(self.state_columns, dtype=np.int64)[positions], \
+            np.frombuffer(self.state_counts, dtype=np.float64)[positions]
+
+    def _encode_state(self, state):
+        for symbol, freq in state.original_input_frequency.items():
+            column = self.symbol_columns.get(symbol)
+            if column is None:
+                # assuming tuples are used for IOAlergia and not as Alergia outputs
+                group = symbol[0] if isinstance(symbol, tuple) else None
+                column = len(self.symbol_groups)
+                self.symbol_columns[symbol] = column
+                self.symbol_groups.append(self.group_ids.setdefault(group, len(self.group_ids)))
+            self.state_columns.append(column)
+            self.state_counts.append(freq)
+        self.state_offsets.append(len(self.state_columns))
+
+        state.compatibility_cache = (self, len(self.state_offsets) - 2)
+        return state.compatibility_cache
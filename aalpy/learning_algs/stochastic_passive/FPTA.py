@@ -1,23 +1,57 @@
 from functools import total_ordering
+from types import MappingProxyType
+
+from aalpy.utils.ShardedPTA import build_shards_in_parallel
+
+# shared by all nodes without successors, replaced by a dictionary once a successor is added
+_no_successors = MappingProxyType(dict())
 
 
 @total_ordering
 class AlergiaPtaNode:
-    __slots__ = ['prefix', 'output', 'input_frequency', 'children', 'original_input_frequency',
-                 'original_children', 'state_id', 'children_prob']
-
-    def __init__(self, output, prefix):
-        self.prefix = prefix
+    """
+    Node of the frequency prefix tree. The prefix leading to the node is not stored, but reconstructed from the parent
+    pointers. Mutable successors and frequencies are shared with the immutable ones until the node is first changed by
+    a merge, see make_mutable.
+    """
+    __slots__ = ['parent', 'parent_symbol', 'depth', 'output', 'input_frequency', 'children',
+                 'original_input_frequency', 'original_children', 'state_id', 'children_prob',
+                 'frequencies_per_input', 'compatibility_cache']
+
+    def __init__(self, output, parent=None, parent_symbol=None):
+        self.parent = parent
+        self.parent_symbol = parent_symbol
+        self.depth = parent.depth + 1 if parent is not None else 0
         self.output = output
-        # mutable values
-        self.input_frequency = dict()
-        self.children = dict()
         # immutable values used for statistical computability check
-        self.original_input_frequency = dict()
-        self.original_children = dict()
+        self.original_input_frequency = _no_successors
+        self.original_children = _no_successors
+        # mutable values
+        self.input_frequency = self.original_input_frequency
+        self.children = self.original_children
         # # for visualization
         self.state_id = None
         self.children_prob = None
+        # caches of immutable values, computed on demand for states that are checked for compatibility
+        self.frequencies_per_input = None
+        self.compatibility_cache = None
+
+    @property
+    def prefix(self):
+        prefix = [None] * self.depth
+        node = self
+        for ind in range(self.depth - 1, -1, -1):
+            prefix[ind] = node.parent_symbol
+            node = node.parent
+        return tuple(prefix)
+
+    def make_mutable(self):
+        """
+        Copies the successors and frequencies shared with the immutable values, so that they can be changed.
+        """
+        if self.children is self.original_children:
+            self.children = dict(self.original_children)
+            self.input_frequency = dict(self.original_input_frequency)
 
     def successors(self):
         return list(self.children.values())
@@ -40,49 +74,179 @@ class AlergiaPtaNode:
     def get_original_output_frequencies(self, target_input):
         return {o: freq for (i, o), freq in self.original_input_frequency.items() if i == target_input}
 
+    def get_original_frequencies_per_input(self):
+        """
+        Returns a dictionary mapping inputs to pairs of the total input frequency and the output frequencies of the
+        input. Computed once, as original frequencies do not change.
+        """
+        if self.frequencies_per_input is None:
+            self.frequencies_per_input = dict()
+            for (i, o), freq in self.original_input_frequency.items():
+                if i not in self.frequencies_per_input:
+                    self.frequencies_per_input[i] = [0, dict()]
+                self.frequencies_per_input[i][0] += freq
+                self.frequencies_per_input[i][1][o] = freq
+        return self.frequencies_per_input
+
     def __lt__(self, other):
-        return (len(self.prefix), self.prefix) < (len(other.prefix), other.prefix)
+        if self.depth != other.depth:
+            return self.depth < other.depth
+        # prefixes are compared from the nodes up to the common ancestor, the topmost difference decides the order
+        a, b = self, other
+        a_symbol = b_symbol = None
+        differ = False
+        while a is not b:
+            if a.parent_symbol != b.parent_symbol:
+                a_symbol, b_symbol = a.parent_symbol, b.parent_symbol
+                differ = True
+            a, b = a.parent, b.parent
+        return differ and a_symbol < b_symbol
 
     def __le__(self, other):
         return self < other or self == other
 
     def __eq__(self, other):
-        return self.prefix == other.prefix
+        if self.depth != other.depth:
+            return False
+        a, b = self, other
+        while a is not b:
+            if a.parent_symbol != b.parent_symbol:
+                return False
+            a, b = a.parent, b.parent
+        return True
+
+
+def _add_successor(node, el, automaton_type):
+    out = None
+    if automaton_type == 'mc':
+        out = el
+    elif automaton_type == 'mdp':
+        out = el[1]
+
+    if node.original_children is _no_successors:
+        node.original_children = node.children = dict()
+        node.original_input_frequency = node.input_frequency = dict()
+
+    reached_node = AlergiaPtaNode(out, node, el)
+    node.original_children[el] = reached_node
+    node.original_input_frequency[el] = 0
+    return reached_node
+
+
+def _check_initial_output(root_output, initial_output):
+    if initial_output != root_output:
+        print('All sequances passed to Alergia should have the same initial output!')
+        assert False
 
 
 def create_fpta(data, automaton_type):
+    """
+    Creates the frequency prefix tree of the data. Data is iterated only once, so it can be a generator reading
+    sequences lazily from a file, e.g. DataHandler.iterate_data.
+
+    Args:
+
+        data: iterable of sequences, see run_Alergia for their format
+
+        automaton_type: either 'mdp', 'mc', or 'smm'
+
+    Returns:
+
+        root node of the frequency prefix tree
+
+    """
     # in case of SMM, there is no initial input
     seq_iter_index = 0 if automaton_type == 'smm' else 1
 
-    initial_output = None if automaton_type == 'smm' else data[0][0]
-
-    root_node = AlergiaPtaNode(initial_output, ())
+    root_node = None
 
     for seq in data:
-        if automaton_type != 'smm' and seq[0] != root_node.output:
-            print('All sequances passed to Alergia should have the same initial output!')
-            assert False
+        if root_node is None:
+            initial_output = None if automaton_type == 'smm' else seq[0]
+            root_node = AlergiaPtaNode(initial_output)
+
+        if automaton_type != 'smm':
+            _check_initial_output(root_node.output, seq[0])
 
         curr_node = root_node
 
         for el in seq[seq_iter_index:]:
-            if el not in curr_node.children:
-                out = None
-                if automaton_type == 'mc':
-                    out = el
-                elif automaton_type == 'mdp':
-                    out = el[1]
+            reached_node = curr_node.original_children.get(el)
+            if reached_node is None:
+                reached_node = _add_successor(curr_node, el, automaton_type)
 
-                reached_node = AlergiaPtaNode(out, curr_node.prefix + (el,))
-                curr_node.children[el] = reached_node
-                curr_node.original_children[el] = reached_node
+            curr_node.original_input_frequency[el] += 1
 
-                curr_node.input_frequency[el] = 0
-                curr_node.original_input_frequency[el] = 0
+            curr_node = reached_node
 
-            curr_node.input_frequency[el] += 1
-            curr_node.original_input_frequency[el] += 1
+    assert root_node is not None, 'No sequences were passed to Alergia.'
+    return root_node
+
+
+def _build_fpta_shard(shard, automaton_type):
+    root_node = create_fpta(shard, automaton_type)
+    # transitions in breadth-first order, the i-th transition leads to the node with index i + 1
+    edges = []
+    nodes = [root_node]
+    for node_index, node in enumerate(nodes):
+        for el, child in node.original_children.items():
+            edges.append((node_index, el, node.original_input_frequency[el]))
+            nodes.append(child)
+    return root_node.output, edges
+
+
+def create_fpta_in_parallel(data, automaton_type, num_workers=4, shard_size=10000):
+    """
+    Creates the same frequency prefix tree as create_fpta, but partial trees of shards of the data are built by
+    worker processes. Partial trees are merged by summing frequencies of their transitions.
+
+    Args:
+
+        data: iterable of sequences, see run_Alergia for their format
 
-            curr_node = curr_node.children[el]
+        automaton_type: either 'mdp', 'mc', or 'smm'
 
+        num_workers: number of worker processes (Default value = 4)
+
+        shard_size: number of sequences per shard (Default value = 10000)
+
+    Returns:
+
+        root node of the frequency prefix tree
+
+    """
+    root_node = None
+    for initial_output, edges in build_shards_in_parallel(data, _build_fpta_shard, (automaton_type,),
+                                                          num_workers, shard_size):
+        if root_node is None:
+            root_node = AlergiaPtaNode(initial_output)
+
+        _check_initial_output(root_node.output, initial_output)
+
+        nodes = [root_node]
+        for node_index, el, freq in edges:
+            node = nodes[node_index]
+            reached_node = node.original_children.get(el)
+            if reached_node is None:
+                reached_node = _add_successor(node, el, automaton_type)
+            node.original_input_frequency[el] += freq
+            nodes.append(reached_node)
+
+    assert root_node is not None, 'No sequences were passed to Alergia.'
     return root_node
+
+
+def count_steps(root_node, automaton_type):
+    """
+    Returns the number of steps in the data from which the frequency prefix tree was created, without counting the
+    initial outputs of MDPs and MCs and the first step of each SMM sequence.
+    """
+    num_steps = 0
+    nodes = [root_node]
+    while nodes:
+        node = nodes.pop()
+        num_steps += sum(node.original_input_frequency.values())
+        nodes.extend(node.original_children.values())
+    if automaton_type == 'smm':
+        num_steps -= sum(root_node.original_input_frequency.values())
+    return num_steps
@@ -33,18 +33,12 @@ class BreadthFirstExplorationEqOracle(Oracle):
         shuffle(self.queue)
 
     def find_cex(self, hypothesis):
-
-        while self.queue:
-            test_case = self.queue.pop()
-            self.reset_hyp_and_sul(hypothesis)
-
-            for ind, letter in enumerate(test_case):
-                out_hyp = hypothesis.step(letter)
-                out_sul = self.sul.step(letter)
-                self.num_steps += 1
-
-                if out_hyp != out_sul:
-                    self.sul.post()
-                    return test_case[:ind + 1]
-
-        return None
+        checked = set()
+        cex = self.check_test_cases(hypothesis, self.generate_test_cases(),
+                                    on_checked=lambda index, _: checked.add(len(self.queue) - 1 - index))
+        # only checked test cases are removed from the queue
+        self.queue = [test_case for index, test_case in enumerate(self.queue) if index not in checked]
+        return cex
+
+    def generate_test_cases(self):
+        yield from reversed(self.queue)
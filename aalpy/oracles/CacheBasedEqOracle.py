@@ -1,4 +1,5 @@
 from aalpy.base import Oracle, SUL
+from aalpy.base.CacheTree import ArrayCacheTree
 from aalpy.base.SUL import CacheSUL
 
 from random import choice
@@ -40,37 +41,28 @@ class CacheBasedEqOracle(Oracle):
         assert isinstance(self.sul, CacheSUL)
         self.cache_tree = self.sul.cache
 
-        paths_to_leaves = self.get_paths(self.cache_tree.root_node)
+        if isinstance(self.cache_tree, ArrayCacheTree):
+            paths_to_leaves = self.cache_tree.get_paths_to_leaves()
+        else:
+            paths_to_leaves = self.get_paths(self.cache_tree.root_node)
         max_tree_depth = len(max(paths_to_leaves, key=len))
 
-        while self.num_walks_done < self.num_walks:
-            self.num_walks_done += 1
-            self.reset_hyp_and_sul(hypothesis)
+        cex = self.check_test_cases(hypothesis, self.generate_test_cases(paths_to_leaves, max_tree_depth),
+                                    on_checked=self._count_walk)
+        if cex is None:
+            return None
+        if self.reset_after_cex:
+            self.num_walks_done = 0
+        return list(cex)
 
+    def generate_test_cases(self, paths_to_leaves, max_tree_depth):
+        for _ in range(self.num_walks - self.num_walks_done):
             prefix = choice(paths_to_leaves)
             walk_len = (max_tree_depth + self.depth_increase) - len(prefix)
-            inputs = []
-            inputs.extend(prefix)
-
-            for p in prefix:
-                hypothesis.step(p)
-                self.sul.step(p)
-                self.num_steps += 1
-
-            for _ in range(walk_len):
-                inputs.append(choice(self.alphabet))
-
-                out_sul = self.sul.step(inputs[-1])
-                out_hyp = hypothesis.step(inputs[-1])
-                self.num_steps += 1
-
-                if out_sul != out_hyp:
-                    if self.reset_after_cex:
-                        self.num_walks_done = 0
-                    self.sul.post()
-                    return inputs
+            yield list(prefix) + [choice(self.alphabet) for _ in range(walk_len)]
 
-        return None
+    def _count_walk(self, index, num_steps):
+        self.num_walks_done += 1
 
     def get_paths(self, t, paths=None, current_path=None):
         """
@@ -26,21 +26,10 @@ class PacOracle(Oracle):
         self.round += 1
         num_test_cases = 1 / self.epsilon * (log(1 / self.delta) + self.round * log(2))
 
-        for i in range(ceil(num_test_cases)):
-            inputs = []
-            self.reset_hyp_and_sul(hypothesis)
+        cex = self.check_test_cases(hypothesis, self.generate_test_cases(ceil(num_test_cases)))
+        return list(cex) if cex is not None else None
 
+    def generate_test_cases(self, num_test_cases):
+        for _ in range(num_test_cases):
             num_steps = randint(self.min_walk_len, self.max_walk_len)
-
-            for _ in range(num_steps):
-                inputs.append(choice(self.alphabet))
-
-                out_sul = self.sul.step(inputs[-1])
-                out_hyp = hypothesis.step(inputs[-1])
-                self.num_steps += 1
-
-                if out_sul != out_hyp:
-                    self.sul.post()
-                    return inputs
-
-        return None
+            yield [choice(self.alphabet) for _ in range(num_steps)]
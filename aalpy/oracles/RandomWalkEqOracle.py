@@ -39,6 +39,9 @@ class RandomWalkEqOracle(Oracle):
         if not self.automata_type:
             self.automata_type = automaton_dict.get(type(hypothesis), 'det')
 
+        if self.automata_type == 'det':
+            return self._find_cex_deterministic(hypothesis)
+
         inputs = []
         outputs = []
         self.reset_hyp_and_sul(hypothesis)
@@ -57,18 +60,9 @@ class RandomWalkEqOracle(Oracle):
             out_sul = self.sul.step(inputs[-1])
             outputs.append(out_sul)
 
-            if self.automata_type == 'det':
-                out_hyp = hypothesis.step(inputs[-1])
-            else:
-                out_hyp = hypothesis.step_to(inputs[-1], out_sul)
+            out_hyp = hypothesis.step_to(inputs[-1], out_sul)
 
-            if self.automata_type == 'det' and out_sul != out_hyp:
-                if self.reset_after_cex:
-                    self.random_steps_done = 0
-
-                self.sul.post()
-                return inputs
-            elif out_hyp is None:
+            if out_hyp is None:
                 if self.reset_after_cex:
                     self.random_steps_done = 0
                 self.sul.post()
@@ -84,6 +78,36 @@ class RandomWalkEqOracle(Oracle):
 
         return None
 
+    def _find_cex_deterministic(self, hypothesis):
+        cex = self.check_test_cases(hypothesis, self.generate_test_cases(), on_checked=self._count_steps)
+        if cex is None:
+            return None
+        if self.reset_after_cex:
+            self.random_steps_done = 0
+        return list(cex)
+
+    def generate_test_cases(self):
+        """
+        Splits the random walk into test cases at resets. Each test case is generated before it is executed, so that
+        test cases whose outputs are already in the cache of the SUL are checked without interacting with it, and
+        test cases can be executed in parallel. Random numbers are drawn in the same order as in a step-by-step walk.
+        Steps are counted in random_steps_done once they are checked, see _count_steps.
+        """
+        test_case = []
+        for _ in range(self.step_limit - self.random_steps_done):
+            if random.random() <= self.reset_prob and test_case:
+                yield test_case
+                test_case = []
+
+            test_case.append(random.choice(self.alphabet))
+
+        if test_case:
+            yield test_case
+
+    def _count_steps(self, index, num_steps):
+        # only the steps up to the counterexample are counted if a test case fails
+        self.random_steps_done += num_steps
+
     def reset_counter(self):
         if self.reset_after_cex:
             self.random_steps_done = 0
\ No newline at end of file
@@ -44,6 +44,21 @@ class RandomWordEqOracle(Oracle):
         if not self.automata_type:
             self.automata_type = automaton_dict.get(type(hypothesis), 'det')
 
+        if self.automata_type == 'det':
+            checked = []
+            cex = self.check_test_cases(hypothesis, self.generate_test_cases(),
+                                        on_checked=lambda index, _: checked.append(index))
+            # walk lengths of test cases that were generated but not checked are kept for the next call
+            self.num_walks_done += len(checked)
+            checked = set(checked)
+            self.walk_lengths = [length for index, length in enumerate(self.walk_lengths) if index not in checked]
+            if cex is None:
+                return None
+            if self.reset_after_cex:
+                self.walk_lengths = [randint(self.min_walk_len, self.max_walk_len) for _ in range(self.num_walks)]
+                self.num_walks_done = 0
+            return list(cex)
+
         while self.num_walks_done < self.num_walks:
             inputs = []
             outputs = []
@@ -56,23 +71,12 @@ class RandomWordEqOracle(Oracle):
                 inputs.append(choice(self.alphabet))
 
                 out_sul = self.sul.step(inputs[-1])
-                if self.automata_type == 'det':
-                    out_hyp = hypothesis.step(inputs[-1])
-                else:
-                    out_hyp = hypothesis.step_to(inputs[-1], out_sul)
-                    outputs.append(out_sul)
+                out_hyp = hypothesis.step_to(inputs[-1], out_sul)
+                outputs.append(out_sul)
 
                 self.num_steps += 1
 
-                if self.automata_type == 'det' and out_sul != out_hyp:
-                    if self.reset_after_cex:
-                        self.walk_lengths = [randint(self.min_walk_len, self.max_walk_len) for _ in range(self.num_walks)]
-                        self.num_walks_done = 0
-
-                    self.sul.post()
-                    return inputs
-
-                elif out_hyp is None:
+                if out_hyp is None:
                     self.sul.post()
 
                     if self.reset_after_cex:
@@ -90,6 +94,10 @@ class RandomWordEqOracle(Oracle):
 
         return None
 
+    def generate_test_cases(self):
+        for num_steps in self.walk_lengths[:self.num_walks - self.num_walks_done]:
+            yield [choice(self.alphabet) for _ in range(num_steps)]
+
     def reset_counter(self):
         if self.reset_after_cex:
             self.num_walks_done = 0
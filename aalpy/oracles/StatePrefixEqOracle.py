@@ -52,27 +52,13 @@ class StatePrefixEqOracle(Oracle):
         else:
             random.shuffle(states_to_cover)
 
-        for state in states_to_cover:
-            self.freq_dict[state.prefix] = self.freq_dict[state.prefix] + 1
-
-            self.reset_hyp_and_sul(hypothesis)
-
-            prefix = state.prefix
-            for p in prefix:
-                hypothesis.step(p)
-                self.sul.step(p)
-                self.num_steps += 1
+        def count_walk(index, _):
+            prefix = states_to_cover[index].prefix
+            self.freq_dict[prefix] = self.freq_dict[prefix] + 1
 
-            suffix = ()
-            for _ in range(self.steps_per_walk):
-                suffix += (random.choice(self.alphabet),)
+        return self.check_test_cases(hypothesis, self.generate_test_cases(states_to_cover), on_checked=count_walk)
 
-                out_sul = self.sul.step(suffix[-1])
-                out_hyp = hypothesis.step(suffix[-1])
-                self.num_steps += 1
-
-                if out_sul != out_hyp:
-                    self.sul.post()
-                    return prefix + suffix
-
-        return None
+    def generate_test_cases(self, states_to_cover):
+        for state in states_to_cover:
+            suffix = tuple(random.choice(self.alphabet) for _ in range(self.steps_per_walk))
+            yield state.prefix + suffix
@@ -27,10 +27,11 @@ class TransitionFocusOracle(Oracle):
         self.same_state_prob = same_state_prob
 
     def find_cex(self, hypothesis):
+        cex = self.check_test_cases(hypothesis, self.generate_test_cases(hypothesis))
+        return list(cex) if cex is not None else None
 
+    def generate_test_cases(self, hypothesis):
         for _ in range(self.num_walks):
-            self.reset_hyp_and_sul(hypothesis)
-
             curr_state = hypothesis.initial_state
             inputs = []
             for _ in range(self.steps_per_walk):
@@ -42,12 +43,4 @@ class TransitionFocusOracle(Oracle):
                 act = random.choice(possible_inputs) if possible_inputs else random.choice(self.alphabet)
                 inputs.append(act)
 
-                out_sul = self.sul.step(inputs[-1])
-                out_hyp = hypothesis.step(inputs[-1])
-                self.num_steps += 1
-
-                if out_sul != out_hyp:
-                    self.sul.post()
-                    return inputs
-
-        return None
+            yield inputs
@@ -2,6 +2,7 @@ from random import shuffle, choice, randint
 
 from aalpy.base.Oracle import Oracle
 from aalpy.base.SUL import SUL
+from aalpy.base.WordTrie import WordTrie
 from itertools import product
 
 
@@ -11,7 +12,8 @@ class WMethodEqOracle(Oracle):
     finite-state machines'.
     """
 
-    def __init__(self, alphabet: list, sul: SUL, max_number_of_states, shuffle_test_set=True):
+    def __init__(self, alphabet: list, sul: SUL, max_number_of_states, shuffle_test_set=True, batch_size=None,
+                 max_cache_nodes=1000000):
         """
         Args:
 
@@ -19,12 +21,17 @@ class WMethodEqOracle(Oracle):
             sul: system under learning
             max_number_of_states: maximum number of states in the automaton
             shuffle_test_set: if True, test cases will be shuffled
+            batch_size: if set, test cases are submitted to the SUL in batches of given size via SUL.query_batch,
+                otherwise every test case is executed step by step (Default value = None)
+            max_cache_nodes: maximum number of nodes of the trie of passed test cases. If it is exceeded, the trie is
+                cleared and test cases may be executed again (Default value = 1000000)
         """
 
         super().__init__(alphabet, sul)
         self.m = max_number_of_states
         self.shuffle = shuffle_test_set
-        self.cache = set()
+        self.batch_size = batch_size
+        self.cache = WordTrie(max_cache_nodes)
 
     def test_suite(self, cover, depth, char_set):
         """
@@ -59,23 +66,8 @@ class WMethodEqOracle(Oracle):
         ]
 
         depth = self.m + 1 - len(hypothesis.states)
-        for seq in self.test_suite(transition_cover, depth, hypothesis.characterization_set):
-            if seq not in self.cache:
-                self.reset_hyp_and_sul(hypothesis)
-                outputs = []
-
-                for ind, letter in enumerate(seq):
-                    out_hyp = hypothesis.step(letter)
-                    out_sul = self.sul.step(letter)
-                    self.num_steps += 1
-
-                    outputs.append(out_sul)
-                    if out_hyp != out_sul:
-                        self.sul.post()
-                        return seq[:ind + 1]
-                self.cache.add(seq)
-
-        return None
+        test_suite = self.test_suite(transition_cover, depth, hypothesis.characterization_set)
+        return self.execute_test_suite(hypothesis, test_suite, self.cache, self.batch_size)
 
 
 class RandomWMethodEqOracle(Oracle):
@@ -122,23 +114,16 @@ class RandomWMethodEqOracle(Oracle):
 
         shuffle(states_to_cover)
 
-        for state in states_to_cover:
-            self.freq_dict[state.prefix] = self.freq_dict[state.prefix] + 1
+        def count_walk(index, _):
+            prefix = states_to_cover[index].prefix
+            self.freq_dict[prefix] = self.freq_dict[prefix] + 1
 
-            self.reset_hyp_and_sul(hypothesis)
+        return self.check_test_cases(hypothesis, self.generate_test_cases(hypothesis, states_to_cover),
+                                     on_checked=count_walk)
 
+    def generate_test_cases(self, hypothesis, states_to_cover):
+        for state in states_to_cover:
             prefix = state.prefix
             random_walk = tuple(choice(self.alphabet) for _ in range(randint(1, self.random_walk_len)))
 
-            test_case = prefix + random_walk + choice(hypothesis.characterization_set)
-
-            for ind, i in enumerate(test_case):
-                output_hyp = hypothesis.step(i)
-                output_sul = self.sul.step(i)
-                self.num_steps += 1
-
-                if output_sul != output_hyp:
-                    self.sul.post()
-                    return test_case[:ind + 1]
-
-        return None
+            yield prefix + random_walk + choice(hypothesis.characterization_set)
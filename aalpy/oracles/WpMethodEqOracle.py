@@ -1,25 +1,22 @@
 import random
 from aalpy.base.Oracle import Oracle
 from aalpy.base.SUL import SUL
+from aalpy.base.WordTrie import WordTrie
 from itertools import chain, product
 
 
-def state_characterization_set(hypothesis, alphabet, state):
+def state_characterization_set(hypothesis, alphabet, state, splitting_tree=None):
     """
     Return a list of sequences that distinguish the given state from all other states in the hypothesis.
     Args:
         hypothesis: hypothesis automaton
         alphabet: input alphabet
         state: state for which to find distinguishing sequences
+        splitting_tree: splitting tree of the hypothesis, computed if not given
     """
-    result = []
-    for i in range(len(hypothesis.states)):
-        if hypothesis.states[i] == state:
-            continue
-        seq = hypothesis.find_distinguishing_seq(state, hypothesis.states[i], alphabet)
-        if seq:
-            result.append(tuple(seq))
-    return result
+    if splitting_tree is None:
+        splitting_tree = hypothesis.compute_splitting_tree(alphabet=alphabet)
+    return splitting_tree.get_state_identifier(state)
 
 
 def first_phase_it(alphabet, state_cover, depth, char_set):
@@ -50,6 +47,7 @@ def second_phase_it(hyp, alphabet, difference, depth):
         depth: maximum length of middle part
     """
     state_mapping = {}
+    splitting_tree = hyp.compute_splitting_tree(alphabet=alphabet)
     for d in range(depth):
         middle = product(alphabet, repeat=d)
         for mid in middle:
@@ -57,7 +55,7 @@ def second_phase_it(hyp, alphabet, difference, depth):
                 _ = hyp.execute_sequence(hyp.initial_state, t + mid)
                 state = hyp.current_state
                 if state not in state_mapping:
-                    state_mapping[state] = state_characterization_set(hyp, alphabet, state)
+                    state_mapping[state] = state_characterization_set(hyp, alphabet, state, splitting_tree)
 
                 for sm in state_mapping[state]:
                     yield t + mid + sm
@@ -68,10 +66,23 @@ class WpMethodEqOracle(Oracle):
     Implements the Wp-method equivalence oracle.
     """
 
-    def __init__(self, alphabet: list, sul: SUL, max_number_of_states=4):
+    def __init__(self, alphabet: list, sul: SUL, max_number_of_states=4, batch_size=None,
+                 max_cache_nodes=1000000):
+        """
+        Args:
+
+            alphabet: input alphabet
+            sul: system under learning
+            max_number_of_states: maximum number of states in the automaton
+            batch_size: if set, test cases are submitted to the SUL in batches of given size via SUL.query_batch,
+                otherwise every test case is executed step by step (Default value = None)
+            max_cache_nodes: maximum number of nodes of the trie of passed test cases. If it is exceeded, the trie is
+                cleared and test cases may be executed again (Default value = 1000000)
+        """
         super().__init__(alphabet, sul)
         self.m = max_number_of_states
-        self.cache = set()
+        self.batch_size = batch_size
+        self.cache = WordTrie(max_cache_nodes)
 
     def find_cex(self, hypothesis):
         if not hypothesis.characterization_set:
@@ -94,21 +105,7 @@ class WpMethodEqOracle(Oracle):
         second_phase = second_phase_it(hypothesis, self.alphabet, difference, depth)
         test_suite = chain(first_phase, second_phase)
 
-        for seq in test_suite:
-            if seq not in self.cache:
-                self.reset_hyp_and_sul(hypothesis)
-
-                for ind, letter in enumerate(seq):
-                    out_hyp = hypothesis.step(letter)
-                    out_sul = self.sul.step(letter)
-                    self.num_steps += 1
-
-                    if out_hyp != out_sul:
-                        self.sul.post()
-                        return seq[: ind + 1]
-                self.cache.add(seq)
-
-        return None
+        return self.execute_test_suite(hypothesis, test_suite, self.cache, self.batch_size)
 
 
 class RandomWpMethodEqOracle(Oracle):
@@ -134,8 +131,13 @@ class RandomWpMethodEqOracle(Oracle):
         if not hypothesis.characterization_set:
             hypothesis.characterization_set = [(a,) for a in hypothesis.get_input_alphabet()]
 
-        state_mapping = {s : state_characterization_set(hypothesis, self.alphabet, s) for s in hypothesis.states}
+        splitting_tree = hypothesis.compute_splitting_tree(alphabet=self.alphabet)
+        state_mapping = {s: state_characterization_set(hypothesis, self.alphabet, s, splitting_tree)
+                         for s in hypothesis.states}
 
+        return self.check_test_cases(hypothesis, self.generate_test_cases(hypothesis, state_mapping))
+
+    def generate_test_cases(self, hypothesis, state_mapping):
         for _ in range(self.bound):
             state = random.choice(hypothesis.states)
             input = state.prefix
@@ -155,13 +157,4 @@ class RandomWpMethodEqOracle(Oracle):
                 else:
                     continue
 
-            self.reset_hyp_and_sul(hypothesis)
-            for ind, letter in enumerate(input):
-                out_hyp = hypothesis.step(letter)
-                out_sul = self.sul.step(letter)
-                self.num_steps += 1
-
-                if out_hyp != out_sul:
-                    self.sul.post()
-                    return input[: ind + 1]
-        return None
+            yield input
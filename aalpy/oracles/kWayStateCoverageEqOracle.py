@@ -33,31 +33,32 @@ class KWayStateCoverageEqOracle(Oracle):
         self.random_walk_len = random_walk_len
 
     def find_cex(self, hypothesis):
+        # state prefixes of generated test cases, they are added to the cache once the test case is checked
+        generated_prefixes = []
 
+        def cover_prefixes(index, _):
+            if generated_prefixes[index] is not None:
+                self.cache.add(generated_prefixes[index])
+
+        return self.check_test_cases(hypothesis, self.generate_test_cases(hypothesis, generated_prefixes),
+                                     on_checked=cover_prefixes)
+
+    def generate_test_cases(self, hypothesis, generated_prefixes):
         if len(hypothesis.states) == 1:
             for _ in range(self.random_walk_len):
-                path = choices(self.alphabet, k=self.random_walk_len)
-                hypothesis.reset_to_initial()
-                self.sul.post()
-                self.sul.pre()
-                for i, p in enumerate(path):
-                    out_sul = self.sul.step(p)
-                    out_hyp = hypothesis.step(p)
-                    self.num_steps += 1
-
-                    if out_sul != out_hyp:
-                        self.sul.post()
-                        return path[:i + 1]
+                generated_prefixes.append(None)
+                yield choices(self.alphabet, k=self.random_walk_len)
 
         states = hypothesis.states
         shuffle(states)
 
+        generated = set()
         for comb in self.fun(hypothesis.states, self.k):
             prefixes = frozenset([c.prefix for c in comb])
-            if prefixes in self.cache:
+            if prefixes in self.cache or prefixes in generated:
                 continue
             else:
-                self.cache.add(prefixes)
+                generated.add(prefixes)
 
             index = 0
             path = comb[0].prefix
@@ -79,16 +80,5 @@ class KWayStateCoverageEqOracle(Oracle):
                 continue
 
             path += tuple(choices(self.alphabet, k=self.random_walk_len))
-
-            self.reset_hyp_and_sul(hypothesis)
-
-            for i, p in enumerate(path):
-                out_sul = self.sul.step(p)
-                out_hyp = hypothesis.step(p)
-                self.num_steps += 1
-
-                if out_sul != out_hyp:
-                    self.sul.post()
-                    return path[:i + 1]
-
-        return None
+            generated_prefixes.append(prefixes)
+            yield path
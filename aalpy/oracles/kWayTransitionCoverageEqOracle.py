@@ -1,4 +1,5 @@
 from collections import namedtuple
+from heapq import heapify, heappop, heappush
 from itertools import product
 from random import choices, randint, random
 
@@ -54,39 +55,74 @@ class KWayTransitionCoverageEqOracle(Oracle):
         if self.method == 'random':
             paths = self.generate_random_paths(hypothesis) + self.cached_paths
             self.cached_paths = self.greedy_set_cover(hypothesis, paths)
-
-            for path in self.cached_paths:
-                counter_example = self.check_path(hypothesis, path.steps)
-
-                if counter_example is not None:
-                    return counter_example
+            return self.check_test_cases(hypothesis, (path.steps for path in self.cached_paths))
 
         elif self.method == 'prefix':
-            for steps in self.generate_prefix_steps(hypothesis):
-                counter_example = self.check_path(hypothesis, steps)
-
-                if counter_example is not None:
-                    return counter_example
+            return self.check_test_cases(hypothesis, self.generate_prefix_steps(hypothesis))
         return None
 
     def greedy_set_cover(self, hypothesis: Automaton, paths: list):
+        """
+        Lazy greedy set cover. Paths are kept in a priority queue ordered by their last computed score. As scores of
+        paths can only decrease when more k-way transitions get covered, the score of the top path is recomputed and
+        the path is selected if it still has the best score, otherwise it is reinserted with its current score.
+        Selection order, including ties, is the same as re-scoring all paths in every iteration.
+        """
         result = list()
-        covered = set()
         step_count = 0
 
         size_of_universe = len(hypothesis.states) * pow(len(self.alphabet), self.k)
 
-        while size_of_universe > len(covered):
-            path = self.select_optimal_path(covered, paths)
-
-            if path is not None:
-                covered = set.union(covered, path.kWayTransitions)
-                paths.remove(path)
+        # k-way transitions are numbered in order of appearance, covered is a bitmap indexed by these numbers
+        transition_ids = dict()
+        covered = bytearray()
+        num_covered = 0
+
+        def encode(path):
+            ids = []
+            for transition in path.kWayTransitions:
+                transition_id = transition_ids.get(transition)
+                if transition_id is None:
+                    transition_id = transition_ids[transition] = len(covered)
+                    covered.append(0)
+                ids.append(transition_id)
+            return ids
+
+        def score(path, ids):
+            num_uncovered = len(ids) - sum(map(covered.__getitem__, ids))
+            return num_uncovered / len(path.steps) if self.optimize == 'steps' else num_uncovered
+
+        def build_queue(candidate_paths):
+            encoded_paths = [encode(p) for p in candidate_paths]
+            # ties are broken by the position in candidate_paths, as in max()
+            path_queue = [(-score(p, ids), index) for index, (p, ids) in enumerate(zip(candidate_paths, encoded_paths))]
+            heapify(path_queue)
+            return encoded_paths, path_queue
+
+        encoded, queue = build_queue(paths)
+        while size_of_universe > num_covered:
+            selected = None
+            while queue:
+                _, index = heappop(queue)
+                current_score = score(paths[index], encoded[index])
+                if not queue or (-current_score, index) <= queue[0]:
+                    if current_score != 0:
+                        selected = index
+                    break
+                heappush(queue, (-current_score, index))
+
+            if selected is not None:
+                path = paths[selected]
+                for transition_id in encoded[selected]:
+                    if not covered[transition_id]:
+                        covered[transition_id] = 1
+                        num_covered += 1
                 result.append(path)
                 step_count += len(path.steps)
 
-            if path is None or not paths:
+            if selected is None or not queue:
                 paths = [self.create_path(hypothesis, steps) for steps in self.generate_prefix_steps(hypothesis)]
+                encoded, queue = build_queue(paths)
 
             if self.max_number_of_steps != 0 and step_count > self.max_number_of_steps:
                 print("stop")
@@ -94,18 +130,6 @@ class KWayTransitionCoverageEqOracle(Oracle):
 
         return result
 
-    def select_optimal_path(self, covered: set, paths: list) -> Path:
-        result = None
-
-        if self.optimize == 'steps':
-            result = max(paths, key=lambda p: len(
-                p.kWayTransitions - covered) / len(p.steps))
-
-        if self.optimize == 'queries':
-            result = max(paths, key=lambda p: len(p.kWayTransitions - covered))
-
-        return result if len(result.kWayTransitions - covered) != 0 else None
-
     def generate_random_paths(self, hypothesis: Automaton) -> list:
         result = list()
 
@@ -124,42 +148,17 @@ class KWayTransitionCoverageEqOracle(Oracle):
                 yield prefix + steps + tuple(choices(self.alphabet, k=self.random_walk_len))
 
     def create_path(self, hypothesis: Automaton, steps: tuple) -> Path:
-        transitions = set()
-        transitions_log = list()
-
-        prev_states = list()
-        end_states = list()
-
         hypothesis.reset_to_initial()
 
-        for i, s in enumerate(steps):
-            prev_states.append(hypothesis.current_state)
+        # visited_states[i] is the state before step i and visited_states[i + 1] the state after it
+        visited_states = [hypothesis.current_state]
+        for s in steps:
             hypothesis.step(s)
-            end_states.append(hypothesis.current_state)
-
-        for i in range(len(steps) - self.k + 1):
-            prev_state = prev_states[i]
-            end_state = end_states[i + self.k - 1]
-            chunk = tuple(steps[i:i + self.k])
-
-            transition = KWayTransition(prev_state.state_id, end_state.state_id, chunk)
-
-            transitions_log.append(transition)
-            transitions.add(transition)
+            visited_states.append(hypothesis.current_state)
 
-        return Path(hypothesis.initial_state, end_states[-1], steps, transitions, transitions_log)
+        k = self.k
+        transitions_log = [KWayTransition(visited_states[i].state_id, visited_states[i + k].state_id,
+                                          tuple(steps[i:i + k]))
+                           for i in range(len(steps) - k + 1)]
 
-    def check_path(self, hypothesis: Automaton, steps: tuple):
-        self.reset_hyp_and_sul(hypothesis)
-
-        for i, s in enumerate(steps):
-            out_sul = self.sul.step(s)
-            out_hyp = hypothesis.step(s)
-
-            self.num_steps += 1
-
-            if out_sul != out_hyp:
-                self.sul.post()
-                return steps[:i + 1]
-
-        return None
+        return Path(hypothesis.initial_state, visited_states[-1], steps, set(transitions_log), transitions_log)
@@ -3,6 +3,7 @@ File in which necessary paths for model checking are defined.
 
 path_to_prism is the absolute or relative path to the prism executable. Note that it has to include the executable file,
 not just the folder. Eg. /usr/edi/prism/prism.bat and NOT /usr/edi/prism/
+If path_to_prism is None, properties are checked in-process by aalpy.utils.ProbabilisticModelChecker.
 
 If you learn one of the provided examples path to properties should be relative or
 absolute path to 'Benchmarking\prism_eval_props'.
@@ -0,0 +1,245 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from math import log
+
+from aalpy.automata import Mdp, MarkovChain, StochasticMealyMachine
+
+
+class BatchedSimulator:
+    """
+    Simulates many runs of a Markov decision process or a Markov chain in lockstep. The model is compiled into arrays
+    of cumulative transition probabilities and successor indices, so that one step of all runs is a handful of NumPy
+    operations. Stochastic Mealy machines are converted to Markov decision processes.
+
+    States without transitions for an input (and Markov chain states without transitions) stay in place, as in
+    MarkovChain.step. The simulator only holds NumPy arrays and can be sent to worker processes.
+    """
+
+    def __init__(self, model):
+        """
+        Args:
+
+            model: Mdp, MarkovChain or StochasticMealyMachine
+
+        """
+        import numpy as np
+
+        if isinstance(model, StochasticMealyMachine):
+            from aalpy.automata.StochasticMealyMachine import smm_to_mdp_conversion
+            model = smm_to_mdp_conversion(model)
+        if not isinstance(model, (Mdp, MarkovChain)):
+            raise ValueError(f'Batched simulation is not supported for {model.__class__.__name__}')
+
+        states = model.states
+        state_index = {state: index for index, state in enumerate(states)}
+        if isinstance(model, Mdp):
+            self.inputs = model.get_input_alphabet()
+            distributions = [[s.transitions.get(i, []) for i in self.inputs] for s in states]
+        else:
+            self.inputs = [None]
+            distributions = [[s.transitions] for s in states]
+
+        max_branching = max(1, max(len(d) for state_distributions in distributions for d in state_distributions))
+        shape = (len(states), len(self.inputs), max_branching)
+        # the last entry of every distribution is infinite, so rounding errors never sample padding
+        self.cumulative_probabilities = np.full(shape, np.inf)
+        self.successors = np.empty(shape, dtype=np.int64)
+        for s, state_distributions in enumerate(distributions):
+            for i, distribution in enumerate(state_distributions):
+                if not distribution:
+                    distribution = [(states[s], 1.)]
+                targets = [state_index[target] for target, _ in distribution]
+                cumulative = np.cumsum([prob for _, prob in distribution])
+                cumulative[-1] = np.inf
+                self.cumulative_probabilities[s, i, :len(cumulative)] = cumulative
+                self.successors[s, i, :len(targets)] = targets
+                self.successors[s, i, len(targets):] = targets[-1]
+
+        self.outputs = [s.output for s in states]
+        self.initial_state = state_index[model.initial_state]
+
+    def goal_mask(self, goals):
+        """
+        Returns a boolean array marking states whose output is in goals.
+        """
+        import numpy as np
+        return np.array([output in goals for output in self.outputs], dtype=bool)
+
+    def step(self, current_states, input_indices, rng):
+        """
+        Performs one step of all runs.
+
+        Args:
+
+            current_states: array of state indices, one per run
+
+            input_indices: array of indices into self.inputs, one per run
+
+            rng: numpy random generator
+
+        Returns:
+
+            array of successor state indices
+
+        """
+        cumulative = self.cumulative_probabilities[current_states, input_indices]
+        samples = rng.random(len(current_states))
+        choices = (cumulative <= samples[:, None]).sum(axis=1)
+        return self.successors[current_states, input_indices, choices]
+
+    def simulate_goal_reached(self, goal_mask, num_runs, num_steps, rng):
+        """
+        Simulates num_runs runs of num_steps uniformly random inputs starting in the initial state.
+
+        Args:
+
+            goal_mask: boolean array over states, see goal_mask
+
+            num_runs: number of runs
+
+            num_steps: number of steps per run
+
+            rng: numpy random generator
+
+        Returns:
+
+            boolean array, True for runs that visited a goal state after at least one step
+
+        """
+        import numpy as np
+
+        current_states = np.full(num_runs, self.initial_state, dtype=np.int64)
+        reached = np.zeros(num_runs, dtype=bool)
+        for _ in range(num_steps):
+            input_indices = rng.integers(len(self.inputs), size=num_runs)
+            current_states = self.step(current_states, input_indices, rng)
+            reached |= goal_mask[current_states]
+        return reached
+
+
+def _count_goal_reached(simulator, goal_mask, num_runs, num_steps, seed, batch_size):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    reached = 0
+    for start in range(0, num_runs, batch_size):
+        reached += int(simulator.simulate_goal_reached(goal_mask, min(batch_size, num_runs - start), num_steps,
+                                                       rng).sum())
+    return reached
+
+
+def estimate_goal_probability(model, goals, max_num_steps, num_tests, num_workers=1, seed=None, batch_size=100000):
+    """
+    Estimates the probability of observing an output in goals within max_num_steps uniformly random inputs by
+    simulating runs in batches. With num_workers > 1, runs are sharded across worker processes.
+
+    Args:
+
+        model: Mdp, MarkovChain or StochasticMealyMachine
+
+        goals: set of goal outputs
+
+        max_num_steps: bounded length of runs
+
+        num_tests: number of simulated runs
+
+        num_workers: number of worker processes (Default value = 1)
+
+        seed: seed of the NumPy random generator. If None, the seed is drawn from the random module, so that results
+            are reproducible with random.seed (Default value = None)
+
+        batch_size: number of runs simulated in lockstep (Default value = 100000)
+
+    Returns:
+
+        number of runs reaching a goal / num_tests
+
+    """
+    import numpy as np
+
+    assert num_tests > 0 and num_workers > 0 and batch_size > 0
+    if seed is None:
+        seed = random.getrandbits(64)
+    simulator = model if isinstance(model, BatchedSimulator) else BatchedSimulator(model)
+    goal_mask = simulator.goal_mask(goals)
+
+    if num_workers == 1:
+        return _count_goal_reached(simulator, goal_mask, num_tests, max_num_steps, seed, batch_size) / num_tests
+
+    seeds = np.random.SeedSequence(seed).spawn(num_workers)
+    shard_sizes = [num_tests // num_workers + (w < num_tests % num_workers) for w in range(num_workers)]
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(_count_goal_reached, simulator, goal_mask, size, max_num_steps, shard_seed,
+                                   batch_size) for size, shard_seed in zip(shard_sizes, seeds) if size]
+        return sum(f.result() for f in futures) / num_tests
+
+
+def sequential_probability_ratio_test(model, goals, max_num_steps, threshold, indifference=0.01, alpha=0.05,
+                                      beta=0.05, batch_size=1000, max_num_tests=1000000, seed=None):
+    """
+    Decides whether the probability of observing an output in goals within max_num_steps uniformly random inputs is
+    at least threshold, using Wald's sequential probability ratio test. H0: p >= threshold + indifference is tested
+    against H1: p <= threshold - indifference. Runs are simulated in batches, but the test stops at the first run
+    at which the log-likelihood ratio crosses a boundary, as if runs were performed one after another.
+
+    Args:
+
+        model: Mdp, MarkovChain or StochasticMealyMachine
+
+        goals: set of goal outputs
+
+        max_num_steps: bounded length of runs
+
+        threshold: probability threshold
+
+        indifference: half-width of the indifference region around the threshold (Default value = 0.01)
+
+        alpha: probability of rejecting H0 although it holds (Default value = 0.05)
+
+        beta: probability of accepting H0 although H1 holds (Default value = 0.05)
+
+        batch_size: number of runs simulated in lockstep (Default value = 1000)
+
+        max_num_tests: maximum number of runs, if no decision is reached the result is None (Default value = 1000000)
+
+        seed: seed of the NumPy random generator. If None, the seed is drawn from the random module, so that results
+            are reproducible with random.seed (Default value = None)
+
+    Returns:
+
+        tuple (decision, estimate, number of runs), decision is True if H0 is accepted, False if H1 is accepted and
+        None if no decision was reached
+
+    """
+    import numpy as np
+
+    assert 0 < alpha < 1 and 0 < beta < 1 and indifference > 0 and batch_size > 0
+    p0 = min(threshold + indifference, 1 - 1e-12)
+    p1 = max(threshold - indifference, 1e-12)
+    assert p1 < p0, 'indifference region must lie within (0, 1)'
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    success_llr, failure_llr = log(p1 / p0), log((1 - p1) / (1 - p0))
+    accept_h1, accept_h0 = log((1 - beta) / alpha), log(beta / (1 - alpha))
+
+    simulator = model if isinstance(model, BatchedSimulator) else BatchedSimulator(model)
+    goal_mask = simulator.goal_mask(goals)
+    rng = np.random.default_rng(seed)
+
+    llr, num_tests, num_successes = 0., 0, 0
+    while num_tests < max_num_tests:
+        reached = simulator.simulate_goal_reached(goal_mask, min(batch_size, max_num_tests - num_tests),
+                                                  max_num_steps, rng)
+        run_llrs = llr + np.cumsum(np.where(reached, success_llr, failure_llr))
+        crossed = np.flatnonzero((run_llrs >= accept_h1) | (run_llrs <= accept_h0))
+        if len(crossed):
+            last = int(crossed[0])
+            num_tests += last + 1
+            num_successes += int(reached[:last + 1].sum())
+            return bool(run_llrs[last] <= accept_h0), num_successes / num_tests, num_tests
+        llr = run_llrs[-1]
+        num_tests += len(reached)
+        num_successes += int(reached.sum())
+
+    return None, num_successes / num_tests, num_tests
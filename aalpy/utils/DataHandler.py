@@ -11,6 +11,19 @@ class DataHandler(ABC):
     def tokenize_data(self, path):
         pass
 
+    def iterate_data(self, path, **kwargs):
+        """
+        Yields tokenized sequences one by one. Tokenizers of this module read the file lazily line by line, so that
+        data larger than the main memory can be passed to run_Alergia. By default, all data is tokenized at once.
+        """
+        yield from self.tokenize_data(path, **kwargs)
+
+
+def _read_lines(path):
+    with open(path) as file:
+        for line in file:
+            yield line.rstrip('\r\n')
+
 
 class CharacterTokenizer(DataHandler):
     """
@@ -20,11 +33,11 @@ class CharacterTokenizer(DataHandler):
     """
 
     def tokenize_data(self, path):
-        data = []
-        lines = open(path).read().splitlines()
-        for l in lines:
-            data.append(list(l))
-        return data
+        return list(self.iterate_data(path))
+
+    def iterate_data(self, path):
+        for l in _read_lines(path):
+            yield list(l)
 
 
 class DelimiterTokenizer(DataHandler):
@@ -35,11 +48,11 @@ class DelimiterTokenizer(DataHandler):
     """
 
     def tokenize_data(self, path, delimiter=','):
-        data = []
-        lines = open(path).read().splitlines()
-        for l in lines:
-            data.append(l.split(delimiter))
-        return data
+        return list(self.iterate_data(path, delimiter))
+
+    def iterate_data(self, path, delimiter=','):
+        for l in _read_lines(path):
+            yield l.split(delimiter)
 
 
 class IODelimiterTokenizer(DataHandler):
@@ -51,9 +64,10 @@ class IODelimiterTokenizer(DataHandler):
     """
 
     def tokenize_data(self, path, io_delimiter='/', word_delimiter=','):
-        data = []
-        lines = open(path).read().splitlines()
-        for l in lines:
+        return list(self.iterate_data(path, io_delimiter, word_delimiter))
+
+    def iterate_data(self, path, io_delimiter='/', word_delimiter=','):
+        for l in _read_lines(path):
             words = l.split(word_delimiter)
             seq = [words[0]]
             for w in words[1:]:
@@ -63,8 +77,7 @@ class IODelimiterTokenizer(DataHandler):
                           'where <delim> is values of param \"io_delimiter\'"')
                     exit(-1)
                 seq.append(tuple([try_int(i_o[0]), try_int(i_o[1])]))
-            data.append(seq)
-        return data
+            yield seq
 
 
 def try_int(x):
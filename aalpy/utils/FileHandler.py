@@ -227,8 +227,8 @@ vpa_pop_pattern = r"(\S+)\s*/\s*pop\(\s*(.*?)\s*\)"
 
 
 def _process_label(label, source, destination, automaton_type, **kwargs):
+    vpa_alphabet = kwargs.get('vpa_alphabet')
     if automaton_type == 'sevpa':
-        vpa_alphabet = kwargs.get('vpa_alphabet')
         assert isinstance(vpa_alphabet, SevpaAlphabet), f"Expected SevpaAlphabet, got {type(vpa_alphabet).__name__}"
 
     if automaton_type == 'dfa' or automaton_type == 'moore':
@@ -385,8 +385,8 @@ def load_automaton_from_file(path, automaton_type, compute_prefixes=False, **kwa
                        'smm': (StochasticMealyState, StochasticMealyMachine), 'sevpa': (SevpaState, Sevpa),
                        'vpa': (VpaState, Vpa), 'ndmoore': (NDMooreState, NDMooreMachine)}
 
+    vpa_alphabet = kwargs.get('vpa_alphabet')
     if automaton_type == 'sevpa':
-        vpa_alphabet = kwargs.get('vpa_alphabet')
         assert isinstance(vpa_alphabet, SevpaAlphabet), f"Expected SevpaAlphabet, got {type(vpa_alphabet).__name__}"
 
     nodeType, aut_type = id_node_aut_map[automaton_type]
@@ -107,6 +107,8 @@ def print_learning_info(info: dict):
     print('Equivalence Query')
     print(' # Membership Queries  : {}'.format(info['queries_eq_oracle']))
     print(' # Steps               : {}'.format(info['steps_eq_oracle']))
+    if info.get('steps_eq_oracle_cached'):
+        print(' # Steps Saved by Cache: {}'.format(info['steps_eq_oracle_cached']))
     print('-----------------------------------')
 
 
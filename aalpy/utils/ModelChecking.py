@@ -8,8 +8,8 @@ from typing import Tuple, Union
 
 import aalpy.paths
 from aalpy.SULs import AutomatonSUL
-from aalpy.automata import Mdp, StochasticMealyMachine, MealyMachine, Dfa, MooreMachine, MooreState, MealyState, \
-    DfaState
+from aalpy.automata import Mdp, MarkovChain, StochasticMealyMachine, MealyMachine, Dfa, MooreMachine, MooreState, \
+    MealyState, DfaState
 from aalpy.base import DeterministicAutomaton, SUL, AutomatonState
 
 prism_prob_output_regex = re.compile("Result: (\d+\.\d+)")
@@ -150,6 +150,8 @@ def evaluate_all_properties(prism_file_name, properties_file_name):
 
 def model_check_properties(model: Mdp, properties: str):
     """
+    Model checks all properties with PRISM. If aalpy.paths.path_to_prism is not set, properties are checked by the
+    built-in model checker, see check_properties_file.
 
     Args:
         model: Markov Decision Process that serves as a basis for model checking.
@@ -159,6 +161,10 @@ def model_check_properties(model: Mdp, properties: str):
 
         results of model checking
     """
+    if aalpy.paths.path_to_prism is None:
+        from aalpy.utils.ProbabilisticModelChecker import check_properties_file
+        return check_properties_file(model, properties)
+
     from os import remove
     from aalpy.utils import mdp_2_prism_format
     mdp_2_prism_format(mdp=model, name='mc_exp', output_path=f'mc_exp.prism')
@@ -399,28 +405,41 @@ def generate_test_cases(automaton: DeterministicAutomaton, oracle):
     return wrapped_sul.test_cases
 
 
-def statistical_model_checking(model, goals, max_num_steps, num_tests=105967):
+def statistical_model_checking(model, goals, max_num_steps, num_tests=105967, num_workers=1, seed=None):
     """
-
+    Estimates the probability of observing an element of goals within max_num_steps uniformly random inputs.
+    Tests are simulated in lockstep by a BatchedSimulator, see estimate_goal_probability. If NumPy is not installed,
+    tests are executed one by one on the model, which draws from the random module, num_workers and seed are ignored.
 
     Args:
         model: model on which model checking is performed
         goals: set of goal outputs
         max_num_steps: bounded length of tests
         num_tests: num of tests that will be performed
+        num_workers: number of worker processes the tests are sharded across (Default value = 1)
+        seed: seed of the random generator, if None it is drawn from the random module (Default value = None)
 
     Returns:
 
         num of tests containing element of goals set / num_tests
     """
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return _sequential_model_checking(model, goals, max_num_steps, num_tests)
+
+    from aalpy.utils.BatchedSimulation import estimate_goal_probability
+    return estimate_goal_probability(model, goals, max_num_steps, num_tests, num_workers=num_workers, seed=seed)
+
 
+def _sequential_model_checking(model, goals, max_num_steps, num_tests):
     def compute_output_sequence(model, seq):
         model.reset_to_initial()
         observed_outputs = {model.step(i) for i in seq}
         return observed_outputs
 
     goal_reached = 0
-    inputs = model.get_input_alphabet()
+    inputs = [None] if isinstance(model, MarkovChain) else model.get_input_alphabet()
     for _ in range(num_tests):
         test_sequence = choices(inputs, k=max_num_steps)
         outputs = compute_output_sequence(model, test_sequence)
@@ -0,0 +1,446 @@
+import re
+from collections import deque
+
+from aalpy.automata import Mdp, MarkovChain, StochasticMealyMachine
+
+# Formulas are nested tuples in negation normal form. Negation only occurs in front of labels, until and release
+# carry the number of remaining steps as bound, None denotes an unbounded operator.
+TRUE = ('true',)
+FALSE = ('false',)
+
+_token_regex = re.compile(r'\s*(?:(P(?:max|min)?=\?)|"([^"]*)"|(<=|<|>=|>)|(\d+)|([A-Za-z_]\w*)|(.))')
+
+
+def _tokenize(prop):
+    tokens = []
+    prop = prop.strip()
+    position = 0
+    while position < len(prop):
+        match = _token_regex.match(prop, position)
+        position = match.end()
+        operator, label, comparison, number, identifier, symbol = match.groups()
+        if operator:
+            tokens.append(('P', operator[:-2]))
+        elif label is not None:
+            tokens.append(('label', label))
+        elif comparison:
+            tokens.append(('cmp', comparison))
+        elif number:
+            tokens.append(('num', int(number)))
+        elif identifier:
+            tokens.append(('id', identifier))
+        elif symbol.strip():
+            tokens.append(('sym', symbol))
+    return tokens
+
+
+class _PropertyParser:
+    """
+    Recursive descent parser for the PRISM property fragment P[min|max]=? [ path formula ] over labels.
+    As in PRISM, temporal operators bind weaker than boolean connectives, e.g. X "a" & "b" is X ("a" & "b").
+    """
+
+    def __init__(self, prop):
+        self.prop = prop
+        self.tokens = _tokenize(prop)
+        self.position = 0
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def _expect(self, kind, value=None):
+        token = self._next()
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise ValueError(f'Unexpected token {token[1]} in property {self.prop}')
+        return token[1]
+
+    def parse(self):
+        optimization = self._expect('P')
+        self._expect('sym', '[')
+        formula = self._path()
+        self._expect('sym', ']')
+        if self.position != len(self.tokens):
+            raise ValueError(f'Unexpected token {self._peek()[1]} in property {self.prop}')
+        return optimization, formula
+
+    def _bound(self):
+        kind, comparison = self._peek()
+        if kind != 'cmp':
+            return None
+        self._next()
+        if comparison not in {'<', '<='}:
+            raise ValueError(f'Only upper step bounds are supported, got {comparison} in property {self.prop}')
+        steps = self._expect('num')
+        bound = steps - 1 if comparison == '<' else steps
+        if bound < 0:
+            raise ValueError(f'Empty step bound in property {self.prop}')
+        return bound
+
+    def _path(self):
+        left = self._temporal_unary()
+        kind, operator = self._peek()
+        if kind == 'id' and operator in {'U', 'W', 'R'}:
+            self._next()
+            bound = self._bound()
+            right = self._temporal_unary()
+            if operator == 'U':
+                return 'until', left, right, bound
+            if operator == 'R':
+                return 'release', left, right, bound
+            # weak until
+            return 'release', right, ('or', left, right), bound
+        return left
+
+    def _temporal_unary(self):
+        kind, operator = self._peek()
+        if kind == 'id' and operator in {'X', 'F', 'G'}:
+            self._next()
+            bound = self._bound() if operator != 'X' else None
+            operand = self._temporal_unary()
+            if operator == 'X':
+                return 'next', operand
+            if operator == 'F':
+                return 'until', TRUE, operand, bound
+            return 'release', FALSE, operand, bound
+        return self._or()
+
+    def _or(self):
+        formula = self._and()
+        while self._peek() == ('sym', '|'):
+            self._next()
+            formula = ('or', formula, self._and())
+        return formula
+
+    def _and(self):
+        formula = self._not()
+        while self._peek() == ('sym', '&'):
+            self._next()
+            formula = ('and', formula, self._not())
+        return formula
+
+    def _not(self):
+        if self._peek() == ('sym', '!'):
+            self._next()
+            return 'not', self._not()
+        return self._atom()
+
+    def _atom(self):
+        kind, value = self._next()
+        if kind == 'label':
+            return 'label', value
+        if kind == 'id' and value in {'true', 'false'}:
+            return TRUE if value == 'true' else FALSE
+        if (kind, value) == ('sym', '('):
+            formula = self._path()
+            self._expect('sym', ')')
+            return formula
+        raise ValueError(f'Unexpected token {value} in property {self.prop}')
+
+
+def _conjunction(formulas):
+    operands = set()
+    for f in formulas:
+        if f == FALSE:
+            return FALSE
+        if f[0] == 'and':
+            operands.update(f[1])
+        elif f != TRUE:
+            operands.add(f)
+    if not operands:
+        return TRUE
+    return next(iter(operands)) if len(operands) == 1 else ('and', frozenset(operands))
+
+
+def _disjunction(formulas):
+    operands = set()
+    for f in formulas:
+        if f == TRUE:
+            return TRUE
+        if f[0] == 'or':
+            operands.update(f[1])
+        elif f != FALSE:
+            operands.add(f)
+    if not operands:
+        return FALSE
+    return next(iter(operands)) if len(operands) == 1 else ('or', frozenset(operands))
+
+
+def _to_nnf(formula, negated=False):
+    """
+    Converts a parsed formula to negation normal form with flattened conjunctions and disjunctions.
+    """
+    kind = formula[0]
+    if kind in {'true', 'false'}:
+        return formula if not negated else (FALSE if formula == TRUE else TRUE)
+    if kind == 'label':
+        return ('not_label', formula[1]) if negated else formula
+    if kind == 'not':
+        return _to_nnf(formula[1], not negated)
+    if kind in {'and', 'or'}:
+        operands = [_to_nnf(f, negated) for f in formula[1:]]
+        return _conjunction(operands) if (kind == 'and') != negated else _disjunction(operands)
+    if kind == 'next':
+        return 'next', _to_nnf(formula[1], negated)
+    # until and release are dual
+    left, right = _to_nnf(formula[1], negated), _to_nnf(formula[2], negated)
+    if (kind == 'until') != negated:
+        return 'until', left, right, formula[3]
+    return 'release', left, right, formula[3]
+
+
+def _has_unbounded_release(formula):
+    kind = formula[0]
+    if kind in {'and', 'or'}:
+        return any(_has_unbounded_release(f) for f in formula[1])
+    if kind == 'next':
+        return _has_unbounded_release(formula[1])
+    if kind in {'until', 'release'}:
+        if kind == 'release' and formula[3] is None:
+            return True
+        return _has_unbounded_release(formula[1]) or _has_unbounded_release(formula[2])
+    return False
+
+
+def _progress(formula, labels):
+    """
+    Evaluates the current step of the formula in a state with the given labels and returns the formula that has to
+    hold for the remainder of the path.
+    """
+    kind = formula[0]
+    if kind == 'label':
+        return TRUE if formula[1] in labels else FALSE
+    if kind == 'not_label':
+        return FALSE if formula[1] in labels else TRUE
+    if kind == 'and':
+        return _conjunction(_progress(f, labels) for f in formula[1])
+    if kind == 'or':
+        return _disjunction(_progress(f, labels) for f in formula[1])
+    if kind == 'next':
+        return formula[1]
+    if kind == 'until':
+        _, left, right, bound = formula
+        if bound == 0:
+            return _progress(right, labels)
+        remaining = (kind, left, right, None if bound is None else bound - 1)
+        return _disjunction([_progress(right, labels), _conjunction([_progress(left, labels), remaining])])
+    if kind == 'release':
+        _, left, right, bound = formula
+        if bound == 0:
+            return _progress(right, labels)
+        remaining = (kind, left, right, None if bound is None else bound - 1)
+        return _conjunction([_progress(right, labels), _disjunction([_progress(left, labels), remaining])])
+    return formula
+
+
+def parse_property(prop):
+    """
+    Parses a PRISM property of the form Pmax=? [ path formula ], Pmin=? [ path formula ] or P=? [ path formula ].
+    Path formulas are built from labels, true, false, !, &, |, X, F, G, U, W and R, where F, G, U, W and R can be
+    step-bounded with < or <=.
+
+    Args:
+
+        prop: property string
+
+    Returns:
+
+        tuple (optimization, formula), where optimization is 'max' or 'min' and formula is a nested tuple
+
+    """
+    optimization, formula = _PropertyParser(prop).parse()
+    return 'min' if optimization == 'Pmin' else 'max', formula
+
+
+def _model_transitions(model):
+    """
+    Returns a list of states, the index of the initial state, labels of all states and for every state a list of
+    choices, each choice being a list of (target index, probability) pairs. As in PRISM, states without outgoing
+    transitions get a self loop and the initial state is labeled with 'init'.
+    """
+    if isinstance(model, StochasticMealyMachine):
+        from aalpy.automata.StochasticMealyMachine import smm_to_mdp_conversion
+        model = smm_to_mdp_conversion(model)
+    if not isinstance(model, (Mdp, MarkovChain)):
+        raise ValueError(f'Model checking is not supported for {model.__class__.__name__}')
+
+    state_index = {state: index for index, state in enumerate(model.states)}
+    labels, choices = [], []
+    for index, state in enumerate(model.states):
+        labels.append({o for o in str(state.output).split('__') if o})
+        if isinstance(model, Mdp):
+            state_choices = [[(state_index[target], prob) for target, prob in targets]
+                             for targets in state.transitions.values() if targets]
+        else:
+            state_choices = [[(state_index[target], prob) for target, prob in state.transitions]]
+            state_choices = [c for c in state_choices if c]
+        choices.append(state_choices or [[(index, 1.)]])
+
+    initial_index = state_index[model.initial_state]
+    labels[initial_index].add('init')
+    return initial_index, labels, choices
+
+
+def _reachability_probability(model, formula, optimization, epsilon):
+    """
+    Builds the product of the model with the residual formulas reachable by progression and computes the maximal or
+    minimal probability of reaching a product state whose residual formula is true by value iteration.
+    """
+    initial_index, labels, choices = _model_transitions(model)
+
+    initial = (initial_index, _progress(formula, labels[initial_index]))
+    product_index = {initial: 0}
+    product_states = [initial]
+    choice_states, transition_choices, transition_targets, transition_probs = [], [], [], []
+    accepting = []
+
+    queue = deque([initial])
+    while queue:
+        product_state = queue.popleft()
+        state, residual = product_state
+        if residual == TRUE:
+            accepting.append(product_index[product_state])
+            continue
+        if residual == FALSE:
+            continue
+        for choice in choices[state]:
+            choice_id = len(choice_states)
+            choice_states.append(product_index[product_state])
+            for target, prob in choice:
+                target_state = (target, _progress(residual, labels[target]))
+                if target_state not in product_index:
+                    product_index[target_state] = len(product_states)
+                    product_states.append(target_state)
+                    queue.append(target_state)
+                transition_choices.append(choice_id)
+                transition_targets.append(product_index[target_state])
+                transition_probs.append(prob)
+
+    if not choice_states:
+        return 1. if accepting else 0.
+
+    try:
+        import numpy as np
+    except ImportError:
+        return _value_iteration(len(product_states), accepting, choice_states, transition_choices, transition_targets,
+                                transition_probs, optimization, epsilon)
+
+    values = np.zeros(len(product_states))
+    values[accepting] = 1.
+
+    # choices of a product state are consecutive, as product states are expanded one after another
+    choice_states = np.array(choice_states)
+    choice_starts = np.flatnonzero(np.r_[True, choice_states[1:] != choice_states[:-1]])
+    open_states = choice_states[choice_starts]
+    transition_choices = np.array(transition_choices)
+    transition_targets = np.array(transition_targets)
+    transition_probs = np.array(transition_probs, dtype=float)
+    reduce = np.maximum.reduceat if optimization == 'max' else np.minimum.reduceat
+
+    while True:
+        choice_values = np.bincount(transition_choices, weights=transition_probs * values[transition_targets],
+                                    minlength=len(choice_states))
+        new_values = reduce(choice_values, choice_starts)
+        difference = np.max(np.abs(new_values - values[open_states]))
+        values[open_states] = new_values
+        if difference < epsilon:
+            break
+    return float(values[0])
+
+
+def _value_iteration(num_states, accepting, choice_states, transition_choices, transition_targets, transition_probs,
+                     optimization, epsilon):
+    """
+    Value iteration of _reachability_probability without NumPy.
+    """
+    choice_transitions = [[] for _ in choice_states]
+    for choice, target, prob in zip(transition_choices, transition_targets, transition_probs):
+        choice_transitions[choice].append((target, prob))
+
+    # choices of a product state are consecutive, as product states are expanded one after another
+    state_choices = []
+    for state, transitions in zip(choice_states, choice_transitions):
+        if not state_choices or state_choices[-1][0] != state:
+            state_choices.append((state, []))
+        state_choices[-1][1].append(transitions)
+
+    values = [0.] * num_states
+    for state in accepting:
+        values[state] = 1.
+    optimum = max if optimization == 'max' else min
+
+    while True:
+        new_values = [optimum(sum(prob * values[target] for target, prob in transitions) for transitions in choices)
+                      for _, choices in state_choices]
+        difference = max(abs(value - values[state]) for value, (state, _) in zip(new_values, state_choices))
+        for value, (state, _) in zip(new_values, state_choices):
+            values[state] = value
+        if difference < epsilon:
+            break
+    return values[0]
+
+
+def check_property(model, prop, epsilon=1e-10):
+    """
+    Computes the probability of a PRISM property on a Markov decision process, a Markov chain or a stochastic Mealy
+    machine without calling PRISM. The model is composed with the residual formulas obtained by formula progression,
+    which reduces the property to a reachability problem on a product that is solved by sparse value iteration.
+    Value iteration uses NumPy if it is installed.
+
+    Properties have to be co-safe, i.e. satisfied after finitely many steps, or the negation of a co-safe property.
+    Step bounded properties, reachability and until properties of the provided property files are supported.
+
+    Args:
+
+        model: Mdp, MarkovChain or StochasticMealyMachine
+
+        prop: property string, e.g. 'Pmax=? [ !("grass") U<=14 ("goal") ]'
+
+        epsilon: value iteration stops once no value changes by more than epsilon (Default value = 1e-10)
+
+    Returns:
+
+        probability of the property
+
+    """
+    optimization, parsed_formula = parse_property(prop)
+    formula = _to_nnf(parsed_formula)
+    if not _has_unbounded_release(formula):
+        return _reachability_probability(model, formula, optimization, epsilon)
+
+    # the probability of a property that has to hold forever is one minus the probability of violating it
+    negated_formula = _to_nnf(parsed_formula, negated=True)
+    if _has_unbounded_release(negated_formula):
+        raise ValueError(f'Property {prop} is neither co-safe nor the negation of a co-safe property')
+    opposite = 'min' if optimization == 'max' else 'max'
+    return 1. - _reachability_probability(model, negated_formula, opposite, epsilon)
+
+
+def check_properties_file(model, properties_file_name, epsilon=1e-10):
+    """
+    Checks all properties of a PRISM properties file, one property per line, in the same process.
+
+    Args:
+
+        model: Mdp, MarkovChain or StochasticMealyMachine
+
+        properties_file_name: path to the properties file
+
+        epsilon: precision of value iteration (Default value = 1e-10)
+
+    Returns:
+
+        dictionary from property names (prop1, prop2, ...) to probabilities
+
+    """
+    results = {}
+    with open(properties_file_name) as file:
+        for line in file:
+            line = line.split('//')[0].strip()
+            if line:
+                results[f'prop{len(results) + 1}'] = check_property(model, line, epsilon)
+    return results
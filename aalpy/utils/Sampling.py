@@ -8,9 +8,19 @@ def get_io_traces(automaton: Automaton, input_traces: list) -> list:
     moore_automata = (MooreMachine, Dfa, NDMooreMachine, Mdp, MarkovChain)
     is_moore = isinstance(automaton, moore_automata)
 
+    output_traces = None
+    if isinstance(automaton, DeterministicAutomaton) and automaton.is_input_complete():
+        # simulate all traces at once with the compiled transition tables, if NumPy is available
+        try:
+            output_traces = automaton.compile().run_batch(input_traces)
+        except ImportError:
+            pass
+    if output_traces is None:
+        output_traces = [automaton.execute_sequence(automaton.initial_state, input_trace)
+                         for input_trace in input_traces]
+
     traces = []
-    for input_trace in input_traces:
-        output_trace = automaton.execute_sequence(automaton.initial_state, input_trace)
+    for input_trace, output_trace in zip(input_traces, output_traces):
         trace = list(zip(input_trace, output_trace))
         if is_moore:
             trace = [automaton.initial_state.output] + trace
@@ -0,0 +1,61 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+
+def iterate_shards(data, shard_size):
+    """
+    Splits data into consecutive lists of at most shard_size sequences. Data is iterated only once.
+    """
+    data = iter(data)
+    while True:
+        shard = list(islice(data, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def build_shards_in_parallel(data, build_shard, shard_args=(), num_workers=4, shard_size=10000):
+    """
+    Partitions data into shards of consecutive sequences and calls build_shard(shard, *shard_args) for every shard in
+    a pool of worker processes. Results are yielded in the order of shards, so that merging them one after another
+    yields the same prefix tree as processing all data sequentially. At most two shards per worker are in flight, so
+    data can be a generator that streams sequences from a file.
+
+    build_shard has to be a module-level function. As prefix trees are deeply nested and would be pickled
+    recursively, build_shard should return a flat representation of the partial prefix tree, e.g. a list of edges in
+    breadth-first order.
+
+    Args:
+
+        data: iterable of sequences
+
+        build_shard: function building a partial prefix tree from a list of sequences
+
+        shard_args: additional arguments passed to build_shard
+
+        num_workers: number of worker processes (Default value = 4)
+
+        shard_size: number of sequences per shard (Default value = 10000)
+
+    Returns:
+
+        generator of build_shard results
+
+    """
+    assert num_workers > 0 and shard_size > 0
+
+    executor = ProcessPoolExecutor(max_workers=num_workers)
+    pending = deque()
+    try:
+        for shard in iterate_shards(data, shard_size):
+            pending.append(executor.submit(build_shard, shard, *shard_args))
+            if len(pending) >= 2 * num_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # if the consumer stops early, e.g. due to inconsistent data, remaining shards are not built
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
@@ -34,6 +34,14 @@ from .ModelChecking import (
     statistical_model_checking,
     bisimilar,
 )
+from .BatchedSimulation import (
+    BatchedSimulator,
+    sequential_probability_ratio_test,
+)
+from .ProbabilisticModelChecker import (
+    check_property,
+    check_properties_file,
+)
 from .HelperFunctions import (
     make_input_complete,
     convert_i_o_traces_for_RPNI,
@@ -0,0 +1,68 @@
+import random
+import unittest
+
+from aalpy.SULs import AutomatonSUL
+from aalpy.base.SUL import CacheSUL
+from aalpy.learning_algs import run_Lstar
+from aalpy.oracles import RandomWalkEqOracle, StatePrefixEqOracle, PacOracle, RandomWMethodEqOracle
+from aalpy.utils import generate_random_dfa, bisimilar
+
+
+class CachedTestCasesTests(unittest.TestCase):
+
+    def test_check_test_case_uses_cache(self):
+        random.seed(1)
+        alphabet = [0, 1, 2]
+        dfa = generate_random_dfa(8, alphabet, 4)
+        sul = CacheSUL(AutomatonSUL(dfa.copy()))
+        oracle = RandomWalkEqOracle(alphabet, sul)
+
+        test_case = (0, 1, 2, 1, 0)
+        sul.query(test_case)
+        num_steps = sul.num_steps
+
+        self.assertIsNone(oracle.check_test_case(dfa, test_case))
+        self.assertIsNone(oracle.check_test_case(dfa, test_case[:3]))
+        self.assertEqual(sul.num_steps, num_steps)
+        self.assertEqual(oracle.num_steps, 0)
+        self.assertEqual((oracle.num_cached_queries, oracle.num_cached_steps), (2, 8))
+
+        # a cached trace that contradicts the hypothesis is a counterexample
+        wrong_hypothesis = dfa.copy()
+        reached = wrong_hypothesis.initial_state
+        for i in test_case[:2]:
+            reached = reached.transitions[i]
+        reached.is_accepting = not reached.is_accepting
+        self.assertEqual(oracle.check_test_case(wrong_hypothesis, test_case), test_case[:2])
+        self.assertEqual(sul.num_steps, num_steps)
+
+        # test cases that are not cached are executed on the SUL
+        self.assertIsNone(oracle.check_test_case(dfa, test_case + (2,)))
+        self.assertEqual(oracle.num_steps, 6)
+
+    def test_random_oracles_with_cache(self):
+        alphabet = [0, 1, 2, 3]
+        oracles = [lambda sul: RandomWalkEqOracle(alphabet, sul, num_steps=3000, reset_prob=0.2),
+                   lambda sul: StatePrefixEqOracle(alphabet, sul, walks_per_state=20, walk_len=5),
+                   lambda sul: PacOracle(alphabet, sul, min_walk_len=2, max_walk_len=6),
+                   lambda sul: RandomWMethodEqOracle(alphabet, sul, walks_per_state=20, walk_len=4)]
+
+        for create_oracle in oracles:
+            eq_oracles = dict()
+            for cache in [True, False]:
+                random.seed(2)
+                dfa = generate_random_dfa(10, alphabet, 5)
+                sul = AutomatonSUL(dfa)
+                eq_oracles[cache] = create_oracle(sul)
+                learned_model = run_Lstar(alphabet, sul, eq_oracles[cache], automaton_type='dfa',
+                                          cache_and_non_det_check=cache, print_level=0)
+
+                minimal_dfa = dfa.copy()
+                minimal_dfa.minimize()
+                self.assertTrue(bisimilar(learned_model, minimal_dfa))
+
+            # the same test cases are generated, cached test cases are not executed on the SUL
+            cached_oracle, oracle = eq_oracles[True], eq_oracles[False]
+            self.assertGreater(cached_oracle.num_cached_steps, 0)
+            self.assertEqual(cached_oracle.num_steps + cached_oracle.num_cached_steps, oracle.num_steps)
+            self.assertEqual(cached_oracle.num_queries + cached_oracle.num_cached_queries, oracle.num_queries)
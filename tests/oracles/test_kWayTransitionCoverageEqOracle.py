@@ -1,3 +1,4 @@
+import random
 import unittest
 
 from aalpy.oracles import KWayTransitionCoverageEqOracle
@@ -39,3 +40,37 @@ class KWayTransitionCoverageEqOracleTests(BaseOracleTests):
 
         eq_oracle = KWayTransitionCoverageEqOracle(alphabet, learning_sul)
         self.test_validate_eq_oracle(alphabet, eq_oracle, learning_sul, validation_sul)
+
+    def test_lazy_greedy_set_cover(self):
+        learning_sul, _, alphabet = self.generate_dfa_suls(20, 4, 10)
+        hypothesis = learning_sul.automaton
+        for state in hypothesis.states:
+            state.prefix = hypothesis.get_shortest_path(hypothesis.initial_state, state)
+
+        def naive_set_cover(oracle, paths):
+            # re-scores all paths in every iteration
+            result, covered = [], set()
+            universe = len(hypothesis.states) * len(alphabet) ** oracle.k
+            while universe > len(covered):
+                path = max(paths, key=lambda p: len(p.kWayTransitions - covered) / len(p.steps)
+                           if oracle.optimize == 'steps' else len(p.kWayTransitions - covered))
+                if not path.kWayTransitions - covered:
+                    path = None
+                else:
+                    covered |= path.kWayTransitions
+                    paths.remove(path)
+                    result.append(path)
+                if path is None or not paths:
+                    paths = [oracle.create_path(hypothesis, steps) for steps in oracle.generate_prefix_steps(hypothesis)]
+            return result
+
+        for k, optimize in [(2, 'steps'), (3, 'steps'), (2, 'queries')]:
+            eq_oracle = KWayTransitionCoverageEqOracle(alphabet, learning_sul, k=k, optimize=optimize,
+                                                       num_generate_paths=200)
+            random.seed(k)
+            paths = eq_oracle.generate_random_paths(hypothesis)
+            state = random.getstate()
+            lazy_cover = eq_oracle.greedy_set_cover(hypothesis, list(paths))
+            random.setstate(state)
+            naive_cover = naive_set_cover(eq_oracle, list(paths))
+            self.assertEqual([p.steps for p in lazy_cover], [p.steps for p in naive_cover])
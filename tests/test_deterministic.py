@@ -1,13 +1,30 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
 import unittest
+from functools import partial
+from sys import getsizeof
+from unittest.mock import patch
 
 from aalpy.SULs import AutomatonSUL
+from aalpy.base import SUL, ParallelSUL, PrefixSharingSUL, WordTrie
+from aalpy.base.SUL import CacheSUL
 from aalpy.automata import Dfa, MealyMachine, MooreMachine
-from aalpy.learning_algs import run_Lstar
+from aalpy.learning_algs import run_Lstar, run_Lsharp, run_KV
+from aalpy.learning_algs.deterministic.Apartness import Apartness
+from aalpy.learning_algs.deterministic.CounterExampleProcessing import shorten_counterexample
+from aalpy.learning_algs.deterministic.ObservationTree import ObservationTree
+from aalpy.learning_algs.deterministic_passive.rpni_helper_functions import createPTA, create_pta_in_parallel
+from aalpy.learning_algs.general_passive.GsmNode import GsmNode
 from aalpy.oracles import WMethodEqOracle, WpMethodEqOracle, RandomWalkEqOracle, StatePrefixEqOracle, TransitionFocusOracle, \
     RandomWMethodEqOracle, BreadthFirstExplorationEqOracle, RandomWordEqOracle, CacheBasedEqOracle, \
     KWayStateCoverageEqOracle, RandomWpMethodEqOracle
-from aalpy.utils import get_Angluin_dfa, load_automaton_from_file
+from aalpy.utils import get_Angluin_dfa, load_automaton_from_file, generate_random_deterministic_automata, \
+    generate_input_output_data_from_automata
 from aalpy.utils.ModelChecking import bisimilar
+from aalpy.utils.Sampling import get_io_traces
 
 correct_automata = {Dfa: get_Angluin_dfa(),
                     MealyMachine: load_automaton_from_file('../DotModels/Angluin_Mealy.dot', automaton_type='mealy'),
@@ -27,6 +44,17 @@ class DeterministicTest(unittest.TestCase):
 
         return bisimilar(correct_automaton, learned_automaton)
 
+    @staticmethod
+    def observe(node, inputs, automaton_type):
+        outputs = [] if automaton_type == 'mealy' else [node.output]
+        for i in inputs:
+            if automaton_type == 'mealy':
+                outputs.append(node.get_output(i))
+            node = node.get_successor(i)
+            if automaton_type != 'mealy':
+                outputs.append(node.output)
+        return outputs
+
     def test_closing_strategies(self):
 
         dfa = get_Angluin_dfa()
@@ -200,3 +228,510 @@ class DeterministicTest(unittest.TestCase):
                                     assert False
 
         assert True
+
+    def test_batch_queries(self):
+        angluin_example = get_Angluin_dfa()
+
+        alphabet = angluin_example.get_input_alphabet()
+
+        words = [('a', 'b', 'a'), ('a', 'b'), ('b',), ('a', 'b', 'a'), ('b', 'b', 'a', 'a')]
+        cache_sul = CacheSUL(AutomatonSUL(angluin_example))
+        batch_outputs = cache_sul.query_batch(words)
+        self.assertEqual(cache_sul.num_queries, 2)
+        self.assertEqual(cache_sul.num_steps, 7)
+        for word, outputs in zip(words, batch_outputs):
+            self.assertEqual(list(outputs), AutomatonSUL(angluin_example).query(word))
+
+        automata_type = ['dfa', 'mealy', 'moore']
+
+        for automata in automata_type:
+            sul = AutomatonSUL(angluin_example)
+
+            w_method_eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states) + 1,
+                                                 batch_size=10)
+            wp_method_eq_oracle = WpMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states) + 1,
+                                                   batch_size=10)
+
+            for oracle in [w_method_eq_oracle, wp_method_eq_oracle]:
+                sul = AutomatonSUL(angluin_example)
+                oracle.sul = sul
+
+                learned_model = run_Lstar(alphabet, sul, oracle, automaton_type=automata, print_level=0)
+
+                self.assertTrue(self.prove_equivalence(learned_model))
+
+    def test_batched_sifting(self):
+        class BatchCountingSUL(AutomatonSUL):
+            def __init__(self, automaton):
+                super().__init__(automaton)
+                self.num_batches = 0
+
+            def query_batch(self, words):
+                self.num_batches += 1
+                return super().query_batch(words)
+
+        angluin_example = get_Angluin_dfa()
+        alphabet = angluin_example.get_input_alphabet()
+
+        for automata in ['dfa', 'mealy', 'moore']:
+            sul = BatchCountingSUL(angluin_example)
+            eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states) + 1)
+
+            learned_model, info = run_KV(alphabet, sul, eq_oracle, automaton_type=automata, return_data=True,
+                                         print_level=0)
+
+            self.assertTrue(self.prove_equivalence(learned_model))
+            self.assertLess(sul.num_batches, info['queries_learning'])
+
+    def test_kary_cex_processing_and_shortening(self):
+        angluin_example = get_Angluin_dfa()
+        alphabet = angluin_example.get_input_alphabet()
+
+        for automata in ['dfa', 'mealy', 'moore']:
+            for learning_alg in [run_Lstar, run_KV]:
+                for shorten_cex in [False, True]:
+                    sul = AutomatonSUL(angluin_example)
+                    eq_oracle = RandomWalkEqOracle(alphabet, sul, 5000, reset_after_cex=False)
+
+                    learned_model = learning_alg(alphabet, sul, eq_oracle, automaton_type=automata,
+                                                 cex_processing='kary', shorten_cex=shorten_cex, print_level=0)
+
+                    self.assertTrue(self.prove_equivalence(learned_model))
+
+        random.seed(5)
+        automaton = generate_random_deterministic_automata('mealy', num_states=30, input_alphabet_size=3,
+                                                           output_alphabet_size=3)
+        alphabet = automaton.get_input_alphabet()
+        sul = AutomatonSUL(automaton)
+        hypothesis = run_Lstar(alphabet, sul, RandomWalkEqOracle(alphabet, sul, 10), 'mealy', max_learning_rounds=1,
+                               print_level=0)
+
+        for _ in range(20):
+            word = tuple(random.choices(alphabet, k=200))
+            if automaton.compute_output_seq(automaton.initial_state, word) == \
+                    hypothesis.compute_output_seq(hypothesis.initial_state, word):
+                continue
+            cex = shorten_counterexample(sul, word, hypothesis)
+            self.assertLessEqual(len(cex), len(word))
+            self.assertNotEqual(automaton.compute_output_seq(automaton.initial_state, cex)[-1],
+                                hypothesis.compute_output_seq(hypothesis.initial_state, cex)[-1])
+
+    def test_word_trie(self):
+        trie = WordTrie(max_nodes=5)
+        trie.add(('a', 'b', 'a'))
+        self.assertIn(('a', 'b'), trie)
+        self.assertNotIn(('b',), trie)
+        self.assertFalse(trie.is_maximal(('a', 'b')))
+        self.assertTrue(trie.is_maximal(('a', 'b', 'a')))
+
+        # exceeding the node limit clears the trie
+        trie.add(('b', 'b', 'b'))
+        self.assertEqual(len(trie), 3)
+        self.assertNotIn(('a',), trie)
+
+        angluin_example = get_Angluin_dfa()
+
+        alphabet = angluin_example.get_input_alphabet()
+
+        for batch_size in [None, 10]:
+            for max_cache_nodes in [None, 10]:
+                sul = AutomatonSUL(angluin_example)
+                eq_oracle = WpMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states) + 2,
+                                             batch_size=batch_size, max_cache_nodes=max_cache_nodes)
+
+                learned_model = run_Lstar(alphabet, sul, eq_oracle, automaton_type='mealy', print_level=0)
+
+                self.assertTrue(self.prove_equivalence(learned_model))
+                self.assertTrue(max_cache_nodes is None or len(eq_oracle.cache) <= max_cache_nodes)
+
+                # the test suite of the final hypothesis passed, repeating it executes nothing on the SUL
+                num_steps, num_cached_queries = eq_oracle.num_steps, eq_oracle.num_cached_queries
+                self.assertIsNone(eq_oracle.find_cex(learned_model))
+                self.assertEqual(eq_oracle.num_steps, num_steps)
+                if max_cache_nodes is None:
+                    # passed test cases are skipped by the trie before the cache of the SUL is consulted
+                    self.assertEqual(eq_oracle.num_cached_queries, num_cached_queries)
+                else:
+                    self.assertGreater(eq_oracle.num_cached_queries, num_cached_queries)
+
+        # test cases answered by the cache of the learner are not executed again
+        cache_sul = CacheSUL(AutomatonSUL(angluin_example))
+        for _ in range(2):
+            eq_oracle = WpMethodEqOracle(alphabet, cache_sul, max_number_of_states=len(angluin_example.states) + 2)
+            self.assertIsNone(eq_oracle.find_cex(learned_model))
+        self.assertEqual(eq_oracle.num_steps, 0)
+
+    def test_splitting_tree(self):
+        random.seed(3)
+        for automaton_type in ['dfa', 'mealy', 'moore']:
+            for _ in range(10):
+                automaton = generate_random_deterministic_automata(automaton_type, num_states=20, input_alphabet_size=2,
+                                                                   output_alphabet_size=2, ensure_minimality=False)
+                original = automaton.copy()
+
+                automaton.minimize()
+                self.assertTrue(bisimilar(automaton, original))
+                self.assertTrue(automaton.is_minimal())
+
+                char_set = automaton.compute_characterization_set()
+                responses = {tuple(tuple(automaton.compute_output_seq(state, seq)) for seq in char_set)
+                             for state in automaton.states}
+                self.assertEqual(len(responses), automaton.size)
+
+    def test_compiled_automaton(self):
+        random.seed(5)
+        for automaton_type in ['dfa', 'mealy', 'moore']:
+            automaton = generate_random_deterministic_automata(automaton_type, num_states=15, input_alphabet_size=3,
+                                                               output_alphabet_size=3)
+            alphabet = automaton.get_input_alphabet()
+            # Mealy machines do not define an output for the empty word
+            min_len = 1 if automaton_type == 'mealy' else 0
+            words = [tuple(random.choices(alphabet, k=random.randint(min_len, 20))) for _ in range(100)]
+
+            compiled_outputs = automaton.compile().run_batch(words)
+            for word, outputs in zip(words, compiled_outputs):
+                self.assertEqual(outputs, automaton.execute_sequence(automaton.initial_state, word))
+
+            # without NumPy, traces are computed by stepping through states
+            traces = get_io_traces(automaton, words)
+            with patch.dict('sys.modules', {'numpy': None, 'aalpy.base.CompiledAutomaton': None}):
+                self.assertEqual(get_io_traces(automaton, words), traces)
+
+            sul = AutomatonSUL(automaton, compile_automaton=True)
+            self.assertEqual(sul.query_batch(words), [AutomatonSUL(automaton).query(word) for word in words])
+            self.assertEqual(sul.num_steps, sum(len(word) for word in words))
+
+            eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=automaton.size + 1, batch_size=50)
+            learned_model = run_Lstar(alphabet, sul, eq_oracle, automaton_type=automaton_type, print_level=0)
+            self.assertTrue(bisimilar(learned_model, automaton))
+
+    def test_incremental_apartness(self):
+        random.seed(7)
+        for automaton_type in ['dfa', 'mealy', 'moore']:
+            automaton = generate_random_deterministic_automata(automaton_type, num_states=10, input_alphabet_size=2,
+                                                               output_alphabet_size=2)
+            alphabet = automaton.get_input_alphabet()
+            sul = AutomatonSUL(automaton)
+
+            ob_tree = ObservationTree(alphabet, sul, automaton_type, 'SepSeq', 'SepSeq')
+            nodes = [ob_tree.root]
+            for _ in range(60):
+                word = tuple(random.choices(alphabet, k=random.randint(1, 8)))
+                ob_tree.insert_observation(word, sul.query(word))
+                nodes.append(ob_tree.get_successor(word[:random.randint(0, len(word))]))
+
+                for _ in range(10):
+                    node1, node2 = random.choice(nodes), random.choice(nodes)
+                    is_apart = Apartness.states_are_apart(node1, node2, ob_tree)
+                    self.assertEqual(ob_tree.apartness.states_are_apart(node1, node2), is_apart)
+
+                    # the stored witness leads to different outputs from both nodes
+                    witness = ob_tree.get_or_compute_witness(node1, node2)
+                    self.assertEqual(witness is not None, is_apart)
+                    if witness is not None:
+                        self.assertNotEqual(self.observe(node1, witness, automaton_type),
+                                            self.observe(node2, witness, automaton_type))
+
+            eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=automaton.size + 1)
+            learned_model = run_Lsharp(alphabet, sul, eq_oracle, automaton_type, print_level=0)
+            self.assertTrue(bisimilar(learned_model, automaton))
+
+    def test_compact_observation_tree(self):
+        random.seed(3)
+        for automaton_type in ['dfa', 'mealy', 'moore']:
+            automaton = generate_random_deterministic_automata(automaton_type, num_states=10, input_alphabet_size=12,
+                                                               output_alphabet_size=3)
+            alphabet = automaton.get_input_alphabet()
+            sul = AutomatonSUL(automaton)
+
+            ob_tree = ObservationTree(alphabet, sul, automaton_type, None, 'SepSeq')
+            compact_tree = ObservationTree(alphabet, sul, automaton_type, None, 'SepSeq', compact_tree=True)
+            for _ in range(50):
+                word = tuple(random.choices(alphabet, k=random.randint(1, 6)))
+                outputs = sul.query(word)
+                ob_tree.insert_observation(word, outputs)
+                compact_tree.insert_observation(word, outputs)
+
+                prefix = word[:random.randint(0, len(word))]
+                self.assertEqual(compact_tree.get_access_sequence(compact_tree.get_successor(prefix)), prefix)
+                self.assertEqual(compact_tree.get_observation(word), ob_tree.get_observation(word))
+
+            # nodes with their ids, successor dictionaries and Mealy output/successor pairs of the object-based tree
+            object_footprint, nodes = 0, [ob_tree.root]
+            while nodes:
+                node = nodes.pop()
+                object_footprint += getsizeof(node) + getsizeof(node.id) + getsizeof(node.successors)
+                for successor in node.successors.values():
+                    if isinstance(successor, tuple):
+                        object_footprint += getsizeof(successor)
+                        successor = successor[1]
+                    nodes.append(successor)
+            compact_footprint = compact_tree.node_store.memory_footprint()
+            self.assertLess(compact_footprint, object_footprint / 4)
+
+            eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=automaton.size + 1)
+            learned_model = run_Lsharp(alphabet, sul, eq_oracle, automaton_type, compact_observation_tree=True,
+                                       print_level=0)
+            self.assertTrue(bisimilar(learned_model, automaton))
+
+    def test_parallel_sul(self):
+        angluin_example = get_Angluin_dfa()
+
+        alphabet = angluin_example.get_input_alphabet()
+
+        for executor in ['thread', 'process']:
+            with ParallelSUL(partial(AutomatonSUL, angluin_example), num_workers=2, executor=executor) as sul:
+                eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states) + 1,
+                                            batch_size=20)
+
+                learned_model, info = run_Lstar(alphabet, sul, eq_oracle, automaton_type='dfa',
+                                                return_data=True, print_level=0)
+
+                self.assertTrue(self.prove_equivalence(learned_model))
+                self.assertEqual(info['queries_learning'], sul.num_queries - eq_oracle.num_queries)
+
+    def test_parallel_conformance_testing(self):
+        random.seed(7)
+        automaton = generate_random_deterministic_automata('mealy', num_states=15, input_alphabet_size=3,
+                                                           output_alphabet_size=3)
+        alphabet = automaton.get_input_alphabet()
+
+        # oracles and the part of their test budget used up, which has to match the checked queries or steps
+        oracles = [(lambda sul: RandomWalkEqOracle(alphabet, sul, num_steps=20000, reset_after_cex=False,
+                                                   reset_prob=0.1),
+                    lambda oracle: (oracle.random_steps_done, oracle.num_steps + oracle.num_cached_steps)),
+                   (lambda sul: StatePrefixEqOracle(alphabet, sul, walks_per_state=20, walk_len=10),
+                    lambda oracle: (sum(oracle.freq_dict.values()), oracle.num_queries + oracle.num_cached_queries)),
+                   (lambda sul: RandomWMethodEqOracle(alphabet, sul, walks_per_state=20, walk_len=10),
+                    lambda oracle: (sum(oracle.freq_dict.values()), oracle.num_queries + oracle.num_cached_queries)),
+                   (lambda sul: RandomWordEqOracle(alphabet, sul, num_walks=1000, reset_after_cex=False),
+                    lambda oracle: (oracle.num_walks_done, oracle.num_queries + oracle.num_cached_queries)),
+                   (lambda sul: KWayStateCoverageEqOracle(alphabet, sul),
+                    lambda oracle: (len(oracle.cache), oracle.num_queries + oracle.num_cached_queries))]
+
+        for executor in ['thread', 'process']:
+            for create_oracle, used_budget in oracles:
+                with ParallelSUL(partial(AutomatonSUL, automaton), num_workers=2, executor=executor,
+                                 chunk_size=4) as sul:
+                    eq_oracle = create_oracle(sul)
+                    learned_model, info = run_Lstar(alphabet, sul, eq_oracle, automaton_type='mealy',
+                                                    return_data=True, print_level=0)
+
+                    self.assertTrue(bisimilar(learned_model, automaton))
+                    self.assertEqual(info['queries_learning'] + eq_oracle.num_queries, sul.num_queries)
+                    budget, executed = used_budget(eq_oracle)
+                    self.assertEqual(budget, executed)
+
+        # every transition for the first input is wrong in the hypothesis
+        hypothesis = automaton.copy()
+        for state in hypothesis.states:
+            state.output_fun[alphabet[0]] = 'faulty'
+        test_cases = [(alphabet[1],) * 6 + (alphabet[0],), (alphabet[1], alphabet[0])]
+
+        sequential_oracle = RandomWalkEqOracle(alphabet, AutomatonSUL(automaton))
+        self.assertEqual(sequential_oracle.check_test_cases(hypothesis, test_cases), test_cases[0])
+        with ParallelSUL(partial(AutomatonSUL, automaton), num_workers=2, chunk_size=1) as sul:
+            eq_oracle = RandomWalkEqOracle(alphabet, CacheSUL(sul))
+            self.assertEqual(eq_oracle.check_test_cases(hypothesis, test_cases, return_shortest=True), test_cases[1])
+            self.assertEqual(eq_oracle.num_queries, 2)
+            # executed test cases are added to the cache
+            self.assertEqual(eq_oracle.check_test_cases(hypothesis, test_cases), test_cases[0])
+            self.assertEqual(eq_oracle.num_queries, 2)
+
+    def test_parallel_sul_error(self):
+        class FailingSUL(SUL):
+            def pre(self):
+                pass
+
+            def post(self):
+                pass
+
+            def step(self, letter):
+                if letter == 'slow':
+                    time.sleep(0.2)
+                    raise RuntimeError('error of a chunk still in flight')
+                raise ValueError('first error')
+
+        # error of the chunk that failed first reaches the caller
+        with ParallelSUL(FailingSUL, num_workers=2, chunk_size=1) as sul:
+            with self.assertRaises(ValueError):
+                sul.execute_tests([(('slow',), (None,)), (('fast',), (None,))])
+
+    def test_prefix_sharing_sul(self):
+        angluin_example = get_Angluin_dfa()
+
+        alphabet = angluin_example.get_input_alphabet()
+
+        words = [('a', 'b', 'a'), ('a', 'b', 'b'), ('a',), ('b', 'a'), ()]
+        expected_outputs = [AutomatonSUL(angluin_example).query(word) for word in words]
+
+        steps_learning = dict()
+        for use_snapshots, expected_steps in [(True, 6), (False, 8)]:
+            sul = PrefixSharingSUL(AutomatonSUL(angluin_example), use_snapshots=use_snapshots)
+            self.assertEqual(sul.query_batch(words), expected_outputs)
+            self.assertEqual(sul.num_steps, expected_steps)
+
+            sul = PrefixSharingSUL(AutomatonSUL(angluin_example), use_snapshots=use_snapshots)
+            eq_oracle = WpMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states) + 1,
+                                         batch_size=50)
+
+            learned_model, info = run_Lstar(alphabet, sul, eq_oracle, automaton_type='mealy', return_data=True,
+                                            print_level=0)
+            self.assertTrue(self.prove_equivalence(learned_model))
+            steps_learning[use_snapshots] = info['steps_learning']
+
+        # steps saved by the SUL are reported through the CacheSUL
+        self.assertLess(steps_learning[True], steps_learning[False])
+
+    def test_persistent_cache(self):
+        angluin_example = get_Angluin_dfa()
+
+        alphabet = angluin_example.get_input_alphabet()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = os.path.join(tmp_dir, 'cache.sqlite')
+
+            sul = AutomatonSUL(angluin_example)
+            eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states) + 1)
+            learned_model = run_Lstar(alphabet, sul, eq_oracle, automaton_type='mealy', cache_path=cache_path,
+                                      print_level=0)
+            self.assertTrue(self.prove_equivalence(learned_model))
+            # the database is closed when learning ends
+            with self.assertRaises(sqlite3.ProgrammingError):
+                eq_oracle.sul.cache.connection.execute('SELECT 1')
+
+            # second run on the same system is answered from the persisted cache
+            sul = AutomatonSUL(angluin_example)
+            eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states) + 1)
+            learned_model, info = run_Lstar(alphabet, sul, eq_oracle, automaton_type='mealy', cache_path=cache_path,
+                                            return_data=True, print_level=0)
+            self.assertTrue(self.prove_equivalence(learned_model))
+            self.assertEqual(info['queries_learning'], 0)
+
+            cache_sul = CacheSUL(AutomatonSUL(angluin_example), cache_path=cache_path)
+            self.assertEqual(cache_sul.cache.in_cache(('a', 'b')), tuple(AutomatonSUL(angluin_example).query(('a', 'b'))))
+            cache_sul.close_cache()
+
+    def test_array_cache_tree(self):
+        angluin_example = get_Angluin_dfa()
+
+        alphabet = angluin_example.get_input_alphabet()
+
+        tree_sul = CacheSUL(AutomatonSUL(angluin_example), cache_type='tree')
+        array_sul = CacheSUL(AutomatonSUL(angluin_example), cache_type='array')
+
+        for _ in range(200):
+            word = tuple(random.choice(alphabet) for _ in range(random.randint(1, 10)))
+            self.assertEqual(tuple(tree_sul.query(word)), tuple(array_sul.query(word)))
+
+        self.assertEqual(tree_sul.num_queries, array_sul.num_queries)
+
+        num_tree_nodes, nodes = 0, [tree_sul.cache.root_node]
+        while nodes:
+            num_tree_nodes += 1
+            nodes.extend(nodes.pop().children.values())
+        footprint = array_sul.cache.memory_footprint()
+        self.assertEqual(footprint['num_nodes'], num_tree_nodes)
+        # measured with getsizeof, as the footprint of the compact observation tree
+        self.assertEqual(footprint['output_array_bytes'], getsizeof(array_sul.cache.node_outputs))
+
+        word = array_sul.cache.get_paths_to_leaves()[0]
+        outputs = list(array_sul.cache.in_cache(tuple(word)))
+        outputs[-1] = not outputs[-1]
+        with self.assertRaises(SystemExit):
+            array_sul.cache.add_to_cache(word, outputs)
+
+    def test_incremental_observation_table(self):
+        angluin_example = get_Angluin_dfa()
+
+        alphabet = angluin_example.get_input_alphabet()
+
+        for automata in ['dfa', 'mealy', 'moore']:
+            for closing in ['shortest_first', 'longest_first', 'single']:
+                for cex in [None, 'longest_prefix', 'rs']:
+                    learning_results = []
+                    for incremental in [False, True]:
+                        sul = AutomatonSUL(angluin_example)
+                        eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states))
+
+                        learned_model, info = run_Lstar(alphabet, sul, eq_oracle, automaton_type=automata,
+                                                        closing_strategy=closing, cex_processing=cex,
+                                                        incremental_obs_table=incremental,
+                                                        return_data=True, print_level=0)
+
+                        self.assertTrue(self.prove_equivalence(learned_model))
+                        learning_results.append((info['queries_learning'], info['characterization_set']))
+
+                    self.assertEqual(learning_results[0], learning_results[1])
+
+    def test_incremental_hypothesis(self):
+        random.seed(2)
+        for automaton_type in ['dfa', 'mealy', 'moore']:
+            for cex_processing in [None, 'rs']:
+                automaton = generate_random_deterministic_automata(automaton_type, num_states=15,
+                                                                   input_alphabet_size=3, output_alphabet_size=3)
+                alphabet = automaton.get_input_alphabet()
+
+                learned_models = []
+                for incremental_hypothesis in [False, True]:
+                    sul = AutomatonSUL(automaton)
+                    eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=automaton.size + 1,
+                                                shuffle_test_set=False)
+                    learned_models.append(run_Lstar(alphabet, sul, eq_oracle, automaton_type,
+                                                    cex_processing=cex_processing,
+                                                    incremental_hypothesis=incremental_hypothesis, print_level=0))
+
+                self.assertTrue(bisimilar(learned_models[1], automaton))
+                self.assertEqual(str(learned_models[0]), str(learned_models[1]))
+
+    def test_column_store_observation_table(self):
+        angluin_example = get_Angluin_dfa()
+
+        alphabet = angluin_example.get_input_alphabet()
+
+        for automata in ['dfa', 'mealy', 'moore']:
+            for incremental in [False, True]:
+                learning_results = []
+                for column_store in [False, True]:
+                    sul = AutomatonSUL(angluin_example)
+                    eq_oracle = WMethodEqOracle(alphabet, sul, max_number_of_states=len(angluin_example.states))
+
+                    learned_model, info = run_Lstar(alphabet, sul, eq_oracle, automaton_type=automata,
+                                                    incremental_obs_table=incremental,
+                                                    column_store_obs_table=column_store,
+                                                    return_data=True, print_level=0)
+
+                    self.assertTrue(self.prove_equivalence(learned_model))
+                    learning_results.append((info['queries_learning'], info['characterization_set']))
+
+                self.assertEqual(learning_results[0], learning_results[1])
+
+    def test_pta_from_shards(self):
+        def pta_nodes(root):
+            nodes = [root]
+            for node in nodes:
+                nodes.extend(node.children.values())
+            return [(node.prefix, node.output, list(node.children)) for node in nodes]
+
+        random.seed(5)
+        for automaton_type in ['dfa', 'mealy', 'moore']:
+            automaton = generate_random_deterministic_automata(automaton_type, num_states=8, input_alphabet_size=3,
+                                                               output_alphabet_size=3)
+            data = generate_input_output_data_from_automata(automaton, 1000, sequance_type='labeled_sequences')
+            data = [(tuple(inputs), output) for inputs, output in data]
+
+            pta_type = automaton_type if automaton_type != 'dfa' else 'moore'
+            sequential_pta = createPTA(list(data), pta_type)
+            sharded_pta = create_pta_in_parallel(list(data), pta_type, num_workers=2, shard_size=150)
+            self.assertEqual(pta_nodes(sequential_pta), pta_nodes(sharded_pta))
+
+            # data with contradicting labels
+            self.assertIsNone(create_pta_in_parallel(data + [(data[0][0], 'x')], pta_type, num_workers=2,
+                                                     shard_size=150))
+
+            output_behavior = 'mealy' if automaton_type == 'mealy' else 'moore'
+            sequential_pta = GsmNode.createPTA(data, output_behavior, 'labeled_sequences')
+            sharded_pta = GsmNode.createPTA_in_parallel(data, output_behavior, 'labeled_sequences', num_workers=2,
+                                                        shard_size=150)
+            self.assertEqual(str(sequential_pta.to_automaton(output_behavior, 'deterministic')),
+                             str(sharded_pta.to_automaton(output_behavior, 'deterministic')))
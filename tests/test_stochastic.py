@@ -1,10 +1,14 @@
+import random
 import unittest
+from unittest.mock import patch
 
 import aalpy.paths
 from aalpy.SULs import AutomatonSUL
 from aalpy.learning_algs import run_stochastic_Lstar
 from aalpy.oracles import RandomWalkEqOracle
-from aalpy.utils import load_automaton_from_file
+from aalpy.utils import load_automaton_from_file, check_property, check_properties_file, get_properties_file, \
+    get_correct_prop_values, generate_random_markov_chain, statistical_model_checking, \
+    sequential_probability_ratio_test
 
 
 class StochasticTest(unittest.TestCase):
@@ -68,3 +72,89 @@ class StochasticTest(unittest.TestCase):
                                 assert False
 
         assert True
+
+    def test_adaptive_sampling(self):
+        aalpy.paths.path_to_properties = "../Benchmarking/prism_eval_props/"
+
+        example = 'first_grid'
+        mdp = load_automaton_from_file(f'../DotModels/MDPs/{example}.dot', automaton_type='mdp')
+        input_alphabet = mdp.get_input_alphabet()
+
+        num_queries = dict()
+        for adaptive_sampling in [False, True]:
+            random.seed(2)
+            sul = AutomatonSUL(mdp)
+            eq_oracle = RandomWalkEqOracle(input_alphabet, sul, num_steps=2000, reset_prob=0.25, reset_after_cex=True)
+            learned_model, info = run_stochastic_Lstar(input_alphabet, sul, eq_oracle, automaton_type='mdp',
+                                                       min_rounds=10, max_rounds=50, adaptive_sampling=adaptive_sampling,
+                                                       return_data=True, print_level=0)
+
+            results = check_properties_file(learned_model, get_properties_file(example))
+            for value, correct_value in zip(results.values(), get_correct_prop_values(example)):
+                self.assertAlmostEqual(value, correct_value, delta=0.05)
+            num_queries[adaptive_sampling] = info['queries_learning']
+
+        self.assertLessEqual(num_queries[True], num_queries[False])
+
+    def test_in_process_model_checking(self):
+        aalpy.paths.path_to_properties = "../Benchmarking/prism_eval_props/"
+
+        for example in ['first_grid', 'second_grid', 'shared_coin', 'slot_machine', 'mqtt', 'tcp', 'bluetooth']:
+            mdp = load_automaton_from_file(f'../DotModels/MDPs/{example}.dot', automaton_type='mdp')
+            results = check_properties_file(mdp, get_properties_file(example))
+            for value, correct_value in zip(results.values(), get_correct_prop_values(example)):
+                self.assertAlmostEqual(value, correct_value, places=5)
+            # value iteration without NumPy
+            with patch.dict('sys.modules', {'numpy': None}):
+                scalar_results = check_properties_file(mdp, get_properties_file(example))
+            for value, scalar_value in zip(results.values(), scalar_results.values()):
+                self.assertAlmostEqual(value, scalar_value, places=8)
+
+        # bounded reachability on a Markov chain compared to explicit forward propagation
+        random.seed(2)
+        mc = generate_random_markov_chain(12)
+        distribution = {mc.initial_state: 1.}
+        reached = 0.
+        for _ in range(6):
+            reached += sum(p for s, p in distribution.items() if s.output == 11)
+            next_distribution = dict()
+            for s, p in distribution.items():
+                if s.output == 11:
+                    continue
+                for target, prob in s.transitions or [(s, 1.)]:
+                    next_distribution[target] = next_distribution.get(target, 0.) + p * prob
+            distribution = next_distribution
+        self.assertAlmostEqual(check_property(mc, 'P=? [ F<6 "11" ]'), reached)
+        self.assertAlmostEqual(check_property(mc, 'P=? [ G<6 !"11" ]'), 1 - reached)
+        self.assertAlmostEqual(check_property(mc, 'P=? [ G !"11" ]'), 1 - check_property(mc, 'P=? [ F "11" ]'))
+
+        with self.assertRaises(ValueError):
+            check_property(mc, 'P=? [ G "11" & F "10" ]')
+
+    def test_batched_statistical_model_checking(self):
+        random.seed(3)
+        mc = generate_random_markov_chain(12)
+        # statistical model checking counts goals observed after at least one step
+        exact = check_property(mc, 'P=? [ X (F<8 "11") ]')
+
+        estimate = statistical_model_checking(mc, {11}, 8, num_tests=50000, seed=1)
+        self.assertAlmostEqual(estimate, exact, delta=0.01)
+        sharded_estimate = statistical_model_checking(mc, {11}, 8, num_tests=50000, num_workers=2, seed=1)
+        self.assertAlmostEqual(sharded_estimate, exact, delta=0.01)
+
+        # without a seed, results are reproducible with random.seed
+        random.seed(4)
+        estimate = statistical_model_checking(mc, {11}, 8, num_tests=1000)
+        random.seed(4)
+        self.assertEqual(statistical_model_checking(mc, {11}, 8, num_tests=1000), estimate)
+
+        # tests are executed one by one without NumPy
+        with patch.dict('sys.modules', {'numpy': None}):
+            sequential_estimate = statistical_model_checking(mc, {11}, 8, num_tests=20000)
+        self.assertAlmostEqual(sequential_estimate, exact, delta=0.015)
+
+        decision, _, num_tests = sequential_probability_ratio_test(mc, {11}, 8, exact - 0.1, seed=2)
+        self.assertTrue(decision)
+        decision, _, _ = sequential_probability_ratio_test(mc, {11}, 8, exact + 0.1, seed=2)
+        self.assertFalse(decision)
+        self.assertLess(num_tests, 10000)
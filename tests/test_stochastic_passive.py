@@ -0,0 +1,112 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from aalpy.learning_algs.stochastic.DifferenceChecker import HoeffdingChecker, AdvancedHoeffdingChecker, \
+    ChiSquareChecker
+from aalpy.learning_algs import run_Alergia
+from aalpy.learning_algs.stochastic_passive.Alergia import Alergia
+from aalpy.learning_algs.stochastic_passive.FPTA import create_fpta, create_fpta_in_parallel
+from aalpy.utils import load_automaton_from_file, IODelimiterTokenizer
+
+
+def generate_mdp_data(model, num_sequences, rnd):
+    data = []
+    inputs = model.get_input_alphabet()
+    for _ in range(num_sequences):
+        model.reset_to_initial()
+        sequence = [model.initial_state.output]
+        for _ in range(rnd.randint(5, 15)):
+            i = rnd.choice(inputs)
+            sequence.append((i, model.step(i)))
+        data.append(sequence)
+    return data
+
+
+class StochasticPassiveTest(unittest.TestCase):
+
+    def test_batched_compatibility_checks(self):
+        random.seed(1)
+        mdp = load_automaton_from_file('../DotModels/MDPs/first_grid.dot', automaton_type='mdp')
+        data = generate_mdp_data(mdp, 2000, random.Random(1))
+
+        alergia = Alergia(data, automaton_type='mdp', eps=0.05)
+        nodes = []
+        queue = [alergia.fpta]
+        while queue:
+            node = queue.pop()
+            nodes.append(node)
+            queue.extend(node.original_children.values())
+        nodes = [node for node in nodes if node.original_children]
+
+        rnd = random.Random(2)
+        pairs = [tuple(rnd.sample(nodes, 2)) for _ in range(200)]
+
+        checker = alergia.diff_checker
+        scalar = [checker.are_states_different(a, b) for a, b in pairs]
+        # first with scalar fallback, then vectorized
+        self.assertEqual(checker.are_states_different_batch(pairs[:5]), scalar[:5])
+        self.assertEqual(checker.are_states_different_batch(pairs), scalar)
+        # pairs are checked one by one if NumPy is not installed
+        with patch.dict('sys.modules', {'numpy': None}):
+            self.assertEqual(checker.are_states_different_batch(pairs), scalar)
+
+        scalar_alergia = Alergia(data, automaton_type='mdp', eps=0.05)
+        scalar_alergia.batched_compatibility_test = scalar_alergia.compatibility_test
+        self.assertEqual(str(alergia.run()), str(scalar_alergia.run()))
+
+    def test_batched_cell_difference(self):
+        rnd = random.Random(0)
+
+        def random_cell():
+            outputs = rnd.sample('abcdef', rnd.randint(0, 4))
+            scale = rnd.choice([1, 3, 10, 100])
+            return {o: rnd.randint(1, scale) for o in outputs}
+
+        pairs = []
+        for _ in range(500):
+            c1 = random_cell()
+            c2 = {o: max(1, v + rnd.randint(-2, 2)) for o, v in c1.items()} if rnd.random() < 0.5 else random_cell()
+            pairs.append((c1, c2))
+
+        for checker in [HoeffdingChecker(), AdvancedHoeffdingChecker(), ChiSquareChecker()]:
+            scalar = [checker.are_cells_different(c1, c2) for c1, c2 in pairs]
+            self.assertEqual(list(checker.are_cells_different_batch(pairs)), scalar)
+            with patch.dict('sys.modules', {'numpy': None}):
+                self.assertEqual(checker.are_cells_different_batch(pairs), scalar)
+
+    def test_alergia_on_streamed_data(self):
+        random.seed(3)
+        mdp = load_automaton_from_file('../DotModels/MDPs/first_grid.dot', automaton_type='mdp')
+        data = generate_mdp_data(mdp, 1000, random.Random(3))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'traces.txt')
+            with open(path, 'w') as file:
+                for seq in data:
+                    file.write(','.join([seq[0]] + [f'{i}/{o}' for i, o in seq[1:]]) + '\n')
+
+            tokenizer = IODelimiterTokenizer()
+            self.assertEqual(list(tokenizer.iterate_data(path)), data)
+            self.assertEqual(tokenizer.tokenize_data(path), data)
+
+            learned_model = run_Alergia(tokenizer.iterate_data(path), automaton_type='mdp', eps='auto')
+            self.assertEqual(str(learned_model), str(run_Alergia(data, automaton_type='mdp', eps='auto')))
+
+    def test_fpta_from_shards(self):
+        random.seed(4)
+        mdp = load_automaton_from_file('../DotModels/MDPs/first_grid.dot', automaton_type='mdp')
+        data = generate_mdp_data(mdp, 1000, random.Random(4))
+
+        def pta_edges(root):
+            edges, nodes = [], [root]
+            for node in nodes:
+                edges.extend((node.prefix, el, freq) for el, freq in node.original_input_frequency.items())
+                nodes.extend(node.original_children.values())
+            return edges
+
+        sequential_pta = create_fpta(data, 'mdp')
+        sharded_pta = create_fpta_in_parallel(data, 'mdp', num_workers=2, shard_size=150)
+        self.assertEqual(pta_edges(sequential_pta), pta_edges(sharded_pta))